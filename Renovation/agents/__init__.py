@@ -7,11 +7,15 @@ from .base_agent import (
     AgentExecutionError,
     ValidationError
 )
+from .async_agent import AsyncBaseAgent, SyncAgentAdapter, as_async
 
 __all__ = [
     "BaseAgent",
     "AgentStatus",
     "AgentType",
     "AgentExecutionError",
-    "ValidationError"
+    "ValidationError",
+    "AsyncBaseAgent",
+    "SyncAgentAdapter",
+    "as_async"
 ]
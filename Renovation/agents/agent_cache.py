@@ -0,0 +1,159 @@
+"""
+Agent Result Cache
+LRU of agent outputs keyed by the input fields each agent declares, with optional SQLite persistence
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+DEFAULT_CACHE_SIZE = int(os.getenv("AGENT_CACHE_SIZE", "1024"))
+# Unset keeps the cache in memory only
+DEFAULT_CACHE_PATH = os.getenv("AGENT_CACHE_PATH") or None
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_cache (
+    cache_key TEXT PRIMARY KEY,
+    agent TEXT,
+    outputs TEXT,
+    created_at REAL,
+    expires_at REAL
+);
+"""
+
+
+def make_cache_key(agent: str, version: str, values: Dict[str, Any]) -> str:
+    payload = json.dumps(values, sort_keys=True, default=str)
+    digest = hashlib.sha1(f"{agent}:{version}:{payload}".encode()).hexdigest()
+    return f"{agent}:{digest}"
+
+
+class AgentResultCache:
+    """
+    Thread-safe LRU of agent outputs
+
+    Entries are stored as JSON text, so every hit hands back a fresh copy the
+    caller is free to mutate, and the same text is what goes to disk. An
+    entry put with a ttl stops matching once it expires (in memory and on
+    disk); without one it lives until evicted.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, db_path: Optional[str] = DEFAULT_CACHE_PATH):
+        self.max_size = max_size
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._conn.execute(CACHE_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(agent_cache)")}
+            if "expires_at" not in columns:
+                self._conn.execute("ALTER TABLE agent_cache ADD COLUMN expires_at REAL")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT outputs, expires_at FROM agent_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    entry = row
+                    self._remember(key, *entry)
+            text = None
+            if entry is not None:
+                text, expires_at = entry
+                if expires_at is not None and expires_at <= time.time():
+                    self._entries.pop(key, None)
+                    text = None
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(text)
+
+    def put(self, key: str, outputs: Dict[str, Any], ttl: Optional[float] = None) -> bool:
+        """Store outputs for ttl seconds (None: no expiry); False if they aren't JSON-serializable"""
+        try:
+            text = json.dumps(outputs)
+        except (TypeError, ValueError):
+            return False
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, text, expires_at)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO agent_cache (cache_key, agent, outputs, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, key.split(":", 1)[0], text, now, expires_at),
+                )
+                self._conn.commit()
+        return True
+
+    def _remember(self, key: str, text: str, expires_at: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (text, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self, persistent: bool = False) -> None:
+        with self._lock:
+            self._entries.clear()
+            if persistent and self._conn is not None:
+                self._conn.execute("DELETE FROM agent_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "persistent": self.db_path,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache: Optional[AgentResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> AgentResultCache:
+    """Process-wide cache shared by every memoized agent"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = AgentResultCache()
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[AgentResultCache]) -> None:
+    """Swap the shared cache (None recreates it from the environment on next use)"""
+    global _default_cache
+    with _default_lock:
+        _default_cache = cache
+
+
+__all__ = ["AgentResultCache", "make_cache_key", "default_cache", "set_default_cache"]
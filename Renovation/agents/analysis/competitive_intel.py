@@ -3,6 +3,7 @@ Agent 2: Competitive Intelligence Analyzer
 Analyzes niche competitors and identifies market opportunities
 """
 
+import os
 import sys
 from pathlib import Path
 from typing import Dict, Any, List
@@ -14,7 +15,10 @@ from agents.base_agent import BaseAgent, AgentType
 
 # Import competitive tools
 sys.path.append(str(Path(__file__).parents[3] / "scripts"))
-from competitive_design_agent import search_competitors
+from competitor_cache import TTL_SECONDS as COMPETITOR_CACHE_TTL, lead_locality, lookup_competitors
+
+# Deadline for execute()s that do a competitor lookup; 0 disables it
+COMPETITOR_LOOKUP_TIMEOUT = float(os.getenv("COMPETITOR_LOOKUP_TIMEOUT_SECONDS", "10")) or None
 
 
 class CompetitiveIntelligenceAgent(BaseAgent):
@@ -25,6 +29,13 @@ class CompetitiveIntelligenceAgent(BaseAgent):
     Output: Niche standards, overused patterns, and opportunities
     """
     
+    # Competitors are looked up per niche and locality (see key_values);
+    # standards per niche. Results age out with the competitor data.
+    cache_key_fields = ("niche",)
+    cache_version = "2"
+    cache_ttl = COMPETITOR_CACHE_TTL
+    timeout = COMPETITOR_LOOKUP_TIMEOUT
+    
     def __init__(self):
         super().__init__(
             name="Competitive Intelligence Analyzer",
@@ -161,6 +172,10 @@ class CompetitiveIntelligenceAgent(BaseAgent):
         """Validate lead has niche or industry"""
         return "niche" in input_data or "industry" in input_data
     
+    def key_values(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Niche plus the locality the competitor lookup resolves (locality, city or region)"""
+        return {**super().key_values(input_data), "locality": lead_locality(input_data)}
+    
     def validate_output(self, output_data: Dict[str, Any]) -> bool:
         """Validate output has competitive analysis"""
         required = ["competitorsFound", "marketOpportunities"]
@@ -171,9 +186,16 @@ class CompetitiveIntelligenceAgent(BaseAgent):
         niche = input_data.get("niche", "general")
         industry = input_data.get("industry", "General").lower()
         
-        # Search for competitors
-        competitors = search_competitors(niche, limit=5)
+        # Search for competitors (shared per niche and locality across leads)
+        competitors = lookup_competitors(niche, lead_locality(input_data), limit=5)
         
+        return self._intelligence(niche, competitors)
+    
+    def default_outputs(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Niche standards alone, for when the competitor lookup times out"""
+        return self._intelligence(input_data.get("niche", "general"), [])
+    
+    def _intelligence(self, niche: str, competitors: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Get niche standards
         niche_key = next((k for k in self.niche_standards_map if k in niche.lower()), None)
         standards = self.niche_standards_map.get(
@@ -193,6 +215,7 @@ class CompetitiveIntelligenceAgent(BaseAgent):
             "niche": niche,
             "competitorsFound": len(competitors),
             "competitorNames": [c.get("name") for c in competitors[:3]],
+            "competitors": competitors,
             "nicheStandards": standards,
             "competitiveThreats": {
                 "mostCommon": standards["overusedPatterns"][:3],
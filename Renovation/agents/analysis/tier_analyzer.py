@@ -5,7 +5,7 @@ Analyzes business tier and website presence to identify problems and priorities
 
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from datetime import datetime
 
 # Import base agent
@@ -21,6 +21,10 @@ class TierPresenceAnalyzer(BaseAgent):
     Output: Tier analysis with problems detected and priority focus
     """
     
+    # industry is echoed back, not analyzed, so it's re-applied instead of keyed
+    cache_key_fields = ("current_website_status", "tier")
+    cache_passthrough_fields = {"businessName": "business_name"}
+    
     def __init__(self):
         super().__init__(
             name="Tier & Presence Analyzer",
@@ -95,9 +99,21 @@ class TierPresenceAnalyzer(BaseAgent):
         required = ["tier", "problemsDetected", "priorityFocus"]
         return all(key in output_data for key in required)
     
+    def batch_key(self, input_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Group on the normalized status execute() actually looks up"""
+        return (
+            (input_data.get("current_website_status") or "none").lower(),
+            input_data.get("tier", "Tier 1"),
+        )
+    
+    def apply_non_key_fields(self, outputs: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        outputs = super().apply_non_key_fields(outputs, input_data)
+        outputs["industry"] = input_data.get("industry", "General")
+        return outputs
+    
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze tier and website presence"""
-        website_status = input_data.get("current_website_status", "none").lower()
+        website_status = (input_data.get("current_website_status") or "none").lower()
         tier = input_data.get("tier", "Tier 1")
         industry = input_data.get("industry", "General")
         
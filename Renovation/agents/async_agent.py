@@ -0,0 +1,203 @@
+"""
+Async Base Agent
+Async-native interface for I/O-bound agents, plus an adapter that schedules sync agents from an event loop
+"""
+
+import asyncio
+import os
+import time
+from abc import abstractmethod
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Union
+
+from .base_agent import BaseAgent, AgentStatus, AgentExecutionError, AgentTimeoutError
+
+# Groups or standalone inputs an agent resolves at once in arun_batch
+DEFAULT_CONCURRENCY = int(os.getenv("AGENT_ASYNC_CONCURRENCY", "100"))
+
+
+class AsyncBaseAgent(BaseAgent):
+    """
+    Base class for agents whose execute() awaits network I/O
+
+    arun() mirrors BaseAgent.run (validation, memoization, metrics and result
+    shape) but awaits execute(), so one event loop keeps many leads in flight
+    without a thread each. run() and run_batch() still work for sync callers
+    as long as no event loop is running in the calling thread.
+    """
+
+    @abstractmethod
+    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute agent logic, awaiting any I/O
+
+        Args:
+            input_data: Input data for agent processing
+
+        Returns:
+            Dict containing agent outputs
+        """
+        pass
+
+    async def arun(self, input_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async counterpart of run(); a missed deadline cancels execute()
+
+        Args:
+            input_data: Input data for agent
+            timeout: Caller's deadline in seconds, tightened by self.timeout
+
+        Returns:
+            Dict with status and outputs
+        """
+        # Per-call locals: other arun() calls on this instance interleave at awaits
+        started_at = datetime.now()
+        self.status = AgentStatus.IN_PROGRESS
+        self.started_at = started_at
+        try:
+            if not self.validate_input(input_data):
+                raise ValueError(f"Invalid input for agent {self.name}")
+
+            key = self.cache_key(input_data)
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                outputs = self.apply_non_key_fields(cached, input_data)
+            else:
+                try:
+                    outputs = await self._aexecute_bounded(input_data, self.deadline_for(timeout))
+                except AgentTimeoutError as e:
+                    self.completed_at = datetime.now()
+                    result = self._timeout_result(e, input_data, key, (self.completed_at - started_at).total_seconds())
+                    self.status = AgentStatus(result["status"])
+                    self.error_message = str(e)
+                    self.outputs = result.get("outputs", {})
+                    return result
+                outputs = self._store_outputs(outputs, key)
+
+            self.outputs = outputs
+            self.cache_hit = cached is not None
+            self.status = AgentStatus.COMPLETED
+            self.completed_at = datetime.now()
+            return self._result(outputs, cached is not None, (self.completed_at - started_at).total_seconds())
+
+        except Exception as e:
+            self.status = AgentStatus.FAILED
+            self.error_message = str(e)
+            self.completed_at = datetime.now()
+            return self._error_result(self.error_message, (self.completed_at - started_at).total_seconds())
+
+    async def arun_batch(self, inputs: List[Dict[str, Any]], concurrency: int = DEFAULT_CONCURRENCY,
+                         timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of run_batch(); up to `concurrency` groups execute at once
+
+        Args:
+            inputs: Input data per lead
+            concurrency: Maximum execute() calls awaiting at the same time
+            timeout: Deadline in seconds for the whole batch
+
+        Returns:
+            One run()-shaped result per input, in input order
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        remaining = lambda: deadline - time.monotonic() if deadline is not None else None
+        results, singles, groups = self._partition_batch(inputs)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run_single(i: int) -> None:
+            async with semaphore:
+                results[i] = await self.arun(inputs[i], remaining())
+
+        async def run_group(indices: List[int]) -> None:
+            async with semaphore:
+                group = await self._arun_group([inputs[i] for i in indices], remaining())
+            for i, result in zip(indices, group):
+                results[i] = result
+
+        await asyncio.gather(
+            *(run_single(i) for i in singles),
+            *(run_group(indices) for indices in groups.values()),
+        )
+        return self._finish_batch(results)
+
+    async def _arun_group(self, members: List[Dict[str, Any]],
+                          timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        key = None
+        try:
+            key = self.cache_key(members[0])
+            template = self.cache.get(key) if key else None
+            cached = template is not None
+            if not cached:
+                outputs = await self._aexecute_bounded(members[0], self.deadline_for(timeout))
+                template = self._store_outputs(outputs, key)
+        except AgentTimeoutError as e:
+            return self._group_timeout(e, members, key, start)
+        except Exception as e:
+            return self._group_errors(e, members, start)
+        return self._fan_out(template, cached, members, start)
+
+    async def _aexecute_bounded(self, input_data: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        if timeout is None:
+            return await self.execute(input_data)
+        if timeout <= 0:
+            raise AgentTimeoutError(f"{self.name} had no time left to run")
+        try:
+            return await asyncio.wait_for(self.execute(input_data), timeout)
+        except asyncio.TimeoutError:
+            raise AgentTimeoutError(f"{self.name} timed out after {timeout:.2f}s") from None
+
+    def run(self, input_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking wrapper around arun() for callers outside an event loop"""
+        return _run_blocking(self, self.arun(input_data, timeout))
+
+    def run_batch(self, inputs: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Blocking wrapper around arun_batch() for callers outside an event loop"""
+        return _run_blocking(self, self.arun_batch(inputs, timeout=timeout))
+
+
+def _run_blocking(agent: BaseAgent, coroutine):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    coroutine.close()
+    raise AgentExecutionError(f"{agent.name} called synchronously inside an event loop; await arun() instead")
+
+
+class SyncAgentAdapter:
+    """
+    Schedules a sync BaseAgent from an event loop
+
+    run()/run_batch() go to a worker thread (the loop's default executor unless
+    one is given), so the loop keeps serving other leads meanwhile. Like the
+    agent itself, one adapter instance serves one run at a time; build one per
+    lead (as AgentDAG does) for concurrent leads.
+    """
+
+    def __init__(self, agent: BaseAgent, executor: Optional[Executor] = None):
+        self.agent = agent
+        self.executor = executor
+        self.name = agent.name
+
+    async def arun(self, input_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.agent.run, input_data, timeout)
+
+    async def arun_batch(self, inputs: List[Dict[str, Any]], concurrency: int = DEFAULT_CONCURRENCY,
+                         timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.agent.run_batch, inputs, timeout)
+
+
+def as_async(agent: Union[BaseAgent, AsyncBaseAgent], executor: Optional[Executor] = None):
+    """Return an object with arun()/arun_batch() for any agent"""
+    # Checked by shape rather than isinstance: agents may be imported through
+    # either the agents or the Renovation.agents package path
+    if asyncio.iscoroutinefunction(getattr(agent, "execute", None)):
+        return agent
+    return SyncAgentAdapter(agent, executor)
+
+
+__all__ = ["AsyncBaseAgent", "SyncAgentAdapter", "as_async", "DEFAULT_CONCURRENCY"]
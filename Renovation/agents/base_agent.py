@@ -3,11 +3,60 @@ Base Agent Interface
 Abstract class defining common interface for all agents in the system
 """
 
+import copy
+import json
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, Optional, List, Tuple, Hashable
 from datetime import datetime
 from enum import Enum
 
+from .agent_cache import AgentResultCache, make_cache_key, default_cache
+
+try:
+    from Renovation.infrastructure.monitoring.latency_metrics import observe_agent, observe_timeout
+except ImportError:
+    # Imported without the repo root on sys.path: agents run unmetered
+    observe_agent = observe_timeout = None
+
+# Default per-agent execute() deadline; unset or 0 means no limit
+DEFAULT_TIMEOUT = float(os.getenv("AGENT_TIMEOUT_SECONDS", "0")) or None
+# Threads available to deadline-bound executes; abandoned ones hold theirs until they return
+TIMEOUT_WORKERS = int(os.getenv("AGENT_TIMEOUT_WORKERS", "32"))
+
+_timeout_pool: Optional[ThreadPoolExecutor] = None
+_timeout_pool_lock = threading.Lock()
+
+
+def _deadline_pool() -> ThreadPoolExecutor:
+    global _timeout_pool
+    if _timeout_pool is None:
+        with _timeout_pool_lock:
+            if _timeout_pool is None:
+                _timeout_pool = ThreadPoolExecutor(max_workers=TIMEOUT_WORKERS, thread_name_prefix="agent-deadline")
+    return _timeout_pool
+
+
+# Cancel event of the deadline-bound execute() running on this worker thread
+_deadline_state = threading.local()
+
+
+def _call_cancellable(execute, input_data: Dict[str, Any], cancel: threading.Event) -> Dict[str, Any]:
+    _deadline_state.cancel = cancel
+    try:
+        return execute(input_data)
+    finally:
+        _deadline_state.cancel = None
+
+
+def combine_timeouts(*timeouts: Optional[float]) -> Optional[float]:
+    """Tightest of the given deadlines in seconds (None when none is set)"""
+    bounded = [t for t in timeouts if t is not None]
+    return min(bounded) if bounded else None
+
 
 class AgentStatus(Enum):
     """Agent execution status"""
@@ -18,6 +67,13 @@ class AgentStatus(Enum):
     SKIPPED = "skipped"
 
 
+class FallbackPolicy(Enum):
+    """What a timed-out run returns instead of execute()'s outputs"""
+    NONE = "none"        # fail the run
+    CACHE = "cache"      # memoized outputs for the same key, else fail
+    DEFAULT = "default"  # memoized outputs, else default_outputs(), else fail
+
+
 class AgentType(Enum):
     """Agent classification"""
     ANALYSIS = "analysis"
@@ -30,7 +86,29 @@ class BaseAgent(ABC):
     """
     Abstract base class for all agents
     Defines common interface and behavior
+
+    Memoization is opt-in: an agent whose outputs depend only on a few input
+    fields lists them in cache_key_fields (dotted paths reach into nested
+    dicts). Cache hits skip execute() and get their non-key fields re-applied
+    by apply_non_key_fields(): "timestamp" is refreshed and every output field
+    in cache_passthrough_fields is copied from its input field.
+
+    Deadlines: an agent with a timeout (its own, tightened by the caller's
+    remaining pipeline budget) runs execute() on a worker thread that is
+    abandoned once the deadline passes. Long-running agents can poll
+    cancelled() to stop early. The run then answers according to
+    timeout_fallback with a result marked "timed_out" (and "degraded" when a
+    fallback output was used).
     """
+
+    cache_key_fields: Tuple[str, ...] = ()
+    cache_passthrough_fields: Dict[str, str] = {}
+    # Bump when execute() changes so persisted entries stop matching
+    cache_version: str = "1"
+    # Seconds a memoized result stays valid; None keeps it until evicted
+    cache_ttl: Optional[float] = None
+    timeout: Optional[float] = DEFAULT_TIMEOUT
+    timeout_fallback: FallbackPolicy = FallbackPolicy.DEFAULT
     
     def __init__(self, name: str, agent_type: AgentType):
         self.name = name
@@ -40,6 +118,8 @@ class BaseAgent(ABC):
         self.completed_at: Optional[datetime] = None
         self.error_message: Optional[str] = None
         self.outputs: Dict[str, Any] = {}
+        self.cache: Optional[AgentResultCache] = default_cache() if self.cache_key_fields else None
+        self.cache_hit = False
     
     @abstractmethod
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -83,12 +163,13 @@ class BaseAgent(ABC):
         """
         pass
     
-    def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def run(self, input_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Main execution wrapper with status tracking and error handling
         
         Args:
             input_data: Input data for agent
+            timeout: Caller's deadline in seconds, tightened by self.timeout
             
         Returns:
             Dict with status and outputs
@@ -102,37 +183,304 @@ class BaseAgent(ABC):
             if not self.validate_input(input_data):
                 raise ValueError(f"Invalid input for agent {self.name}")
             
-            # Execute
-            self.outputs = self.execute(input_data)
-            
-            # Validate output
-            if not self.validate_output(self.outputs):
-                raise ValueError(f"Invalid output from agent {self.name}")
+            # Execute, or reuse a memoized result for the same key fields
+            key = self.cache_key(input_data)
+            cached = self.cache.get(key) if key else None
+            self.cache_hit = cached is not None
+            if self.cache_hit:
+                self.outputs = self.apply_non_key_fields(cached, input_data)
+            else:
+                try:
+                    outputs = self._execute_bounded(input_data, key, self.deadline_for(timeout))
+                except AgentTimeoutError as e:
+                    self.completed_at = datetime.now()
+                    result = self._timeout_result(
+                        e, input_data, key, (self.completed_at - self.started_at).total_seconds()
+                    )
+                    self.status = AgentStatus(result["status"])
+                    self.error_message = str(e)
+                    self.outputs = result.get("outputs", {})
+                    return result
+                self.outputs = self._store_outputs(outputs, key)
             
             # Mark as completed
             self.status = AgentStatus.COMPLETED
             self.completed_at = datetime.now()
             
-            return {
-                "status": self.status.value,
-                "agent_name": self.name,
-                "agent_type": self.agent_type.value,
-                "outputs": self.outputs,
-                "execution_time": (self.completed_at - self.started_at).total_seconds()
-            }
+            return self._result(
+                self.outputs, self.cache_hit, (self.completed_at - self.started_at).total_seconds()
+            )
             
         except Exception as e:
             self.status = AgentStatus.FAILED
             self.error_message = str(e)
             self.completed_at = datetime.now()
             
-            return {
-                "status": self.status.value,
-                "agent_name": self.name,
-                "agent_type": self.agent_type.value,
-                "error": self.error_message,
-                "execution_time": (self.completed_at - self.started_at).total_seconds() if self.started_at else 0
-            }
+            return self._error_result(
+                self.error_message,
+                (self.completed_at - self.started_at).total_seconds() if self.started_at else 0
+            )
+    
+    def run_batch(self, inputs: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Run many inputs, executing once per distinct batch_key
+        
+        Each group's outputs are computed (or read from the cache) for its first
+        input and copied to the rest through apply_non_key_fields. Inputs whose
+        batch_key is None (or raises) go through run() one by one.
+        
+        Args:
+            inputs: Input data per lead
+            timeout: Deadline in seconds for the whole batch
+            
+        Returns:
+            One run()-shaped result per input, in input order
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        remaining = lambda: deadline - time.monotonic() if deadline is not None else None
+        results, singles, groups = self._partition_batch(inputs)
+        for i in singles:
+            results[i] = self.run(inputs[i], remaining())
+        for indices in groups.values():
+            for i, result in zip(indices, self._run_group([inputs[i] for i in indices], remaining())):
+                results[i] = result
+        return self._finish_batch(results)
+    
+    def _partition_batch(
+        self, inputs: List[Dict[str, Any]]
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[int], Dict[Hashable, List[int]]]:
+        """Validate inputs and split them into standalone indices and batch_key groups"""
+        self.status = AgentStatus.IN_PROGRESS
+        self.started_at = datetime.now()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        singles: List[int] = []
+        groups: Dict[Hashable, List[int]] = {}
+        
+        for i, input_data in enumerate(inputs):
+            if not self.validate_input(input_data):
+                results[i] = self._error_result(f"Invalid input for agent {self.name}", 0)
+                continue
+            try:
+                key = self.batch_key(input_data)
+            except Exception:
+                # Leave it to run(), which reports the failure on this lead alone
+                key = None
+            if key is None:
+                singles.append(i)
+            else:
+                groups.setdefault(key, []).append(i)
+        return results, singles, groups
+    
+    def _finish_batch(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        failed = [r for r in results if r["status"] == AgentStatus.FAILED.value]
+        self.status = AgentStatus.FAILED if failed else AgentStatus.COMPLETED
+        self.error_message = failed[-1]["error"] if failed else None
+        self.outputs = results[-1].get("outputs", {}) if results else {}
+        self.completed_at = datetime.now()
+        return results
+    
+    def _store_outputs(self, outputs: Dict[str, Any], key: Optional[str]) -> Dict[str, Any]:
+        """Validate freshly executed outputs and memoize them under key"""
+        if not self.validate_output(outputs):
+            raise ValueError(f"Invalid output from agent {self.name}")
+        if key:
+            self.cache.put(key, outputs, self.cache_ttl)
+        return outputs
+    
+    def _run_group(self, members: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Resolve one batch_key group and fan its outputs out to every member"""
+        start = time.perf_counter()
+        key = None
+        try:
+            key = self.cache_key(members[0])
+            template = self.cache.get(key) if key else None
+            cached = template is not None
+            if not cached:
+                outputs = self._execute_bounded(members[0], key, self.deadline_for(timeout))
+                template = self._store_outputs(outputs, key)
+        except AgentTimeoutError as e:
+            return self._group_timeout(e, members, key, start)
+        except Exception as e:
+            return self._group_errors(e, members, start)
+        return self._fan_out(template, cached, members, start)
+    
+    def _execute_bounded(self, input_data: Dict[str, Any], key: Optional[str],
+                         timeout: Optional[float]) -> Dict[str, Any]:
+        """execute(), abandoned with AgentTimeoutError once timeout seconds pass"""
+        if timeout is None:
+            return self.execute(input_data)
+        if timeout <= 0:
+            raise AgentTimeoutError(f"{self.name} had no time left to run")
+        cancel = threading.Event()
+        future = _deadline_pool().submit(_call_cancellable, self.execute, input_data, cancel)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            # Not started yet: never runs. Started: ask it to stop, and keep a
+            # late result so later leads with the same key can use it.
+            if not future.cancel():
+                cancel.set()
+                future.add_done_callback(lambda f: self._store_late(f, key))
+            raise AgentTimeoutError(f"{self.name} timed out after {timeout:.2f}s")
+    
+    def deadline_for(self, timeout: Optional[float]) -> Optional[float]:
+        """
+        Seconds execute() may take given the caller's remaining budget
+        
+        Only agents with a timeout of their own (the ones waiting on I/O) are
+        bounded; the rest are CPU-bound, finish quickly, and run inline so a
+        spent pipeline budget never turns them into failures.
+        """
+        if self.timeout is None:
+            return None
+        return combine_timeouts(self.timeout, timeout)
+    
+    def _store_late(self, future, key: Optional[str]) -> None:
+        if key and not future.cancelled() and future.exception() is None:
+            try:
+                self._store_outputs(future.result(), key)
+            except ValueError:
+                pass
+    
+    def cancelled(self) -> bool:
+        """True inside an execute() whose deadline has passed; poll it to stop early"""
+        cancel = getattr(_deadline_state, "cancel", None)
+        return cancel is not None and cancel.is_set()
+    
+    def default_outputs(self, input_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cheap stand-in outputs for a timed-out run under FallbackPolicy.DEFAULT
+        
+        Returns None (no default) unless the agent overrides it.
+        """
+        return None
+    
+    def fallback_outputs(self, input_data: Dict[str, Any], key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Outputs a timed-out run answers with under timeout_fallback, or None"""
+        if self.timeout_fallback is FallbackPolicy.NONE:
+            return None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return self.apply_non_key_fields(cached, input_data)
+        if self.timeout_fallback is FallbackPolicy.DEFAULT:
+            outputs = self.default_outputs(input_data)
+            if outputs is not None and self.validate_output(outputs):
+                return outputs
+        return None
+    
+    def _timeout_result(self, error: Exception, input_data: Dict[str, Any], key: Optional[str],
+                        execution_time: float) -> Dict[str, Any]:
+        outputs = self.fallback_outputs(input_data, key)
+        if observe_timeout:
+            observe_timeout(self.name, degraded=outputs is not None)
+        if outputs is None:
+            result = self._error_result(str(error), execution_time)
+        else:
+            result = self._result(outputs, False, execution_time)
+            result["degraded"] = True
+        result["timed_out"] = True
+        return result
+    
+    def _group_timeout(self, error: Exception, members: List[Dict[str, Any]], key: Optional[str],
+                       start: float) -> List[Dict[str, Any]]:
+        template = self.fallback_outputs(members[0], key)
+        if observe_timeout:
+            observe_timeout(self.name, degraded=template is not None, count=len(members))
+        if template is None:
+            results = self._group_errors(error, members, start)
+        else:
+            results = self._fan_out(template, True, members, start)
+            for result in results:
+                result["cached"] = False
+                result["degraded"] = True
+        for result in results:
+            result["timed_out"] = True
+        return results
+    
+    def _group_errors(self, error: Exception, members: List[Dict[str, Any]], start: float) -> List[Dict[str, Any]]:
+        elapsed = (time.perf_counter() - start) / len(members)
+        return [self._error_result(str(error), elapsed) for _ in members]
+    
+    def _fan_out(self, template: Dict[str, Any], cached: bool, members: List[Dict[str, Any]],
+                 start: float) -> List[Dict[str, Any]]:
+        """Copy a group's outputs to each member (the first keeps a fresh execute's own dict)"""
+        try:
+            text = json.dumps(template)
+            clone = lambda: json.loads(text)
+        except (TypeError, ValueError):
+            clone = lambda: copy.deepcopy(template)
+        
+        outputs_list = []
+        for i, input_data in enumerate(members):
+            if i == 0 and not cached:
+                outputs_list.append(template)
+            else:
+                outputs_list.append(self.apply_non_key_fields(clone(), input_data))
+        
+        elapsed = (time.perf_counter() - start) / len(members)
+        return [
+            self._result(outputs, cached or i > 0, elapsed)
+            for i, outputs in enumerate(outputs_list)
+        ]
+    
+    def _result(self, outputs: Dict[str, Any], cached: bool, execution_time: float) -> Dict[str, Any]:
+        if observe_agent:
+            observe_agent(self.name, execution_time, AgentStatus.COMPLETED.value)
+        return {
+            "status": AgentStatus.COMPLETED.value,
+            "agent_name": self.name,
+            "agent_type": self.agent_type.value,
+            "outputs": outputs,
+            "cached": cached,
+            "execution_time": execution_time
+        }
+    
+    def _error_result(self, error: str, execution_time: float) -> Dict[str, Any]:
+        if observe_agent:
+            observe_agent(self.name, execution_time, AgentStatus.FAILED.value)
+        return {
+            "status": AgentStatus.FAILED.value,
+            "agent_name": self.name,
+            "agent_type": self.agent_type.value,
+            "error": error,
+            "execution_time": execution_time
+        }
+    
+    def key_values(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Values of cache_key_fields, following dotted paths into nested dicts"""
+        values = {}
+        for field in self.cache_key_fields:
+            value: Any = input_data
+            for part in field.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            values[field] = value
+        return values
+    
+    def batch_key(self, input_data: Dict[str, Any]) -> Optional[Hashable]:
+        """
+        Inputs with equal batch keys share one execute() in run_batch
+        
+        Defaults to the cache key fields; None runs the input on its own.
+        Agents override this to group on normalized values when their outputs
+        only depend on those (plus fields apply_non_key_fields re-applies).
+        """
+        if not self.cache_key_fields:
+            return None
+        return json.dumps(self.key_values(input_data), sort_keys=True, default=str)
+    
+    def cache_key(self, input_data: Dict[str, Any]) -> Optional[str]:
+        """Cache key from the declared key fields, or None when not memoized"""
+        if self.cache is None:
+            return None
+        return make_cache_key(type(self).__name__, self.cache_version, self.key_values(input_data))
+    
+    def apply_non_key_fields(self, outputs: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-apply the per-lead fields of a cached or batch-shared result"""
+        if "timestamp" in outputs:
+            outputs["timestamp"] = datetime.now().isoformat()
+        for output_field, input_field in self.cache_passthrough_fields.items():
+            outputs[output_field] = input_data.get(input_field)
+        return outputs
     
     def get_status(self) -> Dict[str, Any]:
         """Get current agent status"""
@@ -152,6 +500,7 @@ class BaseAgent(ABC):
         self.completed_at = None
         self.error_message = None
         self.outputs = {}
+        self.cache_hit = False
 
 
 class AgentExecutionError(Exception):
@@ -159,6 +508,11 @@ class AgentExecutionError(Exception):
     pass
 
 
+class AgentTimeoutError(AgentExecutionError):
+    """Exception raised when execute() misses its deadline"""
+    pass
+
+
 class ValidationError(Exception):
     """Exception raised when validation fails"""
     pass
@@ -169,5 +523,7 @@ __all__ = [
     "AgentStatus", 
     "AgentType",
     "AgentExecutionError",
+    "AgentTimeoutError",
+    "FallbackPolicy",
     "ValidationError"
 ]
@@ -5,7 +5,7 @@ Composes demo structure based on tier and niche
 
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from datetime import datetime
 
 # Import base agent
@@ -21,6 +21,9 @@ class DemoComposer(BaseAgent):
     Output: Complete demo composition with sections and components
     """
     
+    cache_key_fields = ("tier", "niche", "design_synthesis.animationLevel")
+    cache_passthrough_fields = {"targetAudience": "business_name"}
+    
     def __init__(self):
         super().__init__(
             name="Demo Composer",
@@ -108,20 +111,32 @@ class DemoComposer(BaseAgent):
         """Validate output has structure"""
         return "structure" in output_data and "sections" in output_data["structure"]
     
+    def resolve_niche_key(self, niche: str) -> str:
+        """component_map key for a lowercased niche (tech when nothing matches)"""
+        return next((k for k in self.component_map if k in niche), "tech")
+    
+    def batch_key(self, input_data: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Outputs depend on the resolved niche key, not the raw niche text"""
+        return (
+            input_data.get("tier", "Tier 1"),
+            self.resolve_niche_key((input_data.get("niche") or "general").lower()),
+            (input_data.get("design_synthesis") or {}).get("animationLevel", "moderate"),
+        )
+    
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Compose demo structure"""
         tier = input_data.get("tier", "Tier 1")
-        niche = input_data.get("niche", "general").lower()
+        niche = (input_data.get("niche") or "general").lower()
         
         # Get tier specification
         tier_spec = self.tier_sections.get(tier, self.tier_sections["Tier 2"])
         
         # Get niche components
-        niche_key = next((k for k in self.component_map if k in niche), "tech")
+        niche_key = self.resolve_niche_key(niche)
         niche_components = self.component_map.get(niche_key, self.component_map["tech"])
         
         # Get design synthesis if available
-        design_synthesis = input_data.get("design_synthesis", {})
+        design_synthesis = input_data.get("design_synthesis") or {}
         animation_level = design_synthesis.get("animationLevel", "moderate")
         
         return {
@@ -5,7 +5,7 @@ Synthesizes original design system avoiding niche clichés
 
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 
 # Import base agent
@@ -14,17 +14,26 @@ from agents.base_agent import BaseAgent, AgentType
 
 # Import design tools
 sys.path.append(str(Path(__file__).parents[3] / "scripts"))
-from competitive_design_agent import search_competitors, generate_original_palette
+from competitive_design_agent import generate_original_palette
+from competitor_cache import TTL_SECONDS as COMPETITOR_CACHE_TTL, lead_locality, lookup_competitors
+from agents.analysis.competitive_intel import COMPETITOR_LOOKUP_TIMEOUT
 
 
 class DesignSynthesizer(BaseAgent):
     """
     Agent 3: Synthesizes original design that avoids clichés
     
-    Input: Lead + competitive intelligence
+    Input: Lead + competitive intelligence (optional "niche_intel" from agent 2)
     Output: Unique design system avoiding overused patterns
     """
     
+    # The palette is built from upstream competitors when agent 2 ran, else
+    # from this niche and locality's lookup (see key_values)
+    cache_key_fields = ("niche", "tier", "niche_intel.competitors")
+    cache_version = "2"
+    cache_ttl = COMPETITOR_CACHE_TTL
+    timeout = COMPETITOR_LOOKUP_TIMEOUT
+    
     def __init__(self):
         super().__init__(
             name="Design Synthesizer",
@@ -81,6 +90,9 @@ class DesignSynthesizer(BaseAgent):
         """Validate lead has niche and tier"""
         return "niche" in input_data and "tier" in input_data
     
+    def key_values(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {**super().key_values(input_data), "locality": lead_locality(input_data)}
+    
     def validate_output(self, output_data: Dict[str, Any]) -> bool:
         """Validate output has design system"""
         required = ["designStyle", "colorPalette", "animationLevel"]
@@ -91,9 +103,17 @@ class DesignSynthesizer(BaseAgent):
         niche = input_data.get("niche", "general").lower()
         tier = input_data.get("tier", "Tier 1")
         
-        # Get competitors for palette
-        competitors = search_competitors(niche, limit=3)
-        
+        # Get competitors for palette, reusing agent 2's lookup when it ran upstream
+        competitors = input_data.get("niche_intel", {}).get("competitors")
+        if competitors is None:
+            competitors = lookup_competitors(niche, lead_locality(input_data), limit=3)
+        return self._synthesis(niche, tier, competitors[:3])
+    
+    def default_outputs(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Niche strategy and palette without competitor input"""
+        return self._synthesis(input_data.get("niche", "general").lower(), input_data.get("tier", "Tier 1"), [])
+    
+    def _synthesis(self, niche: str, tier: str, competitors: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Generate palette
         palette = generate_original_palette(competitors, niche, tier)
         
@@ -133,7 +153,7 @@ def synthesize_original_design(lead: Dict, competitor_intel: Dict) -> Dict:
     Legacy function wrapper for backward compatibility
     """
     agent = DesignSynthesizer()
-    result = agent.run(lead)
+    result = agent.run({**lead, "niche_intel": competitor_intel or {}})
     return result.get("outputs", {})
 
 
@@ -0,0 +1,9 @@
+"""Orchestration Agents Package"""
+
+from .dag_executor import AgentDAG, timed_out_nodes, ensure_dag_workers
+
+__all__ = [
+    "AgentDAG",
+    "timed_out_nodes",
+    "ensure_dag_workers"
+]
@@ -0,0 +1,228 @@
+"""
+Agent DAG Executor
+Runs BaseAgent nodes in dependency order, executing independent nodes concurrently
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+# Import base agent
+sys.path.append(str(Path(__file__).parents[2]))
+from agents.base_agent import BaseAgent
+from agents.async_agent import as_async
+
+# Minimum size of the shared node pool; callers running many DAGs at once
+# grow it with ensure_dag_workers()
+DAG_WORKERS = int(os.getenv("AGENT_DAG_WORKERS", "8"))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_workers = DAG_WORKERS
+_pool_lock = threading.Lock()
+
+
+def _shared_pool() -> ThreadPoolExecutor:
+    # One pool for every DAG run; nodes never wait on other nodes from inside
+    # the pool (only the calling thread waits), so nested runs can't deadlock
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=_pool_workers, thread_name_prefix="agent-dag")
+    return _pool
+
+
+def ensure_dag_workers(n: int) -> int:
+    """
+    Grow the shared node pool to at least n threads (it never shrinks)
+
+    A node holds its pool thread for the whole agent run, including waits on
+    a deadline-bound execute(), so a caller running k DAGs concurrently
+    should reserve k * dag.max_parallel() threads or its runs queue behind
+    each other. Returns the resulting pool size.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if n > _pool_workers:
+            _pool_workers = n
+            if _pool is not None:
+                # Work already submitted finishes on the old pool
+                _pool.shutdown(wait=False)
+                _pool = None
+        return _pool_workers
+
+
+def _budget(timeout: Optional[float]) -> Callable[[], Optional[float]]:
+    """Seconds left of a timeout started now (None when unbounded)"""
+    if timeout is None:
+        return lambda: None
+    deadline = time.monotonic() + timeout
+    return lambda: deadline - time.monotonic()
+
+
+def timed_out_nodes(results: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Names of nodes in a run() result that missed their deadline"""
+    return [name for name, result in results.items() if result.get("timed_out")]
+
+
+class AgentDAG:
+    """
+    Directed acyclic graph of agents
+
+    Each node is an agent plus the names of the nodes it depends on. A node's
+    input is the shared input_data with every upstream node's outputs added
+    under that node's name, so downstream agents reuse upstream work instead of
+    repeating lookups. Agents hold per-run state, so build one DAG per run.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, BaseAgent] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+
+    def add(self, name: str, agent: BaseAgent, depends_on: Iterable[str] = ()) -> "AgentDAG":
+        """Add a node; dependencies must already be in the graph"""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate DAG node: {name}")
+        depends_on = list(depends_on)
+        missing = [dep for dep in depends_on if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Node {name} depends on unknown nodes: {', '.join(missing)}")
+        self.nodes[name] = agent
+        self.dependencies[name] = depends_on
+        return self
+
+    def max_parallel(self) -> int:
+        """Most nodes that can run at once (widest dependency level)"""
+        depth: Dict[str, int] = {}
+        for name in self.nodes:
+            # Dependencies are added first, so their depth is already known
+            depth[name] = 1 + max((depth[dep] for dep in self.dependencies[name]), default=-1)
+        levels = list(depth.values())
+        return max((levels.count(level) for level in set(levels)), default=0)
+
+    def node_input(self, name: str, input_data: Dict[str, Any],
+                   results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Shared input plus upstream outputs keyed by node name"""
+        node_input = {**input_data}
+        for dep in self.dependencies[name]:
+            node_input[dep] = results[dep].get("outputs", {})
+        return node_input
+
+    def run(self, input_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute every node and return each agent's run() result by node name
+
+        A failed node still counts as done; its dependents see empty outputs,
+        matching the sequential pipeline's behaviour. With a timeout, each
+        agent that has a timeout of its own gets at most what remains of the
+        pipeline budget when it starts, so waiting on I/O is bounded; nodes that
+        miss it come back "timed_out" and possibly "degraded".
+        """
+        remaining = _budget(timeout)
+
+        def call(name: str, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+            return self.nodes[name].run(self.node_input(name, input_data, results), remaining())
+
+        return self._execute(call)
+
+    def run_batch(self, inputs: List[Dict[str, Any]],
+                  timeout: Optional[float] = None) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Execute every node over all inputs with the agents' run_batch()
+
+        Returns one run()-shaped mapping per input, in input order.
+        """
+        remaining = _budget(timeout)
+
+        def call(name: str, results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            return self.nodes[name].run_batch([
+                self.node_input(name, input_data, {dep: results[dep][i] for dep in self.dependencies[name]})
+                for i, input_data in enumerate(inputs)
+            ], remaining())
+
+        by_node = self._execute(call)
+        return [{name: by_node[name][i] for name in self.nodes} for i in range(len(inputs))]
+
+    async def arun(self, input_data: Dict[str, Any], executor: Optional[Executor] = None,
+                   timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Event-loop counterpart of run()
+
+        AsyncBaseAgent nodes are awaited directly; sync agents run on
+        `executor` threads (the loop's default executor if None).
+        """
+        remaining = _budget(timeout)
+
+        async def call(name: str, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+            agent = as_async(self.nodes[name], executor)
+            return await agent.arun(self.node_input(name, input_data, results), remaining())
+
+        return await self._aexecute(call)
+
+    async def arun_batch(self, inputs: List[Dict[str, Any]], executor: Optional[Executor] = None,
+                         timeout: Optional[float] = None) -> List[Dict[str, Dict[str, Any]]]:
+        """Event-loop counterpart of run_batch()"""
+        remaining = _budget(timeout)
+
+        async def call(name: str, results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            agent = as_async(self.nodes[name], executor)
+            return await agent.arun_batch([
+                self.node_input(name, input_data, {dep: results[dep][i] for dep in self.dependencies[name]})
+                for i, input_data in enumerate(inputs)
+            ], timeout=remaining())
+
+        by_node = await self._aexecute(call)
+        return [{name: by_node[name][i] for name in self.nodes} for i in range(len(inputs))]
+
+    async def _aexecute(self, call: Callable[[str, Dict[str, Any]], Any]) -> Dict[str, Any]:
+        """_execute() on the event loop: ready nodes become tasks, awaited as they finish"""
+        results: Dict[str, Any] = {}
+        pending = list(self.nodes)
+        in_flight = {}
+
+        while pending or in_flight:
+            ready = [name for name in pending if all(dep in results for dep in self.dependencies[name])]
+            for name in ready:
+                pending.remove(name)
+                in_flight[asyncio.ensure_future(call(name, results))] = name
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results[in_flight.pop(task)] = task.result()
+
+        return results
+
+    def _execute(self, call: Callable[[str, Dict[str, Any]], Any]) -> Dict[str, Any]:
+        """Call each node once its dependencies are done, overlapping ready nodes"""
+        results: Dict[str, Any] = {}
+        pending = list(self.nodes)
+        in_flight = {}
+
+        while pending or in_flight:
+            ready = [name for name in pending if all(dep in results for dep in self.dependencies[name])]
+            for name in ready:
+                pending.remove(name)
+
+            if len(ready) == 1 and not in_flight:
+                # Nothing to overlap with: skip the thread handoff
+                results[ready[0]] = call(ready[0], results)
+                continue
+
+            pool = _shared_pool()
+            for name in ready:
+                # Snapshot so pool threads never read a dict being written
+                in_flight[pool.submit(call, name, dict(results))] = name
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[in_flight.pop(future)] = future.result()
+
+        return results
+
+
+__all__ = ["AgentDAG", "timed_out_nodes", "ensure_dag_workers", "DAG_WORKERS"]
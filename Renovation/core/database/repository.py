@@ -4,13 +4,13 @@ Provides abstraction layer over existing BusinessDatabase for domain logic
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator
 from pathlib import Path
 import sys
 
 # Import existing database
 sys.path.append(str(Path(__file__).parents[3] / "scraper"))
-from database import BusinessDatabase
+from database import BusinessDatabase, TIER_CURSOR_KEYS, next_cursor
 
 
 class AbstractRepository(ABC):
@@ -50,9 +50,20 @@ class BusinessRepository(AbstractRepository):
         """Get business by Foursquare ID"""
         return self._db.get_business(fsq_id)
     
-    def get_by_tier(self, tier: int, limit: Optional[int] = None) -> List[Dict]:
-        """Get businesses by tier classification"""
-        return self._db.get_businesses_by_tier(tier, limit)
+    def get_by_tier(self, tier: int, limit: Optional[int] = None,
+                    after: Optional[str] = None) -> List[Dict]:
+        """Get businesses by tier classification (keyset cursor via `after`)"""
+        return self._db.get_businesses_by_tier(tier, limit, after=after)
+    
+    def iter_by_tier(self, tier: int, batch_size: int = 200) -> Iterator[Dict]:
+        """Stream every open lead in a tier, one keyset page at a time"""
+        after = None
+        while True:
+            rows = self._db.get_businesses_by_tier(tier, batch_size, after=after)
+            yield from rows
+            after = next_cursor(rows, TIER_CURSOR_KEYS, batch_size)
+            if not after:
+                return
     
     def get_no_website(self, limit: Optional[int] = None) -> List[Dict]:
         """Get businesses without websites (Tier 1 priority leads)"""
@@ -84,15 +95,27 @@ class BusinessRepository(AbstractRepository):
     
     def search(self, category: Optional[str] = None, 
                city: Optional[str] = None,
-               has_website: Optional[bool] = None) -> List[Dict]:
-        """Search businesses with filters"""
-        # Delegate to existing database methods
-        if category and city:
-            return self._db.search_by_category_and_location(category, city)
-        elif has_website is False:
-            return self.get_no_website()
-        else:
-            return self.list_all()
+               has_website: Optional[bool] = None,
+               query: Optional[str] = None,
+               limit: int = 50) -> List[Dict]:
+        """Search businesses with filters (FTS5-ranked, prefix matching)"""
+        return self._db.search_businesses(
+            query=query,
+            category=category,
+            locality=city,
+            has_website=has_website,
+            limit=limit
+        )
+
+    def find_within(self, lat: float, lng: float, radius_m: float,
+                    limit: Optional[int] = None) -> List[Dict]:
+        """Businesses within radius_m metres, nearest first (R-tree backed)"""
+        return self._db.find_within(lat, lng, radius_m, limit)
+    
+    def find_in_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+                     limit: Optional[int] = None) -> List[Dict]:
+        """Businesses inside a bounding box (R-tree backed)"""
+        return self._db.find_in_bbox(min_lat, min_lng, max_lat, max_lng, limit)
 
 
 class WorkflowStateRepository:
@@ -104,24 +127,46 @@ class WorkflowStateRepository:
     
     def get_task(self, task_id: str) -> Optional[Dict]:
         """Get task by ID"""
-        # Stub - extend TaskRegistry to support get
-        return None
+        return self._registry.get(task_id)
     
     def mark_started(self, task_id: str, workflow_type: str, business_fsq_id: Optional[str]) -> None:
         """Mark task as started"""
         self._registry.mark_started(task_id, workflow_type, business_fsq_id)
     
-    def mark_completed(self, task_id: str, outputs: Optional[Dict] = None) -> None:
-        """Mark task as completed"""
-        self._registry.mark_completed(task_id, outputs)
+    def mark_completed(self, task_id: str, outputs: Optional[Dict] = None) -> bool:
+        """Mark task as completed; False if this worker no longer holds it"""
+        return self._registry.mark_completed(task_id, outputs)
     
-    def mark_failed(self, task_id: str, error: str) -> None:
-        """Mark task as failed"""
-        self._registry.mark_failed(task_id, error)
+    def mark_failed(self, task_id: str, error: str, retryable: bool = True) -> Optional[str]:
+        """Record a failed attempt; returns 'pending' (retry scheduled), 'dead_letter', or None if not held"""
+        return self._registry.mark_failed(task_id, error, retryable)
     
     def exists(self, task_id: str) -> bool:
         """Check if task exists"""
         return self._registry.exists(task_id)
+    
+    def enqueue(self, task_id: str, workflow_type: str, business_fsq_id: Optional[str] = None) -> bool:
+        """Queue a pending task"""
+        return self._registry.enqueue(task_id, workflow_type, business_fsq_id)
+    
+    def claim_batch(self, workflow_type: str, n: int, lease_seconds: float = 300) -> List[Dict]:
+        """Claim up to n tasks under a lease"""
+        return self._registry.claim_batch(workflow_type, n, lease_seconds)
+    
+    def heartbeat(self, task_id: str, lease_seconds: float = 300) -> bool:
+        """Extend the lease on a claimed task"""
+        return self._registry.heartbeat(task_id, lease_seconds)
+    
+    def dead_letters(self, workflow_type: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Tasks that will not be retried"""
+        return self._registry.dead_letters(workflow_type, limit)
+    
+    def acquire_lock(self, name: str, ttl_seconds: float = 300) -> bool:
+        """Take a named lock shared by every worker on this database"""
+        return self._registry.acquire_lock(name, ttl_seconds)
+    
+    def release_lock(self, name: str) -> None:
+        self._registry.release_lock(name)
 
 
 __all__ = [
@@ -2,50 +2,158 @@
 Feature Flag Manager: percentage rollouts and context targeting
 - Loads Renovation/config/feature_flags.json
 - is_enabled(feature, context) returns boolean
+- The parsed file is cached per path and shared by all managers; it is
+  re-read only when its mtime/size changes (checked at most once a second)
+- Rollouts are deterministic: a context is bucketed by a salted hash of its
+  key (fsq_id, then business_name/name), so the same business always takes
+  the same path. A flag may set "salt" (re-shuffle buckets) and "bucket_by"
+  (context field to hash). Contexts without a key fall back to random.
 """
 
 import os
 import json
 import random
+import hashlib
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Iterable, List, Tuple, Callable
 
 FLAGS_PATH = Path(os.getenv("FEATURE_FLAGS_PATH", Path(__file__).parents[2] / "config" / "feature_flags.json"))
 
+CHECK_INTERVAL = 1.0
 
-class FeatureFlagManager:
-    def __init__(self):
-        self._flags = {}
-        self._load()
+# Context fields tried, in order, as the rollout bucketing key
+BUCKET_KEYS = ("fsq_id", "business_name", "name")
+
+
+class _FlagFileCache:
+    """Parsed feature flags for one file, reloaded when the file changes"""
+
+    def __init__(self, path: Path, check_interval: float = CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = float("-inf")
+        self._flags: Dict[str, Any] = {}
 
-    def _load(self) -> None:
+    def get(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            with self._lock:
+                if now - self._checked_at >= self.check_interval:
+                    self._check()
+                    self._checked_at = now
+        return self._flags
+
+    def _check(self) -> None:
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return
         try:
-            with open(FLAGS_PATH) as f:
+            with open(self.path) as f:
                 data = json.load(f)
             self._flags = data.get("features", {})
         except Exception:
             self._flags = {}
+        self._signature = signature
+
+
+_caches: Dict[str, _FlagFileCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _cache_for(path: Path) -> _FlagFileCache:
+    key = str(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = _FlagFileCache(Path(path))
+        return cache
+
+
+class FeatureFlagManager:
+    def __init__(self, flags_path: Optional[Path] = None):
+        self._cache = _cache_for(flags_path or FLAGS_PATH)
+        # Runtime overrides from enable_for_percentage(); local to this manager
+        self._overrides: Dict[str, Dict[str, Any]] = {}
 
     def is_enabled(self, feature_name: str, context: Dict[str, Any] | None = None) -> bool:
-        f = self._flags.get(feature_name)
-        if not f:
-            return False
-        if not f.get("enabled", False):
-            return False
-        pct = int(f.get("rollout_percentage", 100))
-        # Context-based enablement example: tier targeting
-        enabled_for = f.get("enabled_for") or []
-        if enabled_for and context:
-            tier = (context.get("tier") or "").lower()
-            if "tier_1_leads" in enabled_for and tier != "tier 1":
-                return False
-        # Percentage rollout
-        return random.randint(1, 100) <= pct
+        f = self._overrides.get(feature_name) or self._cache.get().get(feature_name)
+        return _evaluate(feature_name, f, context)
+
+    def evaluate_batch(self, feature_name: str, contexts: Iterable[Dict[str, Any] | None]) -> List[bool]:
+        """is_enabled() for many contexts, resolving the flag once"""
+        f = self._overrides.get(feature_name) or self._cache.get().get(feature_name)
+        return [_evaluate(feature_name, f, context) for context in contexts]
+
+    def partition(self, feature_name: str, items: Iterable[Any],
+                  context_fn: Callable[[Any], Dict[str, Any]] | None = None) -> Tuple[List[Any], List[Any]]:
+        """
+        Split items into (enabled, disabled) lists for a flag.
+
+        Items are used as contexts directly unless context_fn maps them.
+        Because bucketing is deterministic, bulk runs can route each group
+        up front and get the same split on every re-run.
+        """
+        items = list(items)
+        contexts = [context_fn(item) for item in items] if context_fn else items
+        enabled, disabled = [], []
+        for item, on in zip(items, self.evaluate_batch(feature_name, contexts)):
+            (enabled if on else disabled).append(item)
+        return enabled, disabled
+
+    def bucket(self, feature_name: str, context: Dict[str, Any] | None) -> Optional[int]:
+        """Rollout bucket (1-100) for a context, or None if it has no bucketing key"""
+        f = self._overrides.get(feature_name) or self._cache.get().get(feature_name) or {}
+        return _bucket(feature_name, f, context)
 
     def enable_for_percentage(self, feature_name: str, percentage: int) -> None:
-        f = self._flags.setdefault(feature_name, {})
+        f = self._overrides.get(feature_name)
+        if f is None:
+            f = self._overrides[feature_name] = dict(self._cache.get().get(feature_name, {}))
         f["enabled"] = True
         f["rollout_percentage"] = max(0, min(100, percentage))
 
 
-__all__ = ["FeatureFlagManager"]
+def _bucket(feature_name: str, f: Dict[str, Any], context: Dict[str, Any] | None) -> Optional[int]:
+    if not context:
+        return None
+    fields = (f["bucket_by"],) if f.get("bucket_by") else BUCKET_KEYS
+    key = next((context[field] for field in fields if context.get(field)), None)
+    if key is None:
+        return None
+    salt = f.get("salt", feature_name)
+    digest = hashlib.sha1(f"{salt}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % 100 + 1
+
+
+def _evaluate(feature_name: str, f: Dict[str, Any] | None, context: Dict[str, Any] | None) -> bool:
+    if not f:
+        return False
+    if not f.get("enabled", False):
+        return False
+    pct = int(f.get("rollout_percentage", 100))
+    # Context-based enablement example: tier targeting
+    enabled_for = f.get("enabled_for") or []
+    if enabled_for and context:
+        tier = (context.get("tier") or "").lower()
+        if "tier_1_leads" in enabled_for and tier != "tier 1":
+            return False
+    if pct >= 100:
+        return True
+    if pct <= 0:
+        return False
+    # Percentage rollout
+    bucket = _bucket(feature_name, f, context)
+    if bucket is None:
+        return random.randint(1, 100) <= pct
+    return bucket <= pct
+
+
+__all__ = ["FeatureFlagManager", "BUCKET_KEYS"]
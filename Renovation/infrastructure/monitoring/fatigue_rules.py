@@ -1,37 +1,44 @@
 """
 Fatigue Rules: throttle API usage and batch writes
 Creates additive table fatigue_metrics and exposes simple checks.
+
+Load figures come from the sliding-window counters in scraper/load_counters.py,
+which the HTTP and DB layers feed on every request/write. This process's
+counts are read live; other processes' counts come from their periodic
+fatigue_metrics snapshots.
 """
 
 import os
 import sqlite3
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parents[3] / "scraper"))
+import load_counters
+from load_counters import FATIGUE_SCHEMA as SCHEMA_FATIGUE, api_metric, db_write_metric
+
 DB_PATH = Path(os.getenv("DB_PATH", "businesses.db"))
 
-SCHEMA_FATIGUE = """
-CREATE TABLE IF NOT EXISTS fatigue_metrics (
-    id INTEGER PRIMARY KEY,
-    metric_type TEXT,
-    current_value INTEGER,
-    threshold INTEGER,
-    last_reset TIMESTAMP,
-    is_throttled BOOLEAN DEFAULT FALSE
-);
-"""
+# Business writes per minute across all processes before batch writers back off
+DB_WRITE_THRESHOLD = int(os.getenv("FATIGUE_DB_WRITE_THRESHOLD", "3000"))
 
 
 class FatigueMonitor:
-    def __init__(self, db_path: Path | None = None):
+    def __init__(self, db_path: Path | None = None, snapshot_interval: float | None = None):
         self.db_path = db_path or DB_PATH
         self._ensure_tables()
+        # Publish this process's counts so other workers can see them
+        load_counters.start_snapshots(
+            str(self.db_path),
+            load_counters.SNAPSHOT_INTERVAL if snapshot_interval is None else snapshot_interval,
+        )
 
     def _conn(self):
         return sqlite3.connect(str(self.db_path))
 
     def _ensure_tables(self) -> None:
         conn = self._conn()
-        conn.execute(SCHEMA_FATIGUE)
+        load_counters.ensure_snapshot_table(conn)
         conn.commit()
         conn.close()
 
@@ -39,16 +46,38 @@ class FatigueMonitor:
         # Example thresholds; in production, derive from config
         return 66 if api_name.lower() == "foursquare" else 60
 
+    def record_request(self, api_name: str, n: int = 1) -> None:
+        load_counters.set_threshold(api_metric(api_name), self.get_threshold(api_name))
+        load_counters.record(api_metric(api_name), n)
+
+    def record_write(self, n: int = 1, queue: str = "businesses") -> None:
+        load_counters.record(db_write_metric(queue), n)
+
+    def _load(self, metric: str, window: int) -> int:
+        local = load_counters.recent(metric, window)
+        return local + load_counters.recent_elsewhere(str(self.db_path), metric)
+
     def get_recent_requests(self, api_name: str, window: int = 60) -> int:
-        # Stub: integrate with request logs
-        return 0
+        """
+        Requests to an API in the last `window` seconds, across processes.
+
+        Other processes are counted from their latest snapshot, which always
+        covers a full counter window (60s) regardless of `window`.
+        """
+        return self._load(api_metric(api_name), window)
+
+    def get_recent_writes(self, window: int = 60, queue: str = "businesses") -> int:
+        return self._load(db_write_metric(queue), window)
 
     def check_api_fatigue(self, api_name: str) -> bool:
         return self.get_recent_requests(api_name) > self.get_threshold(api_name)
 
     def check_database_fatigue(self) -> bool:
-        # Stub: integrate with write queue
-        return False
+        return self.get_recent_writes() > DB_WRITE_THRESHOLD
+
+    def snapshot(self) -> int:
+        """Write this process's counts to fatigue_metrics now"""
+        return load_counters.snapshot(str(self.db_path))
 
 
 __all__ = ["FatigueMonitor"]
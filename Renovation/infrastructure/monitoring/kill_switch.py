@@ -1,12 +1,20 @@
 """
 Kill Switches: trigger-based workflow halt and resume
 Creates additive table kill_switches and exposes simple API.
+
+is_active() is served from an in-process snapshot of the table. The snapshot
+is reloaded only when PRAGMA data_version reports a commit from another
+connection, checked at most once per CHECK_INTERVAL seconds, so per-lead
+checks cost a dict lookup while still seeing changes within a second.
 """
 
 import os
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 DB_PATH = Path(os.getenv("DB_PATH", "businesses.db"))
 
@@ -22,9 +30,25 @@ CREATE TABLE IF NOT EXISTS kill_switches (
 """
 
 
+CHECK_INTERVAL = 1.0
+
+
 class KillSwitches:
-    def __init__(self, db_path: Path | None = None):
+    """
+    Named halt switches with cached is_active() lookups
+
+    Holds one watch connection open once is_active() has been called; use it
+    as a context manager (or call close()) so the connection is released.
+    """
+
+    def __init__(self, db_path: Path | None = None, check_interval: float = CHECK_INTERVAL):
         self.db_path = db_path or DB_PATH
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._switches: Dict[str, Tuple[bool, Optional[datetime]]] = {}
         self._ensure_tables()
 
     def _conn(self):
@@ -45,30 +69,75 @@ class KillSwitches:
         )
         conn.commit()
         conn.close()
+        self.invalidate()
 
     def is_active(self, name: str) -> bool:
-        conn = self._conn()
-        cur = conn.cursor()
-        cur.execute("SELECT is_active, auto_resume_at FROM kill_switches WHERE switch_name=?", (name,))
-        row = cur.fetchone()
-        conn.close()
-        if not row:
+        self._refresh()
+        entry = self._switches.get(name)
+        if not entry:
             return False
-        is_active, auto_resume_at = row
+        is_active, auto_resume_at = entry
         # Auto-resume check
-        try:
-            if auto_resume_at and datetime.fromisoformat(auto_resume_at) <= datetime.now():
-                self.clear(name)
-                return False
-        except Exception:
-            pass
-        return bool(is_active)
+        if is_active and auto_resume_at and auto_resume_at <= datetime.now():
+            self.clear(name)
+            return False
+        return is_active
 
     def clear(self, name: str) -> None:
         conn = self._conn()
         conn.execute("UPDATE kill_switches SET is_active=FALSE WHERE switch_name=?", (name,))
         conn.commit()
         conn.close()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Force the next is_active() call to reload the snapshot"""
+        with self._lock:
+            self._data_version = None
+            self._checked_at = float("-inf")
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            if self._watch_conn is None:
+                # data_version is per connection, so keep one open to watch with
+                self._watch_conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                rows = self._watch_conn.execute(
+                    "SELECT switch_name, is_active, auto_resume_at FROM kill_switches"
+                ).fetchall()
+                self._switches = {
+                    name: (bool(is_active), _parse_time(auto_resume_at))
+                    for name, is_active, auto_resume_at in rows
+                }
+                self._data_version = version
+            self._checked_at = now
+
+    def close(self) -> None:
+        with self._lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+            self._data_version = None
+            self._checked_at = float("-inf")
+
+    def __enter__(self) -> "KillSwitches":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _parse_time(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
 
 
 __all__ = ["KillSwitches"]
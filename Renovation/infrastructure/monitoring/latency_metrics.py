@@ -0,0 +1,263 @@
+"""
+Latency Metrics: per-agent and per-stage histograms with Prometheus export
+In-process registry; nothing is written until export or summary is asked for.
+
+BaseAgent.run records every agent execution (agent_latency_seconds plus
+agent_runs_total by status) and demo_generation times its analysis, render
+and deploy stages with stage_timer(). The registry can be written as a
+Prometheus text file (node_exporter textfile collector), served over HTTP,
+or printed as a p50/p95 summary at the end of a run.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds; covers cached agent hits through slow deploys
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+AGENT_LATENCY = "agent_latency_seconds"
+AGENT_RUNS = "agent_runs_total"
+STAGE_LATENCY = "pipeline_stage_seconds"
+STAGE_RUNS = "pipeline_stage_total"
+AGENT_TIMEOUTS = "agent_timeouts_total"
+PATH_LATENCY = "pipeline_path_seconds"
+SHADOW_COMPARISONS = "shadow_comparisons_total"
+
+# Outcome counter kept alongside each latency histogram
+OUTCOME_COUNTERS = {AGENT_LATENCY: AGENT_RUNS, STAGE_LATENCY: STAGE_RUNS}
+
+HELP = {
+    AGENT_LATENCY: "Agent run() latency in seconds",
+    AGENT_RUNS: "Agent runs by outcome",
+    STAGE_LATENCY: "Demo pipeline stage latency in seconds",
+    STAGE_RUNS: "Demo pipeline stage executions by outcome",
+    AGENT_TIMEOUTS: "Agent runs that missed their deadline, by fallback used",
+    PATH_LATENCY: "Market-aware pipeline latency per routing path, from shadow comparisons",
+    SHADOW_COMPARISONS: "Shadow comparisons of the legacy and Renovation paths by outcome",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (counts are per bucket, not cumulative)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th value"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class MetricsRegistry:
+    """Thread-safe store of histograms and counters keyed by name and labels"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: int = 1, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    @contextmanager
+    def timer(self, latency_metric: str, count_metric: str, **labels: str) -> Iterator[None]:
+        """Time a block; counts it as status=success or status=failure"""
+        start = time.perf_counter()
+        status = "failure"
+        try:
+            yield
+            status = "success"
+        finally:
+            self.observe(latency_metric, time.perf_counter() - start, **labels)
+            self.inc(count_metric, status=status, **labels)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(histogram.buckets, histogram.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically write the exposition text (safe for textfile collectors)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """Serve the exposition text on any GET path from a daemon thread; returns the server"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+    def summary(self) -> List[Dict]:
+        """One row per histogram series with count, total, mean, p50, p95, max and failures"""
+        rows = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                counter = self._counters.get(OUTCOME_COUNTERS.get(name, ""), {})
+                for labels, histogram in sorted(series.items()):
+                    failures = counter.get(_labels({**dict(labels), "status": "failure"}), 0)
+                    rows.append({
+                        "metric": name,
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "total": histogram.sum,
+                        "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                        "max": histogram.max,
+                        "failures": failures,
+                    })
+        return rows
+
+    def counter_values(self, name: str) -> Dict[Labels, int]:
+        with self._lock:
+            return dict(self._counters.get(name, {}))
+
+    def print_summary(self) -> None:
+        rows = self.summary()
+        timeouts = self.counter_values(AGENT_TIMEOUTS)
+        if not rows and not timeouts:
+            return
+        print("\n⏱  Latency summary (seconds)")
+        print(f"{'series':<52} {'count':>6} {'total':>9} {'p50':>8} {'p95':>8} {'max':>8} {'fail':>5}")
+        for row in rows:
+            label = ",".join(f"{v}" for v in row["labels"].values()) or "-"
+            series = f"{row['metric'].replace('_seconds', '')}[{label}]"
+            print(
+                f"{series:<52} {row['count']:>6} {row['total']:>9.3f} {row['p50']:>8.4f} "
+                f"{row['p95']:>8.4f} {row['max']:>8.4f} {row['failures']:>5}"
+            )
+        for labels, value in sorted(timeouts.items()):
+            labels = dict(labels)
+            print(f"⌛ {labels.get('agent')}: {value} timed out ({labels.get('fallback')})")
+
+
+REGISTRY = MetricsRegistry()
+
+
+def observe_agent(agent_name: str, seconds: float, status: str) -> None:
+    """Record one BaseAgent.run (status is the AgentStatus value)"""
+    REGISTRY.observe(AGENT_LATENCY, seconds, agent=agent_name)
+    REGISTRY.inc(AGENT_RUNS, agent=agent_name, status="success" if status == "completed" else "failure")
+
+
+def observe_timeout(agent_name: str, degraded: bool, count: int = 1) -> None:
+    """Record runs that missed their deadline (degraded: answered with a fallback output)"""
+    REGISTRY.inc(AGENT_TIMEOUTS, count, agent=agent_name, fallback="degraded" if degraded else "failed")
+
+
+def observe_shadow(seconds_by_path: Dict[str, float], outcome: str) -> None:
+    """Record one shadow comparison (outcome: match, diff or error)"""
+    for path, seconds in seconds_by_path.items():
+        if seconds is not None:
+            REGISTRY.observe(PATH_LATENCY, seconds, path=path)
+    REGISTRY.inc(SHADOW_COMPARISONS, outcome=outcome)
+
+
+def stage_timer(stage: str):
+    """Context manager timing one demo pipeline stage (analysis, render, deploy, ...)"""
+    return REGISTRY.timer(STAGE_LATENCY, STAGE_RUNS, stage=stage)
+
+
+__all__ = [
+    "Histogram", "MetricsRegistry", "REGISTRY", "DEFAULT_BUCKETS",
+    "AGENT_LATENCY", "AGENT_RUNS", "STAGE_LATENCY", "STAGE_RUNS", "AGENT_TIMEOUTS",
+    "PATH_LATENCY", "SHADOW_COMPARISONS",
+    "observe_agent", "observe_timeout", "observe_shadow", "stage_timer",
+]
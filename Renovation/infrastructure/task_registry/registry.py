@@ -1,13 +1,27 @@
 """
 Task Registry: Prevent duplicate processing and track workflow state
 Creates additive tables in businesses.db without disrupting existing schema.
+
+Also works as a lease-based work queue: producers enqueue() tasks, workers in
+any number of processes (or machines sharing the database file) claim_batch()
+them under a time-limited lease, heartbeat() while working, and finish with
+mark_completed()/mark_failed(). A lease that expires - a crashed or hung
+worker - counts as a failed attempt, so the task is retried after a backoff.
+
+Failures are retried with exponential backoff and jitter up to a per-workflow
+attempt limit (RETRY_POLICIES); tasks that exhaust it, or fail with a
+non-retryable error, move to the dead_letter status instead of being retried.
 """
 
 import os
+import random
+import socket
 import sqlite3
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 DB_PATH = Path(os.getenv("DB_PATH", "businesses.db"))
 
@@ -35,20 +49,73 @@ CREATE TABLE IF NOT EXISTS workflow_locks (
 );
 """
 
+# Queue columns added to task_registry after the original schema shipped.
+# Lease and retry times are epoch seconds so workers in different timezones agree.
+QUEUE_COLUMNS = {
+    "lease_owner": "TEXT",
+    "lease_expires_at": "REAL",
+    "heartbeat_at": "REAL",
+    "next_attempt_at": "REAL",
+}
+
+INDEX_CLAIMABLE = """
+CREATE INDEX IF NOT EXISTS idx_task_registry_claimable
+ON task_registry (workflow_type, status, lease_expires_at)
+"""
+
+DEFAULT_LEASE_SECONDS = 300
+
+STATUS_DEAD_LETTER = "dead_letter"
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 30.0
+    max_delay: float = 3600.0
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (1-based), with equal jitter"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+# Per-workflow retry policies; unknown workflow types use "default"
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    "default": RetryPolicy(),
+    "demo_generation": RetryPolicy(max_attempts=3, base_delay=60.0),
+    "analysis": RetryPolicy(max_attempts=5, base_delay=30.0, max_delay=6 * 3600.0),
+}
+
+
+def default_worker_id() -> str:
+    """Identify this worker as host:pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
 
 class TaskRegistry:
-    def __init__(self, db_path: Path | None = None):
+    def __init__(self, db_path: Path | None = None, worker_id: Optional[str] = None,
+                 retry_policies: Optional[Dict[str, RetryPolicy]] = None):
         self.db_path = db_path or DB_PATH
+        self.worker_id = worker_id or default_worker_id()
+        self.retry_policies = {**RETRY_POLICIES, **(retry_policies or {})}
         self._ensure_tables()
 
     def _conn(self):
-        return sqlite3.connect(str(self.db_path))
+        # Claims take a write lock; wait for other workers instead of failing
+        return sqlite3.connect(str(self.db_path), timeout=30)
 
     def _ensure_tables(self) -> None:
         conn = self._conn()
         cur = conn.cursor()
         cur.execute(SCHEMA_TASK_REGISTRY)
         cur.execute(SCHEMA_WORKFLOW_LOCKS)
+        cur.execute("PRAGMA table_info(task_registry)")
+        existing = {row[1] for row in cur.fetchall()}
+        for column, column_type in QUEUE_COLUMNS.items():
+            if column not in existing:
+                cur.execute(f"ALTER TABLE task_registry ADD COLUMN {column} {column_type}")
+        cur.execute(INDEX_CLAIMABLE)
         conn.commit()
         conn.close()
 
@@ -61,31 +128,331 @@ class TaskRegistry:
         return row is not None
 
     def mark_started(self, task_id: str, workflow_type: str, business_fsq_id: Optional[str]) -> None:
+        conn = self._conn()
+        cur = conn.cursor()
+        # Upsert rather than replace so retry_count survives a restart. The
+        # task is owned by this worker (without a lease expiry) so only it
+        # can complete or fail it.
+        cur.execute(
+            """
+            INSERT INTO task_registry (task_id, workflow_type, business_fsq_id, status, started_at, lease_owner)
+            VALUES (?,?,?,?,?,?)
+            ON CONFLICT(task_id) DO UPDATE SET
+                workflow_type = excluded.workflow_type,
+                business_fsq_id = excluded.business_fsq_id,
+                status = excluded.status,
+                started_at = excluded.started_at,
+                lease_owner = excluded.lease_owner,
+                lease_expires_at = NULL
+            """,
+            (task_id, workflow_type, business_fsq_id, "in_progress", datetime.now().isoformat(), self.worker_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def mark_completed(self, task_id: str, agent_outputs: Dict[str, Any] | None = None) -> bool:
+        """
+        Complete a task this worker holds.
+
+        Returns False if it doesn't hold it any more (the lease expired and
+        the task was rescheduled or claimed by another worker); nothing is
+        written then.
+        """
+        conn = self._conn()
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE task_registry SET status=?, completed_at=?, agent_outputs=?, "
+            "lease_owner=NULL, lease_expires_at=NULL "
+            "WHERE task_id=? AND status='in_progress' AND lease_owner=?",
+            ("completed", datetime.now().isoformat(), json_dumps(agent_outputs), task_id, self.worker_id),
+        )
+        held = cur.rowcount > 0
+        conn.commit()
+        conn.close()
+        return held
+
+    def mark_failed(self, task_id: str, error_log: str, retryable: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt on a task this worker holds and schedule the next one.
+
+        The task goes back to pending with next_attempt_at set by the
+        workflow's RetryPolicy, or to dead_letter once max_attempts is reached
+        or when retryable is False. Returns the new status, or None if this
+        worker no longer holds the task (nothing is recorded then).
+        """
+        conn = self._conn()
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute(
+                "SELECT workflow_type, retry_count, error_log FROM task_registry "
+                "WHERE task_id=? AND status='in_progress' AND lease_owner=?",
+                (task_id, self.worker_id),
+            )
+            row = cur.fetchone()
+            status = self._record_failure(cur, task_id, *row, error_log, retryable) if row else None
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return status
+
+    def _record_failure(self, cur, task_id: str, workflow_type: str, retry_count: Optional[int],
+                        previous_log: Optional[str], error_log: str, retryable: bool = True) -> str:
+        """Count one attempt against the retry policy; shared by mark_failed and lease expiry"""
+        attempts = (retry_count or 0) + 1
+        policy = self.retry_policy(workflow_type)
+
+        if retryable and attempts < policy.max_attempts:
+            status, next_attempt_at = "pending", time.time() + policy.delay(attempts)
+        else:
+            status, next_attempt_at = STATUS_DEAD_LETTER, None
+
+        entry = f"[attempt {attempts}] {error_log}"
+        cur.execute(
+            "UPDATE task_registry SET status=?, retry_count=?, next_attempt_at=?, error_log=?, "
+            "lease_owner=NULL, lease_expires_at=NULL WHERE task_id=?",
+            (status, attempts, next_attempt_at,
+             f"{previous_log}\n{entry}" if previous_log else entry, task_id),
+        )
+        return status
+
+    def _expire_leases(self, cur, now: float, workflow_type: Optional[str] = None) -> int:
+        """
+        Fail every in-progress task whose lease has run out.
+
+        A crashed or hung worker counts as a failed attempt, so the task is
+        rescheduled with backoff or dead-lettered like any other failure
+        instead of being retried forever. Caller holds the write transaction.
+        """
+        query = (
+            "SELECT task_id, workflow_type, retry_count, error_log, lease_owner FROM task_registry "
+            "WHERE status='in_progress' AND lease_expires_at < ?"
+        )
+        params: list = [now]
+        if workflow_type:
+            query += " AND workflow_type=?"
+            params.append(workflow_type)
+        cur.execute(query, params)
+        expired = cur.fetchall()
+        for task_id, task_workflow, retry_count, previous_log, owner in expired:
+            self._record_failure(cur, task_id, task_workflow, retry_count, previous_log,
+                                 f"lease expired (held by {owner})")
+        return len(expired)
+
+    def retry_policy(self, workflow_type: str) -> RetryPolicy:
+        return self.retry_policies.get(workflow_type, self.retry_policies["default"])
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._conn()
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM task_registry WHERE task_id=?", (task_id,))
+        row = cur.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    # --- Work queue -------------------------------------------------------
+
+    def enqueue(self, task_id: str, workflow_type: str, business_fsq_id: Optional[str] = None) -> bool:
+        """Add a pending task; returns False if the task is already registered"""
         conn = self._conn()
         cur = conn.cursor()
         cur.execute(
-            "INSERT OR REPLACE INTO task_registry (task_id, workflow_type, business_fsq_id, status, started_at) VALUES (?,?,?,?,?)",
-            (task_id, workflow_type, business_fsq_id, "in_progress", datetime.now().isoformat()),
+            "INSERT OR IGNORE INTO task_registry (task_id, workflow_type, business_fsq_id, status) VALUES (?,?,?,?)",
+            (task_id, workflow_type, business_fsq_id, "pending"),
         )
+        added = cur.rowcount > 0
         conn.commit()
         conn.close()
+        return added
+
+    def claim_batch(self, workflow_type: str, n: int,
+                    lease_seconds: float = DEFAULT_LEASE_SECONDS) -> List[Dict[str, Any]]:
+        """
+        Atomically claim up to n tasks for this worker.
+
+        Pending tasks whose retry time has come are claimable. Expired leases
+        are first counted as failed attempts (see _expire_leases), so they come
+        back after their backoff or end up in dead_letter. The select and
+        update run in one write transaction (BEGIN IMMEDIATE), so two workers
+        can never claim the same task.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            self._expire_leases(cur, now, workflow_type)
+            cur.execute(
+                """
+                SELECT id FROM task_registry
+                WHERE workflow_type = ?
+                AND status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+                ORDER BY id
+                LIMIT ?
+                """,
+                (workflow_type, now, n),
+            )
+            ids = [row["id"] for row in cur.fetchall()]
+            if ids:
+                placeholders = ",".join("?" * len(ids))
+                cur.execute(
+                    f"""
+                    UPDATE task_registry
+                    SET status = 'in_progress', lease_owner = ?, lease_expires_at = ?,
+                        heartbeat_at = ?, started_at = ?
+                    WHERE id IN ({placeholders})
+                    """,
+                    (self.worker_id, now + lease_seconds, now, datetime.now().isoformat(), *ids),
+                )
+                cur.execute(f"SELECT * FROM task_registry WHERE id IN ({placeholders}) ORDER BY id", ids)
+                claimed = [dict(row) for row in cur.fetchall()]
+            else:
+                claimed = []
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return claimed
+
+    def heartbeat(self, task_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """
+        Extend this worker's lease on a task.
+
+        Returns False if the lease was lost (expired and reclaimed by another
+        worker); the caller should stop working on the task.
+        """
+        now = time.time()
+        conn = self._conn()
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE task_registry SET lease_expires_at=?, heartbeat_at=? "
+            "WHERE task_id=? AND status='in_progress' AND lease_owner=?",
+            (now + lease_seconds, now, task_id, self.worker_id),
+        )
+        held = cur.rowcount > 0
+        conn.commit()
+        conn.close()
+        return held
+
+    def release(self, task_id: str) -> bool:
+        """Hand a claimed task back to the queue without counting it as failed"""
+        conn = self._conn()
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE task_registry SET status='pending', lease_owner=NULL, lease_expires_at=NULL "
+            "WHERE task_id=? AND status='in_progress' AND lease_owner=?",
+            (task_id, self.worker_id),
+        )
+        released = cur.rowcount > 0
+        conn.commit()
+        conn.close()
+        return released
+
+    def reclaim_expired(self, workflow_type: Optional[str] = None) -> int:
+        """
+        Count expired leases as failed attempts; returns how many expired.
+
+        claim_batch() already does this for its workflow; this is for sweeps
+        and for reporting how much work was abandoned.
+        """
+        conn = self._conn()
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            reclaimed = self._expire_leases(cur, time.time(), workflow_type)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return reclaimed
+
+    def queue_counts(self, workflow_type: str) -> Dict[str, int]:
+        """Task counts by status for one workflow"""
+        conn = self._conn()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT status, COUNT(*) FROM task_registry WHERE workflow_type=? GROUP BY status",
+            (workflow_type,),
+        )
+        counts = {status: count for status, count in cur.fetchall()}
+        conn.close()
+        return counts
+
+    def dead_letters(self, workflow_type: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Tasks that exhausted their retries or failed permanently, newest first"""
+        query = "SELECT * FROM task_registry WHERE status=?"
+        params: list = [STATUS_DEAD_LETTER]
+        if workflow_type:
+            query += " AND workflow_type=?"
+            params.append(workflow_type)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        conn = self._conn()
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        cur.execute(query, params)
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
+
+    def requeue_dead_letter(self, task_id: str) -> bool:
+        """Give a dead-lettered task a fresh set of attempts (e.g. after a fix)"""
+        conn = self._conn()
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE task_registry SET status='pending', retry_count=0, next_attempt_at=NULL "
+            "WHERE task_id=? AND status=?",
+            (task_id, STATUS_DEAD_LETTER),
+        )
+        requeued = cur.rowcount > 0
+        conn.commit()
+        conn.close()
+        return requeued
+
+    # --- Workflow locks ---------------------------------------------------
+
+    def acquire_lock(self, workflow_type: str, ttl_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """
+        Take the workflow-wide lock (e.g. so only one worker seeds the queue).
 
-    def mark_completed(self, task_id: str, agent_outputs: Dict[str, Any] | None = None) -> None:
+        The lock is granted if it is free, expired, or already held by this
+        worker (which renews it).
+        """
+        now = time.time()
         conn = self._conn()
         cur = conn.cursor()
         cur.execute(
-            "UPDATE task_registry SET status=?, completed_at=?, agent_outputs=? WHERE task_id=?",
-            ("completed", datetime.now().isoformat(), json_dumps(agent_outputs), task_id),
+            """
+            INSERT INTO workflow_locks (workflow_type, locked_by, locked_at, expires_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(workflow_type) DO UPDATE SET
+                locked_by = excluded.locked_by,
+                locked_at = excluded.locked_at,
+                expires_at = excluded.expires_at
+            WHERE workflow_locks.expires_at < ? OR workflow_locks.locked_by = excluded.locked_by
+            """,
+            (workflow_type, self.worker_id, now, now + ttl_seconds, now),
         )
+        acquired = cur.rowcount > 0
         conn.commit()
         conn.close()
+        return acquired
 
-    def mark_failed(self, task_id: str, error_log: str) -> None:
+    def release_lock(self, workflow_type: str) -> None:
         conn = self._conn()
         cur = conn.cursor()
         cur.execute(
-            "UPDATE task_registry SET status=?, error_log=? WHERE task_id=?",
-            ("failed", error_log, task_id),
+            "DELETE FROM workflow_locks WHERE workflow_type=? AND locked_by=?",
+            (workflow_type, self.worker_id),
         )
         conn.commit()
         conn.close()
@@ -99,4 +466,4 @@ def json_dumps(obj: Dict[str, Any] | None) -> str:
         return "{}"
 
 
-__all__ = ["TaskRegistry"]
+__all__ = ["TaskRegistry", "RetryPolicy", "RETRY_POLICIES", "DEFAULT_LEASE_SECONDS", "default_worker_id"]
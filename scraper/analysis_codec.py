@@ -0,0 +1,167 @@
+# analysis_codec.py
+"""
+Compact encoding for comprehensive_analysis payloads
+
+Every analysis blob repeats the same handful of keys and issue codes, so the
+codec interns them to small integers and deflates the result against a shared
+preset dictionary. Encoded values are stored as BLOBs with a magic prefix;
+plain JSON text (the legacy format) is still accepted on read.
+
+The tables below are part of the on-disk format. Never reorder or remove
+entries - add a new FORMAT_VERSION instead.
+"""
+import json
+import zlib
+from typing import Any, Dict, Union
+
+MAGIC = b"RZ"
+FORMAT_VERSION = 1
+
+# Keys produced by ComprehensiveAnalyzer.analyze_comprehensive and the
+# no-website fallbacks in the starter scripts
+KEY_NAMES = (
+    'url', 'analysis_date', 'has_website', 'website_status',
+    'critical_failures', 'critical_issues', 'high_priority_issues',
+    'medium_priority_issues', 'low_priority_issues',
+    'critical_score', 'high_score', 'medium_score', 'low_score',
+    'total_score', 'tier', 'findings',
+    'total_critical_failures', 'total_critical_issues', 'total_high_issues',
+    'total_medium_issues', 'total_low_issues',
+)
+
+# Issue codes emitted by comprehensive_analyzer.py (dynamic codes such as
+# HTTP_ERROR_404 or SLOW_DESKTOP_LOAD_7 are kept as strings)
+ISSUE_CODES = (
+    'NO_WEBSITE', 'INVALID_URL', 'NO_WEBSITE_OR_BROKEN', 'PARSE_ERROR',
+    'PLACEHOLDER_PAGE',
+    'FREE_SUBDOMAIN', 'SOCIAL_MEDIA_ONLY', 'PDF_ONLY_WEBSITE',
+    'NO_SSL_CERTIFICATE', 'DOMAIN_EXPIRING_SOON', 'BROKEN_CORE_PAGES',
+    'SECURITY_WARNINGS', 'NOT_MOBILE_RESPONSIVE', 'MOBILE_LOAD_TIME_EXCESSIVE',
+    'NO_CONTACT_INFORMATION', 'NO_WORKING_CONTACT_FORM', 'NO_BUSINESS_HOURS',
+    'NO_LOCATION_ADDRESS', 'NO_VALUE_PROPOSITION',
+    'UNOPTIMIZED_IMAGES', 'SLOW_SERVER_RESPONSE', 'CONFUSING_NAVIGATION',
+    'POOR_READABILITY', 'UNPROFESSIONAL_DESIGN', 'INCONSISTENT_BRANDING',
+    'OUTDATED_CODE', 'JAVASCRIPT_ERRORS', 'BROKEN_INTERNAL_LINKS',
+    'MISSING_TITLE_TAGS', 'MISSING_META_DESCRIPTIONS', 'POOR_HEADING_STRUCTURE',
+    'NO_SITEMAP', 'NO_ROBOTS_TXT',
+    'OLD_HTTP_VERSION', 'NO_CDN', 'NO_LAZY_LOADING', 'OUTDATED_FRAMEWORKS',
+    'OUTDATED_CONTENT', 'STOCK_PHOTOS_ONLY', 'NO_VIDEO_CONTENT',
+    'NO_TESTIMONIALS', 'NO_PORTFOLIO', 'NO_FAQ', 'NO_STRUCTURED_DATA',
+    'MISSING_IMAGE_ALT_TEXT', 'NO_CLEAR_CTA', 'NO_LIVE_CHAT',
+    'NO_NEWSLETTER_SIGNUP', 'NO_SOCIAL_PROOF', 'NO_CLEAR_PRICING',
+    'NO_PWA', 'NO_DARK_MODE', 'NO_ANIMATIONS', 'BASIC_ACCESSIBILITY',
+    'NO_HEATMAPS', 'NO_AB_TESTING', 'NO_BLOG', 'NO_SOCIAL_INTEGRATION',
+    'NO_API_INTEGRATION',
+)
+
+ISSUE_LIST_KEYS = frozenset((
+    'critical_failures', 'critical_issues', 'high_priority_issues',
+    'medium_priority_issues', 'low_priority_issues',
+))
+
+_KEY_INDEX = {name: i for i, name in enumerate(KEY_NAMES)}
+_ISSUE_INDEX = {code: i for i, code in enumerate(ISSUE_CODES)}
+
+# Interned keys are written as "~<base36 index>"; real keys that happen to
+# start with "~" are escaped as "~~..."
+_KEY_PREFIX = '~'
+
+# Strings that survive interning (values, prefixes, JSON punctuation).
+# zlib favours matches near the end of the dictionary, so the most common
+# fragments go last.
+_ZDICT = (
+    b'HTTP_ERROR_SLOW_DESKTOP_LOAD_error_unreachableinvalid_url'
+    b'no_websiteUNKNOWNTIER_4TIER_3TIER_2TIER_1'
+    b'"https://www.":"accessible",":true,":false,":null,"'
+    b'":0,"~f":{"~g":0,"~h":0,"~i":0,"~j":0,"~k":0},"~e":"TIER_'
+    b'{"~0":"https://","~1":"2025-","~2":true,"~3":"accessible","~4":[],"~5":['
+)
+
+
+def _encode_key(key: str) -> str:
+    index = _KEY_INDEX.get(key)
+    if index is not None:
+        return _KEY_PREFIX + _to_base36(index)
+    if key.startswith(_KEY_PREFIX):
+        return _KEY_PREFIX + key
+    return key
+
+
+def _decode_key(key: str) -> str:
+    if not key.startswith(_KEY_PREFIX):
+        return key
+    if key.startswith(_KEY_PREFIX * 2):
+        return key[1:]
+    return KEY_NAMES[int(key[1:], 36)]
+
+
+def _to_base36(n: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if n == 0:
+            return out
+
+
+def _intern(obj: Any, issue_list: bool = False) -> Any:
+    if isinstance(obj, dict):
+        return {
+            _encode_key(k): _intern(v, issue_list=k in ISSUE_LIST_KEYS)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, list):
+        if issue_list:
+            return [_ISSUE_INDEX.get(v, v) if isinstance(v, str) else [v] for v in obj]
+        return [_intern(v) for v in obj]
+    return obj
+
+
+def _extern(obj: Any, issue_list: bool = False) -> Any:
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            key = _decode_key(k)
+            out[key] = _extern(v, issue_list=key in ISSUE_LIST_KEYS)
+        return out
+    if isinstance(obj, list):
+        if issue_list:
+            # Codes come back from their index; non-string entries were boxed
+            return [ISSUE_CODES[v] if isinstance(v, int) else (v[0] if isinstance(v, list) else v)
+                    for v in obj]
+        return [_extern(v) for v in obj]
+    return obj
+
+
+def encode_analysis(analysis: Dict) -> bytes:
+    """Encode an analysis dict into the compact BLOB format"""
+    payload = json.dumps(_intern(analysis), separators=(',', ':')).encode('utf-8')
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=_ZDICT)
+    return MAGIC + bytes([FORMAT_VERSION]) + compressor.compress(payload) + compressor.flush()
+
+
+def is_encoded(value: Any) -> bool:
+    """True if a stored column value uses the compact format"""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:2]) == MAGIC
+
+
+def decode_analysis(value: Union[str, bytes, None]) -> Dict:
+    """Decode a stored comprehensive_analysis value (compact BLOB or JSON text)"""
+    if value is None:
+        return {}
+    if not is_encoded(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value).decode('utf-8')
+        return json.loads(value) if value else {}
+
+    raw = bytes(value)
+    version = raw[2]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported analysis encoding version: {version}")
+    decompressor = zlib.decompressobj(-15, zdict=_ZDICT)
+    payload = decompressor.decompress(raw[3:]) + decompressor.flush()
+    return _extern(json.loads(payload))
+
+
+__all__ = ["encode_analysis", "decode_analysis", "is_encoded", "FORMAT_VERSION"]
@@ -24,6 +24,7 @@ console = Console()
 class BusinessFinderApp:
     def __init__(self):
         self.db = BusinessDatabase()
+        self.db.start_load_snapshots()
         self.scraper = MultiAPIScraper()  # Use multi-API scraper with fallback
         self.analyzer = WebsiteAnalyzer()
         self.email_finder = EmailFinder(config.HUNTER_API_KEY)
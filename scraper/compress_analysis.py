@@ -0,0 +1,138 @@
+# compress_analysis.py
+"""
+Migrate comprehensive_analysis payloads to (or from) the compact codec format
+and report the size and latency impact.
+
+Usage:
+    python compress_analysis.py                    # encode all JSON rows
+    python compress_analysis.py --decompress       # back to plain JSON text
+    python compress_analysis.py --report-only      # measure without writing
+    python compress_analysis.py --vacuum           # reclaim freed pages afterwards
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from analysis_codec import encode_analysis, decode_analysis, is_encoded
+
+
+def _iter_batches(conn, batch_size: int):
+    """Walk businesses by id so each batch is an index range scan"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            'SELECT id, comprehensive_analysis FROM businesses WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def migrate_analysis(db_path: str = "businesses.db", decompress: bool = False,
+                     report_only: bool = False, vacuum: bool = False,
+                     batch_size: int = 500) -> dict:
+    """Re-encode every comprehensive_analysis value and return a size/latency report"""
+    report = {
+        'rows_scanned': 0,
+        'rows_encoded': 0,
+        'rows_converted': 0,
+        'bytes_before': 0,
+        'bytes_after': 0,
+        'json_decode_us': 0.0,
+        'codec_decode_us': 0.0,
+        'encode_us': 0.0,
+        'file_bytes_before': os.path.getsize(db_path) if os.path.exists(db_path) else 0,
+    }
+
+    conn = sqlite3.connect(db_path)
+    for rows in _iter_batches(conn, batch_size):
+        updates = []
+        for row_id, value in rows:
+            report['rows_scanned'] += 1
+            if value in (None, '', '{}'):
+                continue
+            report['rows_encoded'] += 1
+            size = len(value) if isinstance(value, (bytes, str)) else 0
+            report['bytes_before'] += size
+
+            converting = is_encoded(value) == decompress
+
+            start = time.perf_counter()
+            analysis = decode_analysis(value)
+            elapsed = (time.perf_counter() - start) * 1e6
+            report['codec_decode_us' if is_encoded(value) else 'json_decode_us'] += elapsed
+
+            start = time.perf_counter()
+            new_value = json.dumps(analysis) if decompress else encode_analysis(analysis)
+            report['encode_us'] += (time.perf_counter() - start) * 1e6
+
+            if converting:
+                # Time the read path of the target format too, so both decode
+                # columns are comparable whichever way we migrate
+                start = time.perf_counter()
+                decode_analysis(new_value)
+                elapsed = (time.perf_counter() - start) * 1e6
+                report['json_decode_us' if decompress else 'codec_decode_us'] += elapsed
+
+            report['bytes_after'] += len(new_value)
+            if converting:
+                updates.append((new_value, row_id))
+
+        report['rows_converted'] += len(updates)
+        if updates and not report_only:
+            conn.executemany('UPDATE businesses SET comprehensive_analysis = ? WHERE id = ?', updates)
+            conn.commit()
+
+    if vacuum and not report_only:
+        conn.execute('VACUUM')
+    conn.close()
+
+    report['file_bytes_after'] = os.path.getsize(db_path) if os.path.exists(db_path) else 0
+    return report
+
+
+def print_report(report: dict, decompress: bool = False):
+    # Averages are over payloads actually encoded, not empty rows
+    rows = max(1, report['rows_encoded'])
+    before, after = report['bytes_before'], report['bytes_after']
+    ratio = (before / after) if after else 0
+
+    print("\nComprehensive analysis storage report")
+    print("=" * 50)
+    print(f"Rows scanned:       {report['rows_scanned']}")
+    print(f"Rows encoded:       {report['rows_encoded']}")
+    print(f"Rows converted:     {report['rows_converted']}")
+    print(f"Payload bytes:      {before:,} -> {after:,} ({ratio:.1f}x)")
+    print(f"Avg payload:        {before / rows:.0f} B -> {after / rows:.0f} B")
+    print(f"Encode latency:     {report['encode_us'] / rows:.1f} µs/row "
+          f"({'json' if decompress else 'codec'})")
+    print(f"JSON decode:        {report['json_decode_us'] / rows:.1f} µs/row")
+    print(f"Codec decode:       {report['codec_decode_us'] / rows:.1f} µs/row")
+    print(f"DB file size:       {report['file_bytes_before']:,} -> {report['file_bytes_after']:,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact comprehensive_analysis storage migration")
+    parser.add_argument("--db", default="businesses.db", help="Path to the SQLite database")
+    parser.add_argument("--decompress", action="store_true", help="Convert back to plain JSON text")
+    parser.add_argument("--report-only", action="store_true", help="Measure without writing changes")
+    parser.add_argument("--vacuum", action="store_true", help="Run VACUUM afterwards to shrink the file")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    args = parser.parse_args()
+
+    report = migrate_analysis(
+        args.db,
+        decompress=args.decompress,
+        report_only=args.report_only,
+        vacuum=args.vacuum,
+        batch_size=args.batch_size,
+    )
+    print_report(report, decompress=args.decompress)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,26 @@ import json
 from datetime import datetime
 import sqlite3
 from pathlib import Path
+from urllib.parse import urlencode
+
+from database import BusinessDatabase, decode_cursor, next_cursor
 
 app = Flask(__name__)
 
+_business_db = None
+
 def get_db_connection():
     conn = sqlite3.connect('businesses.db')
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_business_db() -> BusinessDatabase:
+    """Shared BusinessDatabase (schema, search index) created on first use"""
+    global _business_db
+    if _business_db is None:
+        _business_db = BusinessDatabase('businesses.db')
+    return _business_db
+
 @app.route('/')
 def index():
     return render_template('dashboard.html')
@@ -104,48 +116,55 @@ def get_stats():
     
     return jsonify(stats)
 
+# Score ranges per lead type: (min lead_score, max lead_score)
+LEAD_SCORE_RANGES = {
+    'high': (70, None),
+    'medium': (40, 69),
+    'all': (None, None),
+}
+
+# Lead listings are keyset-paginated in their display order
+LEAD_CURSOR_KEYS = ('lead_score', 'website_score', 'id')
+
+# Lower bound for a keyset tuple, used to clamp cursors to a range maximum
+MIN_KEY = -(2 ** 63)
+
 @app.route('/api/leads')
 def get_leads():
     lead_type = request.args.get('type', 'high', type=str)  # high, medium, low, niche
     limit = request.args.get('limit', 50, type=int)
+    page_cursor = request.args.get('cursor', type=str)
+    
+    after = None
+    if page_cursor:
+        try:
+            after = decode_cursor(page_cursor, len(LEAD_CURSOR_KEYS))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    if lead_type == 'high':
-        # High priority leads (lead_score >= 70)
-        cursor.execute('''
-            SELECT name, website, website_score, lead_score, priority, 
-                   category, mobile_friendly, has_ssl, needs_redesign,
-                   has_contact_form, phone, email, locality
-            FROM businesses 
-            WHERE lead_score >= 70
-            AND is_active = TRUE
-            ORDER BY lead_score DESC, website_score DESC
-            LIMIT ?
-        ''', (limit,))
-    
-    elif lead_type == 'medium':
-        # Medium priority leads
-        cursor.execute('''
-            SELECT name, website, website_score, lead_score, priority,
-                   category, mobile_friendly, has_ssl, needs_redesign,
-                   has_contact_form, phone, email, locality
-            FROM businesses 
-            WHERE lead_score BETWEEN 40 AND 69
-            AND is_active = TRUE
-            ORDER BY lead_score DESC, website_score DESC
-            LIMIT ?
-        ''', (limit,))
-    
-    elif lead_type == 'niche':
-        # Niche opportunities: high-quality leads in underserved categories
-        cursor.execute('''
-            SELECT b.name, b.website, b.website_score, b.lead_score, b.priority,
+    if lead_type == 'niche':
+        # Niche opportunities: high-quality leads in underserved categories.
+        # category_count comes from a grouped join rather than a window so
+        # it does not change from page to page.
+        keyset, params = '', []
+        if after:
+            keyset = 'AND (b.lead_score, b.website_score, b.id) < (?, ?, ?)'
+            params.extend(after)
+        params.append(limit)
+        cursor.execute(f'''
+            SELECT b.id, b.name, b.website, b.website_score, b.lead_score, b.priority,
                    b.category, b.mobile_friendly, b.has_ssl, b.needs_redesign,
                    b.has_contact_form, b.phone, b.email, b.locality,
-                   COUNT(*) OVER (PARTITION BY b.category) as category_count
+                   c.category_count
             FROM businesses b
+            JOIN (
+                SELECT category, COUNT(*) as category_count FROM businesses
+                WHERE lead_score >= 60 AND is_active = TRUE
+                GROUP BY category
+            ) c ON c.category = b.category
             WHERE b.lead_score >= 60
             AND b.is_active = TRUE
             AND b.category IN (
@@ -154,21 +173,40 @@ def get_leads():
                 GROUP BY category 
                 HAVING COUNT(*) BETWEEN 1 AND 10
             )
-            ORDER BY b.lead_score DESC, b.website_score DESC
+            {keyset}
+            ORDER BY b.lead_score DESC, b.website_score DESC, b.id DESC
             LIMIT ?
-        ''', (limit,))
+        ''', params)
     
     else:
-        # All leads
-        cursor.execute('''
-            SELECT name, website, website_score, lead_score, priority,
+        # high / medium / all (anything unknown lists all leads)
+        min_score, max_score = LEAD_SCORE_RANGES.get(lead_type, LEAD_SCORE_RANGES['all'])
+        conditions, params = ['is_active = TRUE'], []
+        if min_score is not None:
+            conditions.append('lead_score >= ?')
+            params.append(min_score)
+        if after:
+            # The cursor replaces the range maximum: SQLite can only seek on
+            # one upper bound, and it must be the keyset one for page N to
+            # cost the same as page 1.
+            if max_score is not None and after[0] > max_score:
+                after = [max_score + 1, MIN_KEY, MIN_KEY]
+            conditions.append('(lead_score, website_score, id) < (?, ?, ?)')
+            params.extend(after)
+        elif max_score is not None:
+            conditions.append('lead_score <= ?')
+            params.append(max_score)
+        params.append(limit)
+        
+        cursor.execute(f'''
+            SELECT id, name, website, website_score, lead_score, priority, 
                    category, mobile_friendly, has_ssl, needs_redesign,
                    has_contact_form, phone, email, locality
             FROM businesses 
-            WHERE is_active = TRUE
-            ORDER BY lead_score DESC, website_score DESC
+            WHERE {' AND '.join(conditions)}
+            ORDER BY lead_score DESC, website_score DESC, id DESC
             LIMIT ?
-        ''', (limit,))
+        ''', params)
     
     leads = []
     for row in cursor.fetchall():
@@ -193,7 +231,39 @@ def get_leads():
     
     conn.close()
     
-    return jsonify(leads)
+    response = jsonify(leads)
+    following = next_cursor(leads, LEAD_CURSOR_KEYS, limit)
+    if following:
+        # Body stays a plain list; the next page is advertised in headers
+        response.headers['X-Next-Cursor'] = following
+        query = urlencode({'type': lead_type, 'limit': limit, 'cursor': following})
+        response.headers['Link'] = f'</api/leads?{query}>; rel="next"'
+    return response
+
+@app.route('/api/search')
+def search_leads():
+    query = request.args.get('q', '', type=str)
+    category = request.args.get('category', type=str)
+    locality = request.args.get('locality', type=str)
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    
+    results = get_business_db().search_businesses(
+        query=query,
+        category=category,
+        locality=locality,
+        limit=limit
+    )
+    
+    fields = ('id', 'name', 'category', 'locality', 'address', 'website',
+              'lead_score', 'website_score', 'priority', 'phone', 'email')
+    matches = []
+    for row in results:
+        match = {field: row.get(field) for field in fields}
+        if 'search_rank' in row:
+            match['rank'] = round(-row['search_rank'], 3)
+        matches.append(match)
+    
+    return jsonify(matches)
 
 @app.route('/api/export')
 def export_data():
@@ -1,15 +1,181 @@
 # database.py
 import sqlite3
 from datetime import datetime, timedelta
+import base64
 import json
-from typing import List, Dict, Optional
+import math
+import os
+import re
+from typing import Callable, List, Dict, Optional, Sequence
 import hashlib
 
+from analysis_codec import encode_analysis, decode_analysis, is_encoded
+import load_counters
+
+# Managed composite/partial indexes for the lead listing queries in
+# dashboard.py and BusinessDatabase. Partial index predicates must match the
+# query text (e.g. "is_active = TRUE") for SQLite to use them.
+LEAD_INDEXES = [
+    # /api/leads: lead_score range + is_active, ORDER BY lead_score DESC, website_score DESC
+    ('idx_businesses_active_lead_score',
+     'CREATE INDEX IF NOT EXISTS idx_businesses_active_lead_score '
+     'ON businesses(lead_score, website_score) WHERE is_active = TRUE'),
+    # get_businesses_by_tier: tier + open leads, ORDER BY lead_score DESC
+    ('idx_businesses_open_tier_lead_score',
+     'CREATE INDEX IF NOT EXISTS idx_businesses_open_tier_lead_score '
+     'ON businesses(tier, lead_score) WHERE is_active = TRUE AND is_contacted = FALSE'),
+    # get_businesses_by_score: website_score threshold + open leads
+    ('idx_businesses_open_website_score',
+     'CREATE INDEX IF NOT EXISTS idx_businesses_open_website_score '
+     'ON businesses(website_score) WHERE is_active = TRUE AND is_contacted = FALSE'),
+    # /api/stats and niche leads: GROUP BY category over lead_score (covering)
+    ('idx_businesses_category_lead_score',
+     'CREATE INDEX IF NOT EXISTS idx_businesses_category_lead_score '
+     'ON businesses(category, lead_score)'),
+]
+
+# Full-text index over the searchable business columns. It is an external
+# content table (the text lives only in businesses) kept in sync by triggers;
+# the update trigger only fires when a searched column actually changes.
+FTS_COLUMNS = ('name', 'category', 'locality', 'address', 'website')
+
+# bm25 column weights, in FTS_COLUMNS order
+FTS_WEIGHTS = (10.0, 4.0, 3.0, 1.0, 2.0)
+
+FTS_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS businesses_fts USING fts5(
+        name, category, locality, address, website,
+        content='businesses', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS businesses_fts_ai AFTER INSERT ON businesses BEGIN
+        INSERT INTO businesses_fts(rowid, name, category, locality, address, website)
+        VALUES (new.id, new.name, new.category, new.locality, new.address, new.website);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS businesses_fts_ad AFTER DELETE ON businesses BEGIN
+        INSERT INTO businesses_fts(businesses_fts, rowid, name, category, locality, address, website)
+        VALUES ('delete', old.id, old.name, old.category, old.locality, old.address, old.website);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS businesses_fts_au AFTER UPDATE OF name, category, locality, address, website
+    ON businesses
+    WHEN old.name IS NOT new.name OR old.category IS NOT new.category
+      OR old.locality IS NOT new.locality OR old.address IS NOT new.address
+      OR old.website IS NOT new.website
+    BEGIN
+        INSERT INTO businesses_fts(businesses_fts, rowid, name, category, locality, address, website)
+        VALUES ('delete', old.id, old.name, old.category, old.locality, old.address, old.website);
+        INSERT INTO businesses_fts(rowid, name, category, locality, address, website)
+        VALUES (new.id, new.name, new.category, new.locality, new.address, new.website);
+    END''',
+]
+
+
+def build_fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query: every word quoted and prefix-matched"""
+    terms = re.findall(r'\w+', text or '')
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+# R-tree over business coordinates (degenerate boxes: min == max). The B-tree
+# on (latitude, longitude) can only range-scan latitude, the R-tree prunes
+# both axes. Coordinates are stored as float32 and rounded outwards, so
+# candidates are always post-filtered with exact haversine distance.
+RTREE_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS businesses_rtree USING rtree(
+        id, min_lat, max_lat, min_lng, max_lng
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS businesses_rtree_ai AFTER INSERT ON businesses
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT OR REPLACE INTO businesses_rtree VALUES
+            (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS businesses_rtree_ad AFTER DELETE ON businesses BEGIN
+        DELETE FROM businesses_rtree WHERE id = old.id;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS businesses_rtree_au AFTER UPDATE OF latitude, longitude ON businesses
+    WHEN old.latitude IS NOT new.latitude OR old.longitude IS NOT new.longitude BEGIN
+        DELETE FROM businesses_rtree WHERE id = old.id;
+        INSERT INTO businesses_rtree
+            SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END''',
+]
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lng: float, radius_m: float) -> tuple:
+    """Bounding box (min_lat, min_lng, max_lat, max_lng) enclosing a circle"""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+    if max_lat >= 90.0 or min_lat <= -90.0 or cos_lat <= 1e-12:
+        # Circle covers a pole: every longitude is in range
+        return min_lat, -180.0, max_lat, 180.0
+    dlng = min(180.0, math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)))
+    return min_lat, lng - dlng, max_lat, lng + dlng
+
+
+# Keyset columns for the paginated listing methods (see next_cursor)
+TIER_CURSOR_KEYS = ('lead_score', 'id')
+SCORE_CURSOR_KEYS = ('website_score', 'id')
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode keyset values (e.g. lead_score, id) as an opaque page cursor"""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    """Decode a page cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def next_cursor(rows: List[Dict], keys: Sequence[str], limit: int) -> Optional[str]:
+    """Cursor for the page after rows, or None if this was the last page"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor([last[k] for k in keys])
+
+
 class BusinessDatabase:
-    def __init__(self, db_path: str = "businesses.db"):
+    def __init__(self, db_path: str = "businesses.db", compress_analysis: Optional[bool] = None):
         self.db_path = db_path
+        # Store comprehensive_analysis in the compact codec format (opt-in)
+        if compress_analysis is None:
+            compress_analysis = os.getenv("COMPRESS_ANALYSIS", "0") == "1"
+        self.compress_analysis = compress_analysis
         self.init_database()
     
+    def start_load_snapshots(self, interval: float = load_counters.SNAPSHOT_INTERVAL):
+        """
+        Publish this process's load counters to fatigue_metrics for FatigueMonitor.
+        
+        Starts a background writer (once per database path), so only
+        long-running entry points should call it, not per-request instances.
+        """
+        load_counters.start_snapshots(self.db_path, interval)
+    
     def init_database(self):
         """Initialize database with all required tables"""
         conn = sqlite3.connect(self.db_path)
@@ -125,10 +291,71 @@ class BusinessDatabase:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_businesses_category ON businesses(category)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_businesses_location ON businesses(latitude, longitude)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_locations_hash ON locations(location_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scraping_jobs_cell ON scraping_jobs(location_hash, category_id, status, completed_at)')
+        self.ensure_indexes(cursor)
+        self.fts_enabled = self._ensure_fts(cursor)
+        self.rtree_enabled = self._ensure_rtree(cursor)
         
         conn.commit()
         conn.close()
     
+    def ensure_indexes(self, cursor: Optional[sqlite3.Cursor] = None) -> List[str]:
+        """Create the managed lead indexes if missing (idempotent), returns index names"""
+        own_conn = cursor is None
+        if own_conn:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+        
+        for _, ddl in LEAD_INDEXES:
+            cursor.execute(ddl)
+        
+        if own_conn:
+            conn.commit()
+            conn.close()
+        return [name for name, _ in LEAD_INDEXES]
+    
+    def _ensure_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """Create the FTS5 index and sync triggers, backfilling on first creation"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'businesses_fts'")
+        existed = cursor.fetchone() is not None
+        try:
+            for ddl in FTS_SCHEMA:
+                cursor.execute(ddl)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: search falls back to LIKE scans
+            print(f"Full-text search unavailable: {e}")
+            return False
+        if not existed:
+            cursor.execute("INSERT INTO businesses_fts(businesses_fts) VALUES ('rebuild')")
+        return True
+    
+    def _ensure_rtree(self, cursor: sqlite3.Cursor) -> bool:
+        """Create the spatial R-tree and sync triggers, backfilling on first creation"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'businesses_rtree'")
+        existed = cursor.fetchone() is not None
+        try:
+            for ddl in RTREE_SCHEMA:
+                cursor.execute(ddl)
+        except sqlite3.OperationalError as e:
+            # SQLite built without R*Tree: spatial queries use the lat/lng B-tree
+            print(f"Spatial index unavailable: {e}")
+            return False
+        if not existed:
+            cursor.execute('''
+            INSERT OR REPLACE INTO businesses_rtree
+            SELECT id, latitude, latitude, longitude, longitude FROM businesses
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ''')
+        return True
+    
+    def rebuild_search_index(self):
+        """Rebuild the FTS index from the businesses table"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO businesses_fts(businesses_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO businesses_fts(businesses_fts) VALUES ('optimize')")
+        conn.commit()
+        conn.close()
+    
     def add_business(self, business_data: Dict) -> bool:
         """Add or update a business in the database"""
         try:
@@ -196,6 +423,7 @@ class BusinessDatabase:
             
             conn.commit()
             conn.close()
+            load_counters.record(load_counters.db_write_metric())
             return True
             
         except Exception as e:
@@ -235,7 +463,7 @@ class BusinessDatabase:
             '''
             
             params = (
-                json.dumps(analysis),
+                self._encode_analysis(analysis),
                 analysis.get('has_website', False),
                 analysis.get('website_status', 'unknown'),
                 tier,
@@ -254,10 +482,45 @@ class BusinessDatabase:
             cursor.execute(query, params)
             conn.commit()
             conn.close()
+            load_counters.record(load_counters.db_write_metric())
             
         except Exception as e:
             print(f"Error updating comprehensive analysis: {e}")
     
+    def get_business(self, fsq_id: str) -> Optional[Dict]:
+        """Get one business by Foursquare ID"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM businesses WHERE fsq_id = ?', (fsq_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._row_to_dict(row) if row else None
+
+    def get_comprehensive_analysis(self, fsq_id: str) -> Optional[Dict]:
+        """Get the decoded comprehensive analysis for a business"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT comprehensive_analysis FROM businesses WHERE fsq_id = ?', (fsq_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        return decode_analysis(row[0])
+    
+    def _encode_analysis(self, analysis: Dict):
+        """Serialize an analysis dict for the comprehensive_analysis column"""
+        if self.compress_analysis:
+            return encode_analysis(analysis)
+        return json.dumps(analysis)
+    
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict:
+        """Convert a businesses row, expanding compact analysis blobs back to JSON text"""
+        data = dict(row)
+        if is_encoded(data.get('comprehensive_analysis')):
+            data['comprehensive_analysis'] = json.dumps(decode_analysis(data['comprehensive_analysis']))
+        return data
+    
     def update_website_analysis(self, fsq_id: str, analysis: Dict):
         """Update business with website analysis results (legacy)"""
         try:
@@ -301,6 +564,7 @@ class BusinessDatabase:
             cursor.execute(query, params)
             conn.commit()
             conn.close()
+            load_counters.record(load_counters.db_write_metric())
             
         except Exception as e:
             print(f"Error updating analysis: {e}")
@@ -362,44 +626,447 @@ class BusinessDatabase:
         
         return min(score, 100)
     
-    def get_businesses_by_tier(self, tier: int = 1, limit: int = 100) -> List[Dict]:
-        """Get businesses by tier"""
+    def get_businesses_by_tier(self, tier: int = 1, limit: int = 100,
+                               after: Optional[str] = None) -> List[Dict]:
+        """Get businesses by tier
+        
+        Pages are keyset-paginated on (lead_score, id): pass the cursor from
+        next_cursor(rows, TIER_CURSOR_KEYS, limit) as `after` for the next page.
+        """
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        cursor.execute('''
+        keyset, params = '', [tier]
+        if after:
+            keyset = 'AND (lead_score, id) < (?, ?)'
+            params.extend(decode_cursor(after, 2))
+        params.append(limit)
+        
+        cursor.execute(f'''
         SELECT * FROM businesses 
         WHERE tier = ? 
         AND is_active = TRUE 
         AND is_contacted = FALSE
-        ORDER BY lead_score DESC 
+        {keyset}
+        ORDER BY lead_score DESC, id DESC 
         LIMIT ?
-        ''', (tier, limit))
+        ''', params)
         
-        results = [dict(row) for row in cursor.fetchall()]
+        results = [self._row_to_dict(row) for row in cursor.fetchall()]
         conn.close()
         return results
     
-    def get_businesses_by_score(self, min_score: int = 50, limit: int = 100) -> List[Dict]:
-        """Get businesses with website score above threshold"""
+    def get_businesses_by_score(self, min_score: int = 50, limit: int = 100,
+                                after: Optional[str] = None) -> List[Dict]:
+        """Get businesses with website score above threshold
+        
+        Keyset-paginated on (website_score, id), see SCORE_CURSOR_KEYS.
+        """
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        cursor.execute('''
+        keyset, params = '', [min_score]
+        if after:
+            keyset = 'AND (website_score, id) < (?, ?)'
+            params.extend(decode_cursor(after, 2))
+        params.append(limit)
+        
+        cursor.execute(f'''
         SELECT * FROM businesses 
         WHERE website_score >= ? 
         AND is_active = TRUE 
         AND is_contacted = FALSE
-        ORDER BY website_score DESC 
+        {keyset}
+        ORDER BY website_score DESC, id DESC 
         LIMIT ?
-        ''', (min_score, limit))
+        ''', params)
+        
+        results = [self._row_to_dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return results
+    
+    def search_businesses(self, query: Optional[str] = None, category: Optional[str] = None,
+                          locality: Optional[str] = None, has_website: Optional[bool] = None,
+                          limit: int = 50) -> List[Dict]:
+        """Full-text search over name, category, locality, address and website
+        
+        Every word is prefix-matched; category/locality narrow the match to
+        those columns. Results are ranked by bm25 (name matches weigh most),
+        or by lead_score when only has_website is given.
+        """
+        match_parts = []
+        if query and build_fts_query(query):
+            match_parts.append(f'({build_fts_query(query)})')
+        if category and build_fts_query(category):
+            match_parts.append(f'category : ({build_fts_query(category)})')
+        if locality and build_fts_query(locality):
+            match_parts.append(f'locality : ({build_fts_query(locality)})')
+        
+        website_filter = ''
+        if has_website is True:
+            website_filter = "AND b.website IS NOT NULL AND b.website != ''"
+        elif has_website is False:
+            website_filter = "AND (b.website IS NULL OR b.website = '')"
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        if match_parts and self.fts_enabled:
+            weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+            cursor.execute(f'''
+            SELECT b.*, bm25(businesses_fts, {weights}) AS search_rank
+            FROM businesses_fts
+            JOIN businesses b ON b.id = businesses_fts.rowid
+            WHERE businesses_fts MATCH ?
+            {website_filter}
+            ORDER BY search_rank
+            LIMIT ?
+            ''', (' AND '.join(match_parts), limit))
+        elif match_parts:
+            # No FTS5 available: substring scan over the same columns
+            conditions, params = [], []
+            for term in re.findall(r'\w+', query or ''):
+                conditions.append('(' + ' OR '.join(f'b.{col} LIKE ?' for col in FTS_COLUMNS) + ')')
+                params.extend([f'%{term}%'] * len(FTS_COLUMNS))
+            if category:
+                conditions.append('b.category LIKE ?')
+                params.append(f'%{category}%')
+            if locality:
+                conditions.append('b.locality LIKE ?')
+                params.append(f'%{locality}%')
+            params.append(limit)
+            cursor.execute(f'''
+            SELECT b.* FROM businesses b
+            WHERE {' AND '.join(conditions) or '1'}
+            {website_filter}
+            ORDER BY b.lead_score DESC, b.id DESC
+            LIMIT ?
+            ''', params)
+        else:
+            cursor.execute(f'''
+            SELECT b.* FROM businesses b
+            WHERE 1 = 1
+            {website_filter}
+            ORDER BY b.lead_score DESC, b.id DESC
+            LIMIT ?
+            ''', (limit,))
+        
+        results = [self._row_to_dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return results
+    
+    def find_in_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+                     limit: Optional[int] = None) -> List[Dict]:
+        """Get businesses inside a lat/lng bounding box
+        
+        A box with min_lng > max_lng wraps across the antimeridian.
+        """
+        if min_lng > max_lng:
+            boxes = [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+        else:
+            boxes = [(min_lat, min_lng, max_lat, max_lng)]
+        
+        results = []
+        for box in boxes:
+            results.extend(self._query_box(*box))
+        # R-tree boxes are rounded outwards; apply the exact bounds
+        results = [
+            r for r in results
+            if min_lat <= r['latitude'] <= max_lat
+            and (min_lng <= r['longitude'] <= max_lng if min_lng <= max_lng
+                 else r['longitude'] >= min_lng or r['longitude'] <= max_lng)
+        ]
+        return results[:limit] if limit else results
+    
+    def find_within(self, lat: float, lng: float, radius_m: float,
+                    limit: Optional[int] = None) -> List[Dict]:
+        """Get businesses within radius_m metres, nearest first
+        
+        Each result carries its exact haversine distance as distance_m.
+        """
+        return self._find_within(lat, lng, radius_m, limit)
+    
+    def _find_within(self, lat: float, lng: float, radius_m: float, limit: Optional[int] = None,
+                     where: str = '', params: tuple = ()) -> List[Dict]:
+        """find_within() with an extra SQL predicate on businesses b"""
+        min_lat, min_lng, max_lat, max_lng = radius_bbox(lat, lng, radius_m)
+        boxes = [(min_lat, min_lng, max_lat, max_lng)]
+        if min_lng < -180.0:
+            boxes = [(min_lat, -180.0, max_lat, max_lng), (min_lat, min_lng + 360.0, max_lat, 180.0)]
+        elif max_lng > 180.0:
+            boxes = [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng - 360.0)]
+        
+        results = []
+        seen = set()
+        for box in boxes:
+            for row in self._query_box(*box, where=where, params=params,
+                                       near=(lat, lng) if limit else None, limit=limit):
+                if row['id'] in seen:
+                    continue
+                seen.add(row['id'])
+                distance = haversine_m(lat, lng, row['latitude'], row['longitude'])
+                if distance <= radius_m:
+                    row['distance_m'] = round(distance, 1)
+                    results.append(row)
+        
+        results.sort(key=lambda r: r['distance_m'])
+        return results[:limit] if limit else results
+    
+    def find_nearest(self, lat: float, lng: float, k: int = 5,
+                     max_radius_m: float = 50000) -> List[Dict]:
+        """Get the k nearest businesses, widening the search radius as needed"""
+        radius = min(250.0, max_radius_m)
+        while True:
+            results = self.find_within(lat, lng, radius, limit=k)
+            if len(results) >= k or radius >= max_radius_m:
+                return results
+            radius = min(radius * 4, max_radius_m)
+    
+    def find_duplicate_candidates(self, business_data: Dict, radius_m: float = 75) -> List[Dict]:
+        """Get stored businesses close enough to business_data to be the same place
+        
+        Intended as the candidate step of a dedupe pass; callers compare
+        names/phones on the (few) returned rows.
+        """
+        lat, lng = business_data.get('latitude'), business_data.get('longitude')
+        if lat is None or lng is None:
+            return []
+        fsq_id = business_data.get('fsq_id')
+        return [
+            row for row in self.find_within(lat, lng, radius_m)
+            if not fsq_id or row.get('fsq_id') != fsq_id
+        ]
+    
+    def _query_box(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+                   where: str = '', params: tuple = (), near: Optional[tuple] = None,
+                   limit: Optional[int] = None) -> List[Dict]:
+        """Candidate rows overlapping a box (no antimeridian handling)
+        
+        where/params add a predicate on businesses b. With near=(lat, lng)
+        and a limit, rows come back in approximate distance order (scaled
+        equirectangular) so the LIMIT keeps the closest candidates.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        if self.rtree_enabled:
+            sql = '''
+            SELECT b.* FROM businesses_rtree r
+            JOIN businesses b ON b.id = r.id
+            WHERE r.max_lat >= ? AND r.min_lat <= ?
+            AND r.max_lng >= ? AND r.min_lng <= ?
+            '''
+            args = [min_lat, max_lat, min_lng, max_lng]
+        else:
+            sql = '''
+            SELECT b.* FROM businesses b
+            WHERE b.latitude BETWEEN ? AND ?
+            AND b.longitude BETWEEN ? AND ?
+            '''
+            args = [min_lat, max_lat, min_lng, max_lng]
+        if where:
+            sql += f' AND {where}'
+            args.extend(params)
+        if near and limit:
+            lat, lng = near
+            # Shift the reference longitude onto this box's side of the antimeridian
+            if lng > max_lng:
+                lng -= 360.0
+            elif lng < min_lng:
+                lng += 360.0
+            scale = math.cos(math.radians(lat)) ** 2
+            sql += '''
+            ORDER BY (b.latitude - ?) * (b.latitude - ?) + (b.longitude - ?) * (b.longitude - ?) * ?
+            LIMIT ?
+            '''
+            args.extend([lat, lat, lng, lng, scale, limit])
         
-        results = [dict(row) for row in cursor.fetchall()]
+        cursor.execute(sql, args)
+        results = [self._row_to_dict(row) for row in cursor.fetchall()]
         conn.close()
         return results
     
+    # ----- Scrape ledger (locations + scraping_jobs) -----
+    
+    @staticmethod
+    def location_hash(city: str, country: Optional[str] = None, radius: int = 5000) -> str:
+        """Stable key for a scrape location"""
+        key = f"{city.strip().lower()}|{(country or '').strip().lower()}|{radius}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def record_location(self, city: str, country: Optional[str] = None,
+                        latitude: Optional[float] = None, longitude: Optional[float] = None,
+                        radius: int = 5000) -> str:
+        """Register a scrape location (idempotent), returns its location_hash"""
+        location_hash = self.location_hash(city, country, radius)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        INSERT OR IGNORE INTO locations (location_hash, city, country, latitude, longitude, radius)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (location_hash, city, country, latitude, longitude, radius))
+        conn.execute('''
+        UPDATE locations SET latitude = COALESCE(?, latitude), longitude = COALESCE(?, longitude)
+        WHERE location_hash = ?
+        ''', (latitude, longitude, location_hash))
+        conn.commit()
+        conn.close()
+        return location_hash
+    
+    def get_location(self, location_hash: str) -> Optional[Dict]:
+        """Get a scrape location by hash"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        row = conn.execute('SELECT * FROM locations WHERE location_hash = ?', (location_hash,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+    
+    def get_fresh_categories(self, location_hash: str, categories: List[str],
+                             max_age_hours: float = 168) -> set:
+        """Categories whose last completed job for this location is still fresh"""
+        if not categories:
+            return set()
+        conn = sqlite3.connect(self.db_path)
+        placeholders = ', '.join('?' for _ in categories)
+        rows = conn.execute(f'''
+        SELECT DISTINCT category_id FROM scraping_jobs
+        WHERE location_hash = ?
+        AND category_id IN ({placeholders})
+        AND status = 'completed'
+        AND completed_at >= datetime('now', ?)
+        ''', (location_hash, *categories, f'-{max_age_hours} hours')).fetchall()
+        conn.close()
+        return {row[0] for row in rows}
+    
+    def start_scraping_job(self, location_hash: str, category: str) -> int:
+        """Record a (location, category) scrape as in progress, returns the job id"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+        INSERT INTO scraping_jobs (location_hash, category_id, status, started_at)
+        VALUES (?, ?, 'in_progress', CURRENT_TIMESTAMP)
+        ''', (location_hash, category))
+        job_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return job_id
+    
+    def finish_scraping_job(self, job_id: int, businesses_found: int):
+        """Mark a scrape job completed"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        UPDATE scraping_jobs SET status = 'completed', businesses_found = ?,
+            completed_at = CURRENT_TIMESTAMP, error_message = NULL
+        WHERE id = ?
+        ''', (businesses_found, job_id))
+        conn.commit()
+        conn.close()
+    
+    def fail_scraping_job(self, job_id: int, error: str):
+        """Mark a scrape job failed (it will be retried on the next run)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        UPDATE scraping_jobs SET status = 'failed', completed_at = CURRENT_TIMESTAMP,
+            error_message = ?
+        WHERE id = ?
+        ''', (error[:1000], job_id))
+        conn.commit()
+        conn.close()
+    
+    def complete_location(self, location_hash: str, max_age_hours: float = 168):
+        """Mark a location swept and schedule its next scrape"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        UPDATE locations SET
+            last_scraped = CURRENT_TIMESTAMP,
+            next_scrape = datetime('now', ?),
+            is_completed = TRUE,
+            total_businesses = (
+                SELECT COALESCE(SUM(businesses_found), 0) FROM scraping_jobs j
+                WHERE j.location_hash = locations.location_hash
+                AND j.status = 'completed'
+                AND j.id IN (
+                    SELECT MAX(id) FROM scraping_jobs
+                    WHERE location_hash = locations.location_hash AND status = 'completed'
+                    GROUP BY category_id
+                )
+            )
+        WHERE location_hash = ?
+        ''', (f'+{max_age_hours} hours', location_hash))
+        conn.commit()
+        conn.close()
+    
+    def get_unanalyzed_near(self, lat: float, lng: float, radius_m: float,
+                            limit: Optional[int] = None) -> List[Dict]:
+        """Businesses around a location that were stored but never analyzed, nearest first"""
+        return self._find_within(lat, lng, radius_m, limit, where='b.last_analyzed IS NULL')
+    
+    def sweep_location(self, city: str, country: Optional[str], categories: List[str],
+                       search: Callable[[str], List[Dict]], coords: Optional[Dict] = None,
+                       radius: int = 5000, max_age_hours: float = 168,
+                       on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """Scrape a city through the ledger and pick up what an interrupted run left
+        
+        Categories completed within max_age_hours are skipped. For the rest,
+        search(category) is called and its businesses are stored before the
+        job is closed, so a crash never loses a finished cell. search must
+        raise when the lookup itself failed (e.g. search_all_apis with
+        strict=True); a raising category, or one whose rows don't all store,
+        is recorded as failed and retried next run. With coords, businesses
+        stored near the city but never analyzed are appended (APIs return
+        some results slightly outside the radius, hence 1.5x).
+        on_progress(done, total) is called after each searched category.
+        
+        Returns location_hash, businesses, scraped (new this run), fresh
+        (skipped categories), carried (resumed rows) and errors
+        ({category: message}). Call complete_location() once the businesses
+        have been analyzed and errors is empty.
+        """
+        coords = coords or {}
+        location_hash = self.record_location(city, country, coords.get('lat'), coords.get('lng'),
+                                             radius=radius)
+        fresh = self.get_fresh_categories(location_hash, categories, max_age_hours)
+        pending = [category for category in categories if category not in fresh]
+        
+        businesses = []
+        errors = {}
+        for done, category in enumerate(pending, 1):
+            job_id = self.start_scraping_job(location_hash, category)
+            try:
+                results = search(category)
+                stored = [business for business in results if self.add_business(business)]
+                businesses.extend(stored)
+                if len(stored) < len(results):
+                    raise RuntimeError(f"{len(results) - len(stored)} of {len(results)} businesses failed to store")
+                self.finish_scraping_job(job_id, len(stored))
+            except Exception as e:
+                self.fail_scraping_job(job_id, str(e))
+                errors[category] = str(e)
+            if on_progress:
+                on_progress(done, len(pending))
+        scraped = len(businesses)
+        
+        carried = []
+        if coords:
+            seen = {business.get('fsq_id') for business in businesses}
+            carried = [
+                business for business in self.get_unanalyzed_near(coords['lat'], coords['lng'], radius * 1.5)
+                if business.get('fsq_id') not in seen
+            ]
+            businesses.extend(carried)
+        
+        return {
+            'location_hash': location_hash,
+            'businesses': businesses,
+            'scraped': scraped,
+            'fresh': fresh,
+            'carried': carried,
+            'errors': errors,
+        }
+    
     def get_statistics(self) -> Dict:
         """Get database statistics"""
         conn = sqlite3.connect(self.db_path)
@@ -0,0 +1,172 @@
+# explain_queries.py
+"""
+Print EXPLAIN QUERY PLAN for every hot lead query
+
+Covers the /api/leads and /api/stats queries in dashboard.py and the
+BusinessDatabase listing methods. Plans that fall back to a full table scan
+or a temporary sort B-tree are flagged.
+
+Usage:
+    python explain_queries.py [--db businesses.db] [--ensure-indexes] [--analyze] [--strict]
+"""
+import argparse
+import sqlite3
+import sys
+
+from database import BusinessDatabase
+
+LEAD_COLUMNS = '''name, website, website_score, lead_score, priority,
+                   category, mobile_friendly, has_ssl, needs_redesign,
+                   has_contact_form, phone, email, locality'''
+
+# (name, sql, sample params, temp sort expected)
+# Aggregate queries sort their (small) grouped output, so a temp B-tree there
+# is expected rather than a regression.
+HOT_QUERIES = [
+    ('dashboard /api/leads?type=high', f'''
+        SELECT id, {LEAD_COLUMNS}
+        FROM businesses
+        WHERE is_active = TRUE AND lead_score >= ?
+        ORDER BY lead_score DESC, website_score DESC, id DESC
+        LIMIT ?''', (70, 50), False),
+    ('dashboard /api/leads?type=high (next page)', f'''
+        SELECT id, {LEAD_COLUMNS}
+        FROM businesses
+        WHERE is_active = TRUE AND lead_score >= ? AND (lead_score, website_score, id) < (?, ?, ?)
+        ORDER BY lead_score DESC, website_score DESC, id DESC
+        LIMIT ?''', (70, 85, 40, 1000, 50), False),
+    ('dashboard /api/leads?type=medium', f'''
+        SELECT id, {LEAD_COLUMNS}
+        FROM businesses
+        WHERE is_active = TRUE AND lead_score >= ? AND lead_score <= ?
+        ORDER BY lead_score DESC, website_score DESC, id DESC
+        LIMIT ?''', (40, 69, 50), False),
+    ('dashboard /api/leads?type=medium (next page)', f'''
+        SELECT id, {LEAD_COLUMNS}
+        FROM businesses
+        WHERE is_active = TRUE AND lead_score >= ? AND (lead_score, website_score, id) < (?, ?, ?)
+        ORDER BY lead_score DESC, website_score DESC, id DESC
+        LIMIT ?''', (40, 55, 40, 1000, 50), False),
+    ('dashboard /api/leads?type=all', f'''
+        SELECT id, {LEAD_COLUMNS}
+        FROM businesses
+        WHERE is_active = TRUE
+        ORDER BY lead_score DESC, website_score DESC, id DESC
+        LIMIT ?''', (50,), False),
+    ('dashboard /api/leads?type=niche', '''
+        SELECT b.id, b.name, b.lead_score, b.category, c.category_count
+        FROM businesses b
+        JOIN (
+            SELECT category, COUNT(*) as category_count FROM businesses
+            WHERE lead_score >= 60 AND is_active = TRUE
+            GROUP BY category
+        ) c ON c.category = b.category
+        WHERE b.lead_score >= 60
+        AND b.is_active = TRUE
+        AND b.category IN (
+            SELECT category FROM businesses
+            WHERE category IS NOT NULL AND lead_score >= 60
+            GROUP BY category
+            HAVING COUNT(*) BETWEEN 1 AND 10
+        )
+        ORDER BY b.lead_score DESC, b.website_score DESC, b.id DESC
+        LIMIT ?''', (50,), True),
+    ('dashboard /api/stats categories', '''
+        SELECT category, COUNT(*) as count, AVG(lead_score) as avg_lead_score
+        FROM businesses
+        WHERE category IS NOT NULL AND lead_score > 0
+        GROUP BY category
+        ORDER BY count DESC
+        LIMIT 15''', (), True),
+    ('BusinessDatabase.get_businesses_by_tier', '''
+        SELECT * FROM businesses
+        WHERE tier = ?
+        AND is_active = TRUE
+        AND is_contacted = FALSE
+        ORDER BY lead_score DESC, id DESC
+        LIMIT ?''', (1, 100), False),
+    ('BusinessDatabase.get_businesses_by_tier (next page)', '''
+        SELECT * FROM businesses
+        WHERE tier = ?
+        AND is_active = TRUE
+        AND is_contacted = FALSE
+        AND (lead_score, id) < (?, ?)
+        ORDER BY lead_score DESC, id DESC
+        LIMIT ?''', (1, 80, 1000, 100), False),
+    ('BusinessDatabase.get_businesses_by_score', '''
+        SELECT * FROM businesses
+        WHERE website_score >= ?
+        AND is_active = TRUE
+        AND is_contacted = FALSE
+        ORDER BY website_score DESC, id DESC
+        LIMIT ?''', (50, 100), False),
+    ('BusinessDatabase.get_businesses_by_score (next page)', '''
+        SELECT * FROM businesses
+        WHERE website_score >= ?
+        AND is_active = TRUE
+        AND is_contacted = FALSE
+        AND (website_score, id) < (?, ?)
+        ORDER BY website_score DESC, id DESC
+        LIMIT ?''', (50, 70, 1000, 100), False),
+]
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: tuple) -> list:
+    """Return the plan as (depth, detail) tuples"""
+    rows = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    depths = {0: -1}
+    plan = []
+    for node_id, parent_id, _, detail in rows:
+        depth = depths.get(parent_id, -1) + 1
+        depths[node_id] = depth
+        plan.append((depth, detail))
+    return plan
+
+
+def plan_warnings(plan: list, allow_temp_sort: bool = False) -> list:
+    """Flag full scans of businesses and unexpected temporary sorts"""
+    warnings = []
+    for _, detail in plan:
+        if detail.startswith('SCAN') and 'businesses' in detail and 'INDEX' not in detail:
+            warnings.append(f"full table scan: {detail}")
+        if 'USE TEMP B-TREE' in detail and not allow_temp_sort:
+            warnings.append(f"temporary sort: {detail}")
+    return warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show query plans for the hot lead queries")
+    parser.add_argument("--db", default="businesses.db", help="Path to the SQLite database")
+    parser.add_argument("--ensure-indexes", action="store_true", help="Create the managed lead indexes first")
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE so the planner has fresh statistics")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if any plan is flagged")
+    args = parser.parse_args()
+
+    if args.ensure_indexes:
+        created = BusinessDatabase(args.db).ensure_indexes()
+        print(f"✓ Managed indexes present: {', '.join(created)}")
+
+    conn = sqlite3.connect(args.db)
+    if args.analyze:
+        conn.execute('ANALYZE')
+
+    flagged = 0
+    for name, sql, params, allow_temp_sort in HOT_QUERIES:
+        plan = explain(conn, sql, params)
+        warnings = plan_warnings(plan, allow_temp_sort)
+        marker = "⚠" if warnings else "✓"
+        print(f"\n{marker} {name}")
+        for depth, detail in plan:
+            print(f"    {'  ' * depth}{detail}")
+        for warning in warnings:
+            print(f"    ! {warning}")
+        flagged += bool(warnings)
+    conn.close()
+
+    print(f"\n{len(HOT_QUERIES) - flagged}/{len(HOT_QUERIES)} hot queries have no flagged plan steps")
+    if args.strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# load_counters.py
+"""
+In-process sliding-window load counters
+
+The HTTP layer (multi_api_scraper) and DB layer (database) call record() on
+every API request and business write. Each metric is a ring buffer of
+one-second buckets, so recording is O(1) and reading the last N seconds is
+O(N). A daemon thread snapshots the counts into the fatigue_metrics table so
+other processes sharing the database can see this process's load
+(FatigueMonitor in Renovation/infrastructure/monitoring reads them back).
+The thread is started explicitly by long-running entry points
+(BusinessDatabase.start_load_snapshots, FatigueMonitor), and the table is
+created the first time a process snapshots into a database.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+WINDOW_SECONDS = 60
+SNAPSHOT_INTERVAL = float(os.getenv("FATIGUE_SNAPSHOT_SECONDS", "5"))
+
+FATIGUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fatigue_metrics (
+    id INTEGER PRIMARY KEY,
+    metric_type TEXT,
+    current_value INTEGER,
+    threshold INTEGER,
+    last_reset TIMESTAMP,
+    is_throttled BOOLEAN DEFAULT FALSE
+);
+"""
+
+# Columns added for per-process snapshots; recorded_at is epoch seconds
+SNAPSHOT_COLUMNS = {
+    "process_id": "TEXT",
+    "window_seconds": "INTEGER",
+    "recorded_at": "REAL",
+}
+
+
+def process_id() -> str:
+    # Computed per call so forked workers don't share their parent's id
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SlidingWindowCounter:
+    """Event count over the last `window` seconds in one-second buckets"""
+
+    def __init__(self, window: int = WINDOW_SECONDS):
+        self.window = window
+        self._counts = [0] * window
+        self._slots = [-1] * window
+        self._lock = threading.Lock()
+        self.last_recorded = 0.0
+
+    def add(self, n: int = 1, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        slot = int(now)
+        i = slot % self.window
+        with self._lock:
+            if self._slots[i] != slot:
+                self._slots[i] = slot
+                self._counts[i] = 0
+            self._counts[i] += n
+            self.last_recorded = now
+
+    def total(self, window: Optional[int] = None, now: Optional[float] = None) -> int:
+        window = min(window or self.window, self.window)
+        oldest = int(time.time() if now is None else now) - window
+        with self._lock:
+            return sum(count for count, slot in zip(self._counts, self._slots) if slot > oldest)
+
+
+def api_metric(api_name: str) -> str:
+    return f"api:{api_name.lower()}"
+
+
+def db_write_metric(queue: str = "businesses") -> str:
+    return f"db_writes:{queue}"
+
+
+_counters: Dict[str, SlidingWindowCounter] = {}
+_thresholds: Dict[str, int] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(metric: str) -> SlidingWindowCounter:
+    c = _counters.get(metric)
+    if c is None:
+        with _registry_lock:
+            c = _counters.setdefault(metric, SlidingWindowCounter())
+    return c
+
+
+def record(metric: str, n: int = 1) -> None:
+    """Count n events for a metric (e.g. 'api:foursquare', 'db_writes:businesses')"""
+    counter(metric).add(n)
+
+
+def recent(metric: str, window: int = WINDOW_SECONDS) -> int:
+    """Events this process recorded for a metric in the last `window` seconds"""
+    c = _counters.get(metric)
+    return c.total(window) if c else 0
+
+
+def set_threshold(metric: str, threshold: int) -> None:
+    """Threshold written alongside snapshots (drives the is_throttled column)"""
+    _thresholds[metric] = threshold
+
+
+def ensure_snapshot_table(conn: sqlite3.Connection) -> None:
+    conn.execute(FATIGUE_SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(fatigue_metrics)")}
+    for column, column_type in SNAPSHOT_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE fatigue_metrics ADD COLUMN {column} {column_type}")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_fatigue_metrics_metric_process "
+        "ON fatigue_metrics (metric_type, process_id)"
+    )
+
+
+# Databases whose fatigue_metrics table this process has already created/migrated
+_prepared: Set[str] = set()
+
+
+def snapshot(db_path: str, since: float = 0.0) -> int:
+    """
+    Upsert this process's window counts into fatigue_metrics.
+
+    Only metrics recorded after `since` (plus one window, so counts decay
+    back to zero) are written. Returns the number of rows written.
+    """
+    now = time.time()
+    rows = []
+    for metric, c in list(_counters.items()):
+        if c.last_recorded + c.window < since:
+            continue
+        value = c.total(now=now)
+        threshold = _thresholds.get(metric)
+        rows.append((
+            metric, value, threshold, datetime.now().isoformat(),
+            threshold is not None and value > threshold,
+            process_id(), c.window, now,
+        ))
+    if not rows:
+        return 0
+    key = os.path.abspath(str(db_path))
+    conn = sqlite3.connect(key, timeout=5)
+    try:
+        prepare = key not in _prepared
+        if prepare:
+            ensure_snapshot_table(conn)
+        conn.executemany(
+            """
+            INSERT INTO fatigue_metrics
+                (metric_type, current_value, threshold, last_reset, is_throttled,
+                 process_id, window_seconds, recorded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(metric_type, process_id) DO UPDATE SET
+                current_value = excluded.current_value,
+                threshold = excluded.threshold,
+                last_reset = excluded.last_reset,
+                is_throttled = excluded.is_throttled,
+                window_seconds = excluded.window_seconds,
+                recorded_at = excluded.recorded_at
+            """,
+            rows,
+        )
+        conn.commit()
+        if prepare:
+            _prepared.add(key)
+    finally:
+        conn.close()
+    return len(rows)
+
+
+_snapshotters: Dict[str, threading.Thread] = {}
+
+
+def start_snapshots(db_path: str, interval: float = SNAPSHOT_INTERVAL) -> None:
+    """Snapshot counters into db_path every `interval` seconds (once per path)"""
+    if interval <= 0:
+        return
+    key = os.path.abspath(str(db_path))
+    with _registry_lock:
+        if key in _snapshotters:
+            return
+
+        def loop():
+            last = 0.0
+            while True:
+                time.sleep(interval)
+                try:
+                    snapshot(key, since=last)
+                    last = time.time() - interval
+                except sqlite3.Error:
+                    # Busy or locked database: try again next interval
+                    pass
+
+        thread = threading.Thread(target=loop, name=f"fatigue-snapshot:{key}", daemon=True)
+        _snapshotters[key] = thread
+        thread.start()
+
+
+def recent_elsewhere(db_path: str, metric: str, max_age: Optional[float] = None) -> int:
+    """Sum of other processes' latest snapshotted counts for a metric"""
+    max_age = max_age if max_age is not None else max(2 * SNAPSHOT_INTERVAL, 10)
+    try:
+        conn = sqlite3.connect(db_path, timeout=5)
+        try:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(current_value), 0) FROM fatigue_metrics "
+                "WHERE metric_type = ? AND process_id != ? AND recorded_at >= ?",
+                (metric, process_id(), time.time() - max_age),
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        # Table or snapshot columns not created yet
+        return 0
+    return row[0]
+
+
+__all__ = [
+    "SlidingWindowCounter", "api_metric", "db_write_metric", "record", "recent", "set_threshold",
+    "snapshot", "start_snapshots", "recent_elsewhere", "ensure_snapshot_table",
+]
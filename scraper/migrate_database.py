@@ -1,6 +1,8 @@
 # Migration script
 import sqlite3
 
+from database import LEAD_INDEXES
+
 def migrate_database(db_path="businesses.db"):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -39,6 +41,13 @@ def migrate_database(db_path="businesses.db"):
     except:
         pass
     
+    for index_name, ddl in LEAD_INDEXES:
+        try:
+            cursor.execute(ddl)
+            print(f"✓ Created index: {index_name}")
+        except sqlite3.OperationalError as e:
+            print(f"✗ Error creating {index_name}: {e}")
+    
     conn.commit()
     conn.close()
     print("\n✓ Database migration complete!")
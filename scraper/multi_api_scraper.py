@@ -9,10 +9,16 @@ from typing import List, Dict, Optional
 import json
 from datetime import datetime
 from api_manager import APIManager
+import load_counters
 from rich.console import Console
 
 console = Console()
 
+
+class SearchFailed(Exception):
+    """search_all_apis(strict=True) got no answer from any API"""
+
+
 class MultiAPIScraper:
     """Scraper that uses multiple place APIs with automatic fallback"""
     
@@ -36,13 +42,21 @@ class MultiAPIScraper:
         
         return sorted_active
     
-    def search_all_apis(self, city_name: str, category: str, radius: int = 5000) -> List[Dict]:
-        """Search using ALL available APIs to maximize results"""
+    def search_all_apis(self, city_name: str, category: str, radius: int = 5000,
+                        strict: bool = False) -> List[Dict]:
+        """Search using ALL available APIs to maximize results
+        
+        Per-API failures are logged and skipped. With strict=True, SearchFailed
+        is raised when the city can't be geocoded or no API answered, so
+        callers can tell an outage from a genuinely empty area.
+        """
         
         # Get city coordinates
         coords = self._geocode_city(city_name)
         if not coords:
             console.print(f"[yellow]⚠ Could not find coordinates for '{city_name}'[/yellow]")
+            if strict:
+                raise SearchFailed(f"could not geocode '{city_name}'")
             return []
         
         lat, lng = coords['lat'], coords['lng']
@@ -51,6 +65,8 @@ class MultiAPIScraper:
         # Collect results from ALL active APIs (not just until we get 10)
         all_results = []
         apis_tried = []
+        apis_answered = 0
+        errors = []
         
         for api_name in self.active_apis:
             apis_tried.append(api_name)
@@ -67,6 +83,7 @@ class MultiAPIScraper:
                     console.print("[dim]Not supported[/dim]")
                     continue
                 
+                apis_answered += 1
                 if results:
                     console.print(f"[green]Found {len(results)} ✓[/green]")
                     all_results.extend(results)
@@ -75,11 +92,14 @@ class MultiAPIScraper:
                     
             except Exception as e:
                 console.print(f"[red]Failed[/red]")
+                errors.append(f"{api_name}: {e}")
                 continue
         
         if not all_results:
             console.print(f"\n[red]❌ No results from any API[/red]")
             console.print(f"[yellow]APIs tried: {', '.join(apis_tried)}[/yellow]")
+            if strict and not apis_answered:
+                raise SearchFailed("no API answered" + (f" ({'; '.join(errors)})" if errors else ""))
         
         # Remove duplicates based on name + address
         unique_results = self._deduplicate_results(all_results)
@@ -101,6 +121,8 @@ class MultiAPIScraper:
         # Try each active API until we get results
         all_results = []
         apis_tried = []
+        apis_answered = 0
+        errors = []
         
         for api_name in self.active_apis:
             apis_tried.append(api_name)
@@ -173,6 +195,7 @@ class MultiAPIScraper:
             "fields": "fsq_id,name,geocodes,location,categories,website,tel,email"
         }
         
+        load_counters.record(load_counters.api_metric("foursquare"))
         response = requests.get(url, headers=headers, params=params, timeout=30)
         
         if response.status_code == 401:
@@ -219,6 +242,7 @@ class MultiAPIScraper:
             "limit": 50
         }
         
+        load_counters.record(load_counters.api_metric("tomtom"))
         response = requests.get(url, params=params, timeout=30)
         
         if response.status_code == 403:
@@ -255,6 +279,7 @@ class MultiAPIScraper:
             "limit": 50
         }
         
+        load_counters.record(load_counters.api_metric("yelp"))
         response = requests.get(url, headers=headers, params=params, timeout=30)
         
         if response.status_code == 401:
@@ -5,6 +5,7 @@ Scrapes → Analyzes → Updates database with tier assignments
 Scope: Europe, USA, Canada, Australia (excludes Africa)
 """
 
+import os
 import time
 from datetime import datetime
 from rich.console import Console
@@ -75,6 +76,11 @@ TARGET_CATEGORIES = [
     'Medical Services',
 ]
 
+# Scrape ledger: (city, category) cells completed within this window are
+# skipped, so an interrupted sweep resumes where it stopped
+SCRAPE_RADIUS = 5000
+SCRAPE_FRESH_HOURS = int(os.getenv("SCRAPE_FRESH_HOURS", "168"))
+
 
 class AbroadAnalysisStarter:
     """Complete pipeline: scrape → analyze → store for abroad markets"""
@@ -83,6 +89,7 @@ class AbroadAnalysisStarter:
         self.scraper = MultiAPIScraper()
         self.analyzer = ComprehensiveAnalyzer()
         self.db = BusinessDatabase()
+        self.db.start_load_snapshots()
         
         self.stats = {
             'total_scraped': 0,
@@ -124,37 +131,49 @@ class AbroadAnalysisStarter:
     
     def _analyze_city(self, city: str, city_info: dict, region: str):
         console.print(f"[cyan]📍 {city}, {city_info['country']}[/cyan]")
-        businesses = []
+        
+        coords = self.scraper._geocode_city(city) or {}
+        
+        # Search all APIs for businesses across all categories
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             transient=True
         ) as progress:
-            task = progress.add_task("[cyan]Searching APIs...", total=len(TARGET_CATEGORIES))
-            
-            for category in TARGET_CATEGORIES:
-                try:
-                    results = self.scraper.search_all_apis(city, category, radius=5000)
-                    businesses.extend(results)
-                    progress.update(task, advance=1)
-                except Exception as e:
-                    console.print(f"[red]✗ Error searching {city} for {category}: {e}[/red]")
-                    self.stats['errors'] += 1
-                    progress.update(task, advance=1)
-                    continue
+            task = progress.add_task("[cyan]Searching APIs...", total=None)
+            sweep = self.db.sweep_location(
+                city, city_info['country'], TARGET_CATEGORIES,
+                lambda category: self.scraper.search_all_apis(city, category, radius=SCRAPE_RADIUS, strict=True),
+                coords=coords, radius=SCRAPE_RADIUS, max_age_hours=SCRAPE_FRESH_HOURS,
+                on_progress=lambda done, total: progress.update(task, completed=done, total=total),
+            )
+        
+        if sweep['fresh']:
+            console.print(f"[dim]↻ Skipped {len(sweep['fresh'])} categories scraped in the last {SCRAPE_FRESH_HOURS}h[/dim]")
+        for category, error in sweep['errors'].items():
+            console.print(f"[red]✗ Error searching {city} for {category}: {error}[/red]")
+        self.stats['errors'] += len(sweep['errors'])
+        if sweep['carried']:
+            console.print(f"[dim]↻ Resuming analysis of {len(sweep['carried'])} stored businesses[/dim]")
+        
+        businesses = sweep['businesses']
+        scraped = sweep['scraped']
+        failed = len(sweep['errors'])
+        location_hash = sweep['location_hash']
         
         if not businesses:
             console.print(f"[yellow]⚠️  No businesses found in {city}[/yellow]")
+            if not failed:
+                self.db.complete_location(location_hash, SCRAPE_FRESH_HOURS)
             return
         
-        console.print(f"[green]✓ Found {len(businesses)} businesses[/green]")
-        self.stats['total_scraped'] += len(businesses)
-        self.stats['regions'][region]['businesses_found'] += len(businesses)
-        
-        for business in businesses:
-            self.db.add_business(business)
+        console.print(f"[green]✓ Found {scraped} businesses[/green]")
+        self.stats['total_scraped'] += scraped
+        self.stats['regions'][region]['businesses_found'] += scraped
         
         self._analyze_businesses(businesses, city, region)
+        if not failed:
+            self.db.complete_location(location_hash, SCRAPE_FRESH_HOURS)
     
     def _analyze_businesses(self, businesses: list, city: str, region: str):
         analyzed = 0
@@ -0,0 +1,177 @@
+"""
+Competitor intelligence cache keyed by (niche, locality)
+
+search_competitors() is the expensive call once it hits a real data source,
+and every lead in a niche asks the same question. Results are kept in SQLite
+with a TTL (plus an in-memory copy for hot keys), concurrent misses for one
+key share a single fetch, and warm() resolves all distinct keys of a batch up
+front, so research cost scales with distinct niches rather than leads.
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from competitive_design_agent import search_competitors
+
+# The scraper's database unless overridden; never relative to the working directory
+SCRAPER_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper", "businesses.db")
+CACHE_DB = os.getenv("COMPETITOR_CACHE_DB") or os.getenv("DB_PATH") or SCRAPER_DB
+TTL_SECONDS = float(os.getenv("COMPETITOR_CACHE_TTL_HOURS", "72")) * 3600
+# Every lookup fetches this many so callers asking for fewer share the entry
+FETCH_LIMIT = 5
+WARM_WORKERS = int(os.getenv("COMPETITOR_WARM_WORKERS", "8"))
+
+SCHEMA_COMPETITOR_INTEL = """
+CREATE TABLE IF NOT EXISTS competitor_intel (
+    niche TEXT NOT NULL,
+    locality TEXT NOT NULL,
+    competitors TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (niche, locality)
+);
+"""
+
+Key = Tuple[str, str]
+Fetch = Callable[[str, str, int], List[Dict]]
+
+
+def cache_key(niche: Optional[str], locality: Optional[str] = None) -> Key:
+    return ((niche or "general").strip().lower(), (locality or "").strip().lower())
+
+
+def lead_locality(lead: Dict) -> str:
+    """City/region a lead competes in ('' when unknown)"""
+    return lead.get("locality") or lead.get("city") or lead.get("region") or ""
+
+
+def default_fetch(niche: str, locality: str, limit: int) -> List[Dict]:
+    # The current source has no locality filter; the key already carries it
+    # so entries stay correct once it does
+    return search_competitors(niche, limit=limit)
+
+
+class CompetitorCache:
+    def __init__(self, db_path: str = CACHE_DB, ttl: float = TTL_SECONDS, fetch: Fetch = default_fetch):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.fetch = fetch
+        self.hits = 0
+        self.fetches = 0
+        self._memory: Dict[Key, Tuple[List[Dict], float]] = {}
+        self._inflight: Dict[Key, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.execute(SCHEMA_COMPETITOR_INTEL)
+        self._conn.commit()
+
+    def _fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    def _cached(self, key: Key) -> Optional[List[Dict]]:
+        # Caller holds the lock
+        entry = self._memory.get(key)
+        if entry is None:
+            row = self._conn.execute(
+                "SELECT competitors, fetched_at FROM competitor_intel WHERE niche = ? AND locality = ?", key
+            ).fetchone()
+            if row:
+                entry = self._memory[key] = (json.loads(row[0]), row[1])
+        if entry is not None and self._fresh(entry[1]):
+            return entry[0]
+        return None
+
+    def _store(self, key: Key, competitors: List[Dict]) -> None:
+        fetched_at = time.time()
+        with self._lock:
+            self._memory[key] = (competitors, fetched_at)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO competitor_intel (niche, locality, competitors, fetched_at) VALUES (?, ?, ?, ?)",
+                (*key, json.dumps(competitors), fetched_at),
+            )
+            self._conn.commit()
+
+    def lookup(self, niche: Optional[str], locality: Optional[str] = None, limit: int = FETCH_LIMIT) -> List[Dict]:
+        """Competitors for a niche in a locality, fetched at most once per TTL"""
+        key = cache_key(niche, locality)
+        while True:
+            with self._lock:
+                competitors = self._cached(key)
+                if competitors is not None:
+                    self.hits += 1
+                    # Copies, so callers mutating the dicts can't alter the cache
+                    return copy.deepcopy(competitors[:limit])
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    break
+            # Another thread is fetching this key: wait, then look again. If
+            # its fetch failed, the next pass registers our own before fetching.
+            pending.wait()
+        try:
+            competitors = self.fetch(key[0], key[1], max(limit, FETCH_LIMIT))
+            self.fetches += 1
+            self._store(key, competitors)
+            return copy.deepcopy(competitors[:limit])
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+
+    def warm(self, keys: Iterable[Tuple[Optional[str], Optional[str]]], workers: int = WARM_WORKERS) -> int:
+        """Fetch every distinct (niche, locality) that isn't fresh; returns how many were fetched"""
+        distinct = {cache_key(niche, locality) for niche, locality in keys}
+        with self._lock:
+            missing = [key for key in distinct if self._cached(key) is None]
+        if not missing:
+            return 0
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as executor:
+            list(executor.map(lambda key: self.lookup(*key), missing))
+        return len(missing)
+
+    def warm_leads(self, leads: Iterable[Dict], workers: int = WARM_WORKERS) -> int:
+        return self.warm(((lead.get("niche"), lead_locality(lead)) for lead in leads), workers)
+
+    def purge_expired(self) -> int:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._memory = {k: v for k, v in self._memory.items() if v[1] >= cutoff}
+            deleted = self._conn.execute("DELETE FROM competitor_intel WHERE fetched_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "fetches": self.fetches, "keys": len(self._memory), "db": self.db_path}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared: Optional[CompetitorCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> CompetitorCache:
+    """Process-wide cache used by the competitive intel and design agents"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = CompetitorCache()
+    return _shared
+
+
+def lookup_competitors(niche: Optional[str], locality: Optional[str] = None, limit: int = FETCH_LIMIT) -> List[Dict]:
+    return shared_cache().lookup(niche, locality, limit)
+
+
+__all__ = [
+    "CompetitorCache", "cache_key", "lead_locality", "default_fetch",
+    "shared_cache", "lookup_competitors", "SCHEMA_COMPETITOR_INTEL",
+]
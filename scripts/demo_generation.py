@@ -2,13 +2,15 @@
 Demo Generation Pipeline - Integrated with Market-Aware 4-Agent System
 
 Pipeline Flow:
-1. Load leads from JSON
+1. Stream leads from JSON/JSONL, stdin, the scraper database or the
+   TaskRegistry work queue (--enqueue DB, then workers on queue:DB)
 2. For each lead:
    a. Run 4-Agent Market-Aware Analysis
    b. Generate design system
-   c. Render HTML template
-   d. Deploy to Vercel
-3. Save results with full agent outputs
+   c. Render HTML template into demo_sites/
+3. Deploy demo_sites/ once as a bundle (Vercel, Lovable fallback); queue
+   tasks complete only after this succeeds
+4. Save results with full agent outputs
 """
 
 import sys
@@ -18,7 +20,15 @@ import random
 import time
 import json
 import os
+import hashlib
+import shlex
 import subprocess
+import textwrap
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directories to path
 scripts_dir = Path(__file__).parent
@@ -47,8 +57,15 @@ try:
     generate_design_brief = competitive_design_agent.generate_design_brief
     generate_original_palette = competitive_design_agent.generate_original_palette
     build_enhanced_template = enhanced_template.build_enhanced_template
+    write_shared_assets = enhanced_template.write_shared_assets
+    TEMPLATE_VERSION = enhanced_template.TEMPLATE_VERSION
     niche_palettes = curated_palettes.niche_palettes
     run_market_aware_pipeline = market_aware_agent.run_market_aware_pipeline
+    # Same module instance the agents use, so warming fills their cache
+    import competitor_cache
+    
+    # Imported by package path so agents and stages share one registry
+    from Renovation.infrastructure.monitoring.latency_metrics import REGISTRY as METRICS, stage_timer
     
 except Exception as e:
     print(f"Import error: {e}")
@@ -57,6 +74,104 @@ except Exception as e:
     sys.exit(1)
 
 
+# Deploy CLIs; override with a local stand-in (e.g. VERCEL_CLI="python fake_vercel.py")
+VERCEL_CLI = shlex.split(os.getenv("VERCEL_CLI", "vercel"))
+LOVABLE_CLI = shlex.split(os.getenv("LOVABLE_CLI", "lovable"))
+DEMO_SITES_DIR = "demo_sites"
+DEMO_SITES_URL = os.getenv("DEMO_SITES_URL", "https://demo-sites-batch.vercel.app")
+LOVABLE_BUNDLE_PROJECT = "demo_sites_batch"
+# Kept outside demo_sites/ so lead details are never deployed
+MANIFEST_FILE = "demo_manifest.json"
+# Deployments with a real URL; anything else (local fallback) is retried next run
+DEPLOYED_METHODS = ("vercel", "lovable")
+# TaskRegistry workflow for queued demo work (see DemoQueue)
+DEMO_WORKFLOW = "demo_generation"
+
+
+def demo_slug(lead: dict) -> str:
+    """Base filename for a lead's demo."""
+    return lead.get("business_name", "demo").lower().replace(" ", "-").replace("_", "-")
+
+
+class DemoManifest:
+    """
+    Content-addressed record of deployed demos.
+    
+    Maps a hash of each lead's inputs, the template version and the asset
+    mode to the demo's file, URL and deployment method - nothing else, so the
+    manifest stays small however many leads have run. A lead whose hash
+    matches a demo that still exists and reached a real host skips analysis,
+    rendering and deployment; demos that fell back to local files are
+    regenerated so their deployment is retried.
+    """
+    
+    def __init__(self, path: str = MANIFEST_FILE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    loaded = json.load(f)
+                # Entries from older manifest formats are dropped (they regenerate once)
+                self.entries = {
+                    input_hash: entry for input_hash, entry in loaded.items()
+                    if isinstance(entry, dict) and entry.get("demo_file")
+                }
+            except (OSError, ValueError):
+                print(f"⚠ Ignoring unreadable manifest: {path}")
+        # One entry per demo file: a lead whose inputs change replaces its old hash
+        self._by_file = {entry["demo_file"]: input_hash for input_hash, entry in self.entries.items()}
+    
+    @staticmethod
+    def input_hash(lead: dict, assets: dict = None) -> str:
+        key = {
+            "lead": lead,
+            "template": TEMPLATE_VERSION,
+            "assets": assets,
+            "payments": os.getenv("ENABLE_PAYMENTS", "0"),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    
+    def lookup(self, lead: dict, input_hash: str):
+        """Result for an unchanged, deployed lead (rebuilt from the lead and the entry), or None"""
+        entry = self.entries.get(input_hash)
+        if not entry or entry.get("method") not in DEPLOYED_METHODS or not os.path.exists(entry["demo_file"]):
+            return None
+        return {
+            "business_name": lead.get("business_name"),
+            "industry": lead.get("industry"),
+            "phone": lead.get("phone"),
+            "email": lead.get("email"),
+            "website": lead.get("website"),
+            "tier": lead.get("tier"),
+            "demo_url": entry["demo_url"],
+            "demo_file": entry["demo_file"],
+            "deployment_method": entry["method"],
+            "host_provider": entry["method"],
+            "generated_at": datetime.fromtimestamp(os.path.getmtime(entry["demo_file"])).isoformat(),
+            "input_hash": input_hash,
+        }
+    
+    def record(self, result: dict) -> None:
+        if not (result.get("input_hash") and result.get("demo_file")):
+            return
+        previous = self._by_file.get(result["demo_file"])
+        if previous and previous != result["input_hash"]:
+            self.entries.pop(previous, None)
+        self.entries[result["input_hash"]] = {
+            "demo_file": result["demo_file"],
+            "demo_url": result.get("demo_url"),
+            "method": result.get("deployment_method"),
+        }
+        self._by_file[result["demo_file"]] = result["input_hash"]
+    
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
 def industry_niche(industry: str) -> str:
     """Map industry to niche for design system."""
     niche_map = {
@@ -74,15 +189,17 @@ def industry_niche(industry: str) -> str:
     return niche_map.get(industry.lower(), "general landing page")
 
 
-def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
+def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5), deploy: bool = True,
+                             assets: dict = None) -> dict:
     """
     Process a single lead through the complete 4-agent pipeline.
     
     Steps:
     1. Run Market-Aware 4-Agent Analysis
     2. Generate design system (palette, components)
-    3. Build HTML template
-    4. Deploy to Vercel (optional)
+    3. Build HTML template (linking the shared CSS/JS when assets is given)
+    4. Deploy to Vercel (optional; skipped when deploy=False so the run
+       can be deployed as one bundle)
     
     Returns: Lead + agent analysis + demo URL
     """
@@ -90,6 +207,7 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
     print(f"\n{'='*72}")
     print(f"Processing: {lead.get('business_name', 'Unknown')}")
     print(f"{'='*72}")
+    started = time.perf_counter()
     
     # Assign niche
     lead["niche"] = industry_niche(lead.get("industry", ""))
@@ -98,7 +216,8 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
     # 4-AGENT MARKET-AWARE ANALYSIS
     # ═══════════════════════════════════════════════════════════════════
     print("\n🔍 Running 4-Agent Market-Aware Analysis...")
-    market_analysis = run_market_aware_pipeline(lead)
+    with stage_timer("analysis"):
+        market_analysis = run_market_aware_pipeline(lead)
     
     # Extract key outputs
     tier_analysis = market_analysis["marketAwareAnalysis"]["agent1_tier_presence"]
@@ -116,16 +235,17 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
     # ═══════════════════════════════════════════════════════════════════
     print("\n🎨 Generating Design System...")
     
-    competitors = niche_intel.get("competitorNames", [])
-    design_brief = generate_design_brief(
-        [{"name": c} for c in competitors],
-        lead.get("tier", "Tier 1")
-    )
-    
-    # Use synthesized palette
-    tokens = design_synthesis.get("colorPalette", {})
-    if not tokens:
-        tokens = generate_original_palette([], lead["niche"], lead.get("tier", "Tier 1"))
+    with stage_timer("design"):
+        competitors = niche_intel.get("competitorNames", [])
+        design_brief = generate_design_brief(
+            [{"name": c} for c in competitors],
+            lead.get("tier", "Tier 1")
+        )
+        
+        # Use synthesized palette
+        tokens = design_synthesis.get("colorPalette", {})
+        if not tokens:
+            tokens = generate_original_palette([], lead["niche"], lead.get("tier", "Tier 1"))
     
     print(f"✓ Primary Color: {tokens.get('primary')}")
     print(f"✓ Animation Level: {design_synthesis['animationLevel']}")
@@ -135,15 +255,16 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
     # ═══════════════════════════════════════════════════════════════════
     print("\n🏗️ Rendering HTML Template...")
     
-    html_content = build_enhanced_template(lead, tokens)
-    
-    # Save to demo_sites
-    filename = lead.get("business_name", "demo").lower().replace(" ", "-").replace("_", "-")
-    demo_file = f"demo_sites/{filename}.html"
-    
-    os.makedirs("demo_sites", exist_ok=True)
-    with open(demo_file, "w") as f:
-        f.write(html_content)
+    with stage_timer("render"):
+        html_content = build_enhanced_template(lead, tokens, assets)
+        
+        # Save to demo_sites
+        filename = demo_slug(lead)
+        demo_file = f"demo_sites/{filename}.html"
+        
+        os.makedirs("demo_sites", exist_ok=True)
+        with open(demo_file, "w") as f:
+            f.write(html_content)
     
     file_size = len(html_content) / 1024
     print(f"✓ Saved: {demo_file} ({file_size:.1f} KB)")
@@ -151,26 +272,96 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
     # ═══════════════════════════════════════════════════════════════════
     # DEPLOYMENT (Vercel Primary, Lovable Fallback)
     # ═══════════════════════════════════════════════════════════════════
+    if deploy:
+        with stage_timer("deploy"):
+            demo_url, deployment_method = deploy_demo(demo_file, filename)
+    else:
+        # Deployed later with the rest of the run as one bundle (see main)
+        demo_url, deployment_method = None, "pending"
+    
+    # Time spent on this lead, excluding the rate-limit pause below
+    generation_time = time.perf_counter() - started
+    
+    # Random pause to avoid rate limiting
+    time.sleep(random.uniform(*pause_range))
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # RESULT COMPILATION
+    # ═══════════════════════════════════════════════════════════════════
+    
+    result = {
+        "business_name": lead.get("business_name"),
+        "industry": lead.get("industry"),
+        "phone": lead.get("phone"),
+        "email": lead.get("email"),
+        "website": lead.get("website"),
+        "current_website_status": lead.get("current_website_status"),
+        "tier": lead.get("tier"),
+        "demo_url": demo_url,
+        "demo_file": demo_file,
+        "deployment_method": deployment_method,
+        "contact_channel": lead.get("contact_channel", "whatsapp_or_sms"),
+        "host_provider": "vercel" if deployment_method == "vercel" else ("lovable" if deployment_method == "lovable" else "local"),
+        "niche": lead.get("niche"),
+        
+        # 4-Agent Analysis Outputs
+        "marketAwareAnalysis": {
+            "agent1_tier_presence": tier_analysis,
+            "agent2_competitive_intelligence": {
+                "competitorsFound": niche_intel["competitorsFound"],
+                "competitorNames": niche_intel["competitorNames"],
+                "opportunities": niche_intel["marketOpportunities"][:3],
+                "overusedPatterns": niche_intel["competitiveThreats"]["mostCommon"],
+            },
+            "agent3_design_synthesis": {
+                "designStyle": design_synthesis["designStyle"],
+                "colorPalette": tokens,
+                "animationLevel": design_synthesis["animationLevel"],
+                "uiPersonality": design_synthesis["uiPersonality"],
+            },
+            "agent4_demo_composition": {
+                "sections": demo_composition["structure"]["sections"],
+                "components": demo_composition["structure"]["totalComponents"],
+                "complexity": demo_composition["structure"]["complexity"],
+            },
+        },
+        
+        # Legacy format (backwards compatibility)
+        "competitors_analyzed": niche_intel["competitorsFound"],
+        "design_brief": design_brief,
+        "design_tokens": tokens,
+        
+        # Metadata
+        "generated_at": datetime.now().isoformat(),
+        "generation_time_seconds": round(generation_time, 3),
+        "timed_out_agents": market_analysis.get("timedOutAgents", []),
+        "status": "ready_for_client",
+    }
+    
+    return result
+
+
+def deploy_demo(demo_file: str, filename: str) -> tuple:
+    """Deploy one demo (Vercel, then Lovable, then local file). Returns (url, method)."""
     demo_url = None
-    original_dir = os.getcwd()
     deployment_method = None
     
-    # Try Vercel first
+    # Try Vercel first (cwd= rather than os.chdir, which would race across workers)
     try:
         print("\n🚀 Deploying to Vercel...")
-        os.chdir("demo_sites")
         result = subprocess.run(
-            ["vercel", "--prod", "--no-prompt"],
+            [*VERCEL_CLI, "--prod", "--no-prompt"],
             capture_output=True,
             text=True,
-            timeout=30
+            timeout=30,
+            cwd=DEMO_SITES_DIR
         )
         
         if result.returncode == 0:
             # Extract URL from output (Vercel URL pattern)
             output = result.stdout + result.stderr
             if "vercel.app" in output:
-                demo_url = f"https://demo-sites-batch.vercel.app/{filename}.html"
+                demo_url = f"{DEMO_SITES_URL}/{filename}.html"
                 deployment_method = "vercel"
                 print(f"✓ Deployed to Vercel: {demo_url}")
             else:
@@ -183,11 +374,10 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
         
         # Fallback to Lovable
         try:
-            os.chdir(original_dir)
             # Generate Lovable project/deployment command
             lovable_project_name = filename.replace("-", "_")
             result = subprocess.run(
-                ["lovable", "deploy", demo_file, "--project", lovable_project_name],
+                [*LOVABLE_CLI, "deploy", demo_file, "--project", lovable_project_name],
                 capture_output=True,
                 text=True,
                 timeout=45
@@ -209,64 +399,475 @@ def process_lead_with_agents(lead: dict, pause_range=(1.0, 2.5)) -> dict:
             demo_url = f"file://{os.path.abspath(demo_file)}"
             deployment_method = "local"
             print(f"⚠ Falling back to local file: {demo_url}")
-    finally:
-        os.chdir(original_dir)
     
-    # Random pause to avoid rate limiting
-    time.sleep(random.uniform(*pause_range))
+    return demo_url, deployment_method
+
+
+def deploy_site(site_dir: str = DEMO_SITES_DIR) -> tuple:
+    """
+    Deploy site_dir with a single CLI invocation (Vercel, then Lovable).
     
-    # ═══════════════════════════════════════════════════════════════════
-    # RESULT COMPILATION
-    # ═══════════════════════════════════════════════════════════════════
+    Returns (deployment_method, base_url); base_url is None when both fail
+    and the demos stay local.
+    """
+    try:
+        result = subprocess.run(
+            [*VERCEL_CLI, "--prod", "--no-prompt"],
+            capture_output=True,
+            text=True,
+            timeout=300,
+            cwd=site_dir
+        )
+        if result.returncode != 0:
+            raise Exception(f"Vercel deployment failed: {result.stderr}")
+        if "vercel.app" not in result.stdout + result.stderr:
+            raise Exception("No Vercel URL found in output")
+        print(f"✓ Deployed to Vercel: {DEMO_SITES_URL}")
+        return "vercel", DEMO_SITES_URL
+    except Exception as e:
+        print(f"⚠ Vercel deployment failed: {e}")
+        print("🔄 Attempting Lovable deployment as fallback...")
+    try:
+        result = subprocess.run(
+            [*LOVABLE_CLI, "deploy", site_dir, "--project", LOVABLE_BUNDLE_PROJECT],
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        if result.returncode != 0:
+            raise Exception(f"Lovable deployment failed: {result.stderr}")
+        if "lovable" not in result.stdout + result.stderr:
+            raise Exception("No Lovable URL found in output")
+        base_url = f"https://{LOVABLE_BUNDLE_PROJECT}.lovable.dev"
+        print(f"✓ Deployed to Lovable: {base_url}")
+        return "lovable", base_url
+    except Exception as lovable_e:
+        print(f"⚠ Lovable deployment failed: {lovable_e}")
+        print("⚠ Falling back to local files")
+    return "local", None
+
+
+def assign_demo_url(entry: dict, deployment_method: str, base_url: str = None,
+                    site_dir: str = DEMO_SITES_DIR) -> None:
+    """Point a result at its file inside a site deployment (or on disk)."""
+    if base_url:
+        name = os.path.relpath(entry["demo_file"], site_dir).replace(os.sep, "/")
+        entry["demo_url"] = f"{base_url}/{name}"
+    else:
+        entry["demo_url"] = f"file://{os.path.abspath(entry['demo_file'])}"
+    entry["deployment_method"] = deployment_method
+    entry["host_provider"] = deployment_method
+
+
+def protect_demo(entry: dict) -> None:
+    """Rename a demo file with a random token so its URL can't be guessed."""
+    import secrets
+    demo_url = entry.get("demo_url")
+    business_name = demo_slug(entry)
+    original_path = f"demo_sites/{business_name}.html"
+    if os.path.exists(original_path):
+        token = secrets.token_urlsafe(10)
+        protected_name = f"{business_name}-{token}.html"
+        protected_path = f"demo_sites/{protected_name}"
+        os.rename(original_path, protected_path)
+        # Update demo_url if local or vercel
+        if demo_url and "vercel" in demo_url:
+            entry["demo_url"] = demo_url.rsplit('/', 1)[0] + f"/{protected_name}"
+        else:
+            entry["demo_url"] = f"file://{os.path.abspath(protected_path)}"
+        entry["protected"] = True
+        entry["protected_filename"] = protected_name
+        entry["demo_file"] = protected_path
+
+
+def iter_results(leads, workers: int = 1, pause_range=(1.0, 2.5), deploy: bool = True,
+                 assets: dict = None, manifest: DemoManifest = None, skip_hashes=None,
+                 on_finished=None):
+    """
+    Yield process_lead_with_agents results for an iterable of leads, in input order.
     
-    result = {
-        "business_name": lead.get("business_name"),
-        "industry": lead.get("industry"),
-        "phone": lead.get("phone"),
-        "email": lead.get("email"),
-        "website": lead.get("website"),
-        "current_website_status": lead.get("current_website_status"),
-        "tier": lead.get("tier"),
-        "demo_url": demo_url,
-        "deployment_method": deployment_method,
-        "contact_channel": lead.get("contact_channel", "whatsapp_or_sms"),
-        "host_provider": "vercel" if deployment_method == "vercel" else ("lovable" if deployment_method == "lovable" else "local"),
-        "niche": lead.get("niche"),
+    Up to `workers` leads run at a time on threads; each lead is mostly
+    waiting on agent lookups, the deploy subprocess and the rate-limit pause,
+    so threads overlap well. Leads are pulled from the iterable only as slots
+    free up, so memory stays bounded however long the input is. Leads that
+    raise are reported and skipped. With a manifest, leads unchanged since
+    the last run yield their stored result (marked "unchanged") without
+    being processed; leads whose input hash is in skip_hashes (already in a
+    resumed results log) are skipped silently. on_finished(lead, error, result)
+    is called once per lead that ran, was unchanged or was skipped (error is
+    None on success; result is None when it failed or was skipped).
+    """
+    if deploy:
+        # deploy_demo's Lovable fallback uploads only the page, so per-lead
+        # demos must not link the shared assets
+        assets = None
+    
+    def finished(lead, error=None, result=None):
+        if on_finished is not None:
+            on_finished(lead, error, result)
+    
+    def run(lead, input_hash):
+        if manifest is not None:
+            cached = manifest.lookup(lead, input_hash)
+            if cached is not None:
+                print(f"↻ Unchanged, skipping: {lead.get('business_name')}")
+                cached["unchanged"] = True
+                finished(lead, result=cached)
+                return cached
+        try:
+            result = process_lead_with_agents(lead, pause_range, deploy, assets)
+            result["input_hash"] = input_hash
+            result["unchanged"] = False
+        except Exception as e:
+            print(f"❌ Error processing {lead.get('business_name')}: {e}")
+            finished(lead, e)
+            return None
+        finished(lead, result=result)
+        return result
+    
+    def pending_leads():
+        for lead in leads:
+            input_hash = DemoManifest.input_hash(lead, assets)
+            if skip_hashes and input_hash in skip_hashes:
+                finished(lead)
+                continue
+            yield lead, input_hash
+    
+    if workers <= 1:
+        for lead, input_hash in pending_leads():
+            result = run(lead, input_hash)
+            if result is not None:
+                yield result
+        return
+    
+    window = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for lead, input_hash in pending_leads():
+            window.append(executor.submit(run, lead, input_hash))
+            # Keep a little look-ahead so workers never idle on a slow head
+            if len(window) >= workers * 2:
+                result = window.popleft().result()
+                if result is not None:
+                    yield result
+        while window:
+            result = window.popleft().result()
+            if result is not None:
+                yield result
+
+
+def iter_json_array(f, chunk_size: int = 1 << 16):
+    """Yield the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof, started = "", 0, False, False
+    while True:
+        # Skip whitespace and separators, reading more input as needed
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = f.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        if pos >= len(buf):
+            return
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Expected a JSON array of leads")
+            started, pos = True, pos + 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+            # A value running to the end of the buffer may be cut short
+            if end < len(buf) or eof:
+                yield item
+                pos = end
+                continue
+        except ValueError:
+            if eof:
+                raise
+        chunk = f.read(chunk_size)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+
+def iter_json_stream(f):
+    """Yield leads from a JSON array or JSONL stream, detected from the first character."""
+    first = f.read(1)
+    while first and first.isspace():
+        first = f.read(1)
+    if not first:
+        return
+    if first == "[":
+        yield from iter_json_array(_Prepend(first, f))
+        return
+    line = first + f.readline()
+    while line:
+        if line.strip():
+            yield json.loads(line)
+        line = f.readline()
+
+
+class _Prepend:
+    """File wrapper that replays an already-consumed prefix."""
+    
+    def __init__(self, prefix: str, f):
+        self.prefix, self.f = prefix, f
+    
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ""
+        return prefix + self.f.read(size)
+
+
+def business_to_lead(business: dict) -> dict:
+    """Map a businesses row from the scraper database to the lead format."""
+    tier = business.get("tier")
+    return {
+        "fsq_id": business.get("fsq_id"),
+        "business_name": business.get("name"),
+        "industry": business.get("category") or "",
+        "phone": business.get("phone"),
+        "email": business.get("email"),
+        "website": business.get("website"),
+        "current_website_status": business.get("website_status"),
+        "tier": f"Tier {tier}" if isinstance(tier, int) else tier,
+        "locality": business.get("locality"),
+    }
+
+
+class DemoQueue:
+    """
+    Demo generation through the TaskRegistry work queue.
+    
+    enqueue() registers leads (by fsq_id) as demo_generation tasks. Iterating
+    claims them a batch at a time under a lease and yields each business as a
+    lead, so any number of workers on hosts sharing the database split the
+    work; finished() completes or fails the task (failures retry with backoff
+    and end up dead-lettered). Iteration stops once nothing is claimable.
+    
+    A task only completes once its demo is deployed: with deploy="batch",
+    rendered tasks stay in progress until deployed() reports the bundle's
+    outcome. Every held task (waiting in the look-ahead, rendering or
+    awaiting the deploy) is heartbeated until close().
+    """
+    
+    def __init__(self, db_path: str, batch_size: int = 2, lease_seconds: float = 300, limit: int = None,
+                 deploy: str = "batch"):
+        from Renovation.core.database.repository import BusinessRepository, WorkflowStateRepository
+        self.tasks = WorkflowStateRepository(db_path)
+        self.businesses = BusinessRepository(db_path)
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        # Claim no more than this many in total, so no claimed task goes unworked
+        self.limit = limit
+        self.deploy = deploy
+        self._claimed = {}  # fsq_id -> task_id, claimed and not yet finished
+        self._awaiting_deploy = {}  # fsq_id -> task_id, rendered for the batch deploy
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+    
+    @staticmethod
+    def task_id(fsq_id: str) -> str:
+        return f"{DEMO_WORKFLOW}:{fsq_id}"
+    
+    def enqueue(self, leads) -> tuple:
+        """Queue every lead with an fsq_id. Returns (added, already_queued, without_id)."""
+        added = queued = missing = 0
+        for lead in leads:
+            fsq_id = lead.get("fsq_id")
+            if not fsq_id:
+                missing += 1
+            elif self.tasks.enqueue(self.task_id(fsq_id), DEMO_WORKFLOW, fsq_id):
+                added += 1
+            else:
+                queued += 1
+        return added, queued, missing
+    
+    def __iter__(self):
+        self._start_heartbeat()
+        remaining = self.limit
+        while remaining is None or remaining > 0:
+            size = self.batch_size if remaining is None else min(self.batch_size, remaining)
+            tasks = self.tasks.claim_batch(DEMO_WORKFLOW, size, self.lease_seconds)
+            if not tasks:
+                return
+            if remaining is not None:
+                remaining -= len(tasks)
+            for task in tasks:
+                business = self.businesses.get_by_id(task["business_fsq_id"])
+                if business is None:
+                    self.tasks.mark_failed(task["task_id"], "business not found", retryable=False)
+                    continue
+                with self._lock:
+                    self._claimed[business["fsq_id"]] = task["task_id"]
+                yield business_to_lead(business)
+    
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            return
+        interval = max(1.0, self.lease_seconds / 3)
         
-        # 4-Agent Analysis Outputs
-        "marketAwareAnalysis": {
-            "agent1_tier_presence": tier_analysis,
-            "agent2_competitive_intelligence": {
-                "competitorsFound": niche_intel["competitorsFound"],
-                "competitorNames": niche_intel["competitorNames"],
-                "opportunities": niche_intel["marketOpportunities"][:3],
-                "overusedPatterns": niche_intel["competitiveThreats"]["mostCommon"],
-            },
-            "agent3_design_synthesis": {
-                "designStyle": design_synthesis["designStyle"],
-                "colorPalette": tokens,
-                "animationLevel": design_synthesis["animationLevel"],
-                "uiPersonality": design_synthesis["uiPersonality"],
-            },
-            "agent4_demo_composition": {
-                "sections": demo_composition["structure"]["sections"],
-                "components": demo_composition["structure"]["totalComponents"],
-                "complexity": demo_composition["structure"]["complexity"],
-            },
-        },
+        def loop():
+            while not self._stop.wait(interval):
+                with self._lock:
+                    held = list(self._claimed.items()) + list(self._awaiting_deploy.items())
+                for fsq_id, task_id in held:
+                    try:
+                        alive = self.tasks.heartbeat(task_id, self.lease_seconds)
+                    except Exception as e:
+                        # Busy database: the lease has slack for the next beat
+                        print(f"⚠ Heartbeat for {task_id} failed: {e}")
+                        continue
+                    if alive:
+                        continue
+                    with self._lock:
+                        # Not lost if finished() or deployed() settled it since the snapshot
+                        lost = task_id in (self._claimed.get(fsq_id), self._awaiting_deploy.get(fsq_id))
+                        if lost:
+                            self._claimed.pop(fsq_id, None)
+                            self._awaiting_deploy.pop(fsq_id, None)
+                    if lost:
+                        print(f"⚠ Lease on {task_id} lost; another worker will retry it")
         
-        # Legacy format (backwards compatibility)
-        "competitors_analyzed": niche_intel["competitorsFound"],
-        "design_brief": design_brief,
-        "design_tokens": tokens,
+        self._heartbeat = threading.Thread(target=loop, name="demo-queue-heartbeat", daemon=True)
+        self._heartbeat.start()
+    
+    def _record(self, task_id: str, error: str = None) -> None:
+        if error is None:
+            held = self.tasks.mark_completed(task_id)
+        else:
+            held = self.tasks.mark_failed(task_id, error) is not None
+        if not held:
+            print(f"⚠ Lease on {task_id} expired before it finished; not recorded")
+    
+    def finished(self, lead: dict, error: Exception = None, result: dict = None) -> None:
+        """on_finished hook for iter_results; result is None for leads skipped on resume"""
+        fsq_id = lead.get("fsq_id")
+        with self._lock:
+            task_id = self._claimed.pop(fsq_id, None)
+            if task_id is None:
+                return
+            method = (result or {}).get("deployment_method")
+            if error is None and self.deploy == "batch" and method not in DEPLOYED_METHODS:
+                self._awaiting_deploy[fsq_id] = task_id
+                return
+        if error is not None:
+            self._record(task_id, str(error))
+        elif self.deploy == "per-lead" and result is not None and method not in DEPLOYED_METHODS:
+            self._record(task_id, f"deploy failed (demo left {method})")
+        else:
+            self._record(task_id)
+    
+    def deployed(self, method: str = None) -> None:
+        """
+        Settle tasks held for the batch deploy: completed if the bundle went
+        out (or none was needed, method None), failed for retry otherwise.
+        """
+        with self._lock:
+            waiting, self._awaiting_deploy = self._awaiting_deploy, {}
+        error = None if method is None or method in DEPLOYED_METHODS else f"bundle deploy failed (demos left {method})"
+        for task_id in waiting.values():
+            self._record(task_id, error)
+    
+    @contextmanager
+    def deploy_lock(self, poll_seconds: float = 5.0):
+        """
+        Serialize bundle deploys between queue workers.
         
-        # Metadata
-        "generated_at": datetime.now().isoformat(),
-        "generation_time_seconds": "~7",
-        "status": "ready_for_client",
+        Each deploy publishes the whole of DEMO_SITES_DIR to the same
+        production project, so workers must share that directory (one host
+        or a shared volume); the lock stops two of them deploying at once.
+        """
+        name = f"{DEMO_WORKFLOW}:deploy"
+        # Two CLI attempts of up to 300s each, plus slack
+        while not self.tasks.acquire_lock(name, ttl_seconds=900):
+            time.sleep(poll_seconds)
+        try:
+            yield
+        finally:
+            self.tasks.release_lock(name)
+    
+    def close(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+
+
+def warm_competitor_cache(leads) -> int:
+    """Look up competitors for every distinct niche/locality before the run"""
+    keys = {
+        (industry_niche(lead.get("industry", "")), competitor_cache.lead_locality(lead))
+        for lead in leads
     }
+    fetched = competitor_cache.shared_cache().warm(keys)
+    print(f"🔎 Competitors: {len(keys)} niche/locality combinations, {fetched} fetched, rest cached")
+    return fetched
+
+
+def iter_leads(source: str, tier: int = 1):
+    """
+    Lazily yield leads from a source:
+      -              JSON array or JSONL on stdin
+      *.jsonl        one lead per line
+      *.json         JSON array, parsed incrementally
+      sqlite:PATH    open leads of `tier` from the scraper database (also *.db)
+    """
+    if source == "-":
+        yield from iter_json_stream(sys.stdin)
+    elif source.startswith("sqlite:") or source.endswith(".db"):
+        from Renovation.core.database.repository import BusinessRepository
+        db_path = source[len("sqlite:"):] if source.startswith("sqlite:") else source
+        for business in BusinessRepository(db_path).iter_by_tier(tier):
+            yield business_to_lead(business)
+    else:
+        with open(source) as f:
+            yield from iter_json_stream(f)
+
+
+def read_results_log(path: str):
+    """Yield entries from a JSONL results log, ignoring a torn final line."""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A crash mid-append leaves a partial last line
+                continue
+
+
+def compact_results(log_path: str, results_file: str, deployment=None,
+                    manifest: DemoManifest = None, site_dir: str = DEMO_SITES_DIR) -> int:
+    """
+    Stream the JSONL results log into the final results JSON array.
     
-    return result
+    Entries still marked "pending" get their URL from `deployment`
+    ((method, base_url) from deploy_site, or None to leave them local).
+    Fresh entries are recorded in the manifest. Entries are written one at a
+    time, so memory stays flat. Returns the number of entries written.
+    """
+    count = 0
+    tmp_path = f"{results_file}.tmp"
+    with open(tmp_path, "w") as out:
+        out.write("[")
+        for entry in read_results_log(log_path):
+            if entry.get("deployment_method") == "pending":
+                method, base_url = deployment or ("local", None)
+                assign_demo_url(entry, method, base_url, site_dir)
+            if manifest is not None and not entry.get("unchanged"):
+                manifest.record(entry)
+            out.write(",\n" if count else "\n")
+            # Same layout json.dump(results, indent=2) produced
+            out.write(textwrap.indent(json.dumps(entry, indent=2), "  "))
+            count += 1
+        out.write("\n]" if count else "]")
+    os.replace(tmp_path, results_file)
+    return count
 
 
 def main():
@@ -274,77 +875,158 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Generate competitive design demos")
-    parser.add_argument("leads_json", help="Path to leads JSON file")
+    parser.add_argument("leads_json",
+                        help="Leads source: JSON/JSONL file, '-' for stdin, sqlite:PATH, or queue:PATH to work the task queue")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of leads")
+    parser.add_argument("--tier", type=int, default=1, help="Tier to pull when reading from sqlite:PATH")
     parser.add_argument("--protect", action="store_true", help="Protect demos by appending random tokens to filenames")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Process up to N leads concurrently; the shared agent DAG pool grows to fit "
+                             "(N x parallel agent nodes, never below AGENT_DAG_WORKERS)")
+    parser.add_argument("--deploy", choices=["batch", "per-lead", "none"], default="batch",
+                        help="Deploy all demos once at the end (batch), after each lead, or not at all. "
+                             "Queue workers deploying in batch must share demo_sites/ (each deploy publishes "
+                             "the whole directory); their deploys are serialized through the queue database")
+    parser.add_argument("--inline-assets", action="store_true",
+                        help="Inline the CSS/JS in every demo instead of linking shared hashed assets "
+                             "(always the case with --deploy per-lead)")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate every demo even if its inputs are unchanged since the last run")
+    parser.add_argument("--results-log", default="demo_results.jsonl",
+                        help="JSONL checkpoint log that each result is appended to as it finishes")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run, skipping leads already in the results log")
+    parser.add_argument("--enqueue", metavar="DB",
+                        help="Queue the source's leads as demo_generation tasks in DB and exit; workers then run queue:DB")
+    parser.add_argument("--lease-seconds", type=float, default=300,
+                        help="Lease on claimed queue tasks; a task not finished in time is retried elsewhere")
+    parser.add_argument("--warm-competitors", action="store_true",
+                        help="Look up competitors for every distinct niche/locality first (an extra pass over the source)")
+    parser.add_argument("--metrics-file", default=os.getenv("DEMO_METRICS_FILE"),
+                        help="Write agent/stage latency metrics here in Prometheus text format at the end of the run")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics on this port while the run is in progress")
     args = parser.parse_args()
     
-    # Load leads
-    print(f"\n📂 Loading leads from: {args.leads_json}")
-    with open(args.leads_json) as f:
-        leads = json.load(f)
+    if args.metrics_port:
+        METRICS.serve(args.metrics_port)
+        print(f"📈 Serving metrics on :{args.metrics_port}")
+    
+    from_queue = args.leads_json.startswith("queue:")
+    if args.warm_competitors:
+        if args.leads_json == "-" or from_queue:
+            print("⚠ --warm-competitors needs a file or sqlite source; stdin and the queue can only be read once")
+        else:
+            warm_leads = iter_leads(args.leads_json, tier=args.tier)
+            with stage_timer("competitor_warm"):
+                warm_competitor_cache(islice(warm_leads, args.limit) if args.limit else warm_leads)
     
-    if args.limit:
-        leads = leads[:args.limit]
+    # Stream leads; nothing is read until the pipeline asks for the next one
+    print(f"\n📂 Streaming leads from: {args.leads_json}")
+    queue = None
+    if from_queue:
+        queue = DemoQueue(args.leads_json[len("queue:"):], batch_size=max(1, args.workers) * 2,
+                          lease_seconds=args.lease_seconds, limit=args.limit, deploy=args.deploy)
+        leads = iter(queue)
+    else:
+        leads = iter_leads(args.leads_json, tier=args.tier)
+        if args.limit:
+            leads = islice(leads, args.limit)
     
-    print(f"✓ Loaded {len(leads)} leads")
+    # Producer mode: queue the leads for workers and stop
+    if args.enqueue:
+        added, queued, missing = DemoQueue(args.enqueue).enqueue(leads)
+        print(f"📥 Queued {added} leads in {args.enqueue} ({queued} already queued, {missing} without fsq_id)")
+        return
+    
+    # Resume: leads already in the results log are not processed again
+    done_hashes = set()
+    resumed_pending = 0
+    if args.resume:
+        for entry in read_results_log(args.results_log):
+            if entry.get("input_hash"):
+                done_hashes.add(entry["input_hash"])
+            resumed_pending += entry.get("deployment_method") == "pending"
+        print(f"↻ Resuming: {len(done_hashes)} leads already in {args.results_log}")
+        # Terminate a torn last line so new entries start on their own line
+        if os.path.exists(args.results_log) and os.path.getsize(args.results_log):
+            with open(args.results_log, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            if torn:
+                with open(args.results_log, "a") as f:
+                    f.write("\n")
+    else:
+        open(args.results_log, "w").close()
     
     # Process leads
-    results = []
     start_time = time.time()
+    if args.workers > 1:
+        print(f"⚡ Running with {args.workers} workers")
+        # Agent nodes of every lead share one pool; size it so leads don't queue on it
+        pool_size = market_aware_agent.reserve_agent_workers(args.workers)
+        if pool_size:
+            print(f"   Agent DAG pool: {pool_size} threads")
+    # Shared stylesheet/script, written once per run under demo_sites/assets/
+    # (per-lead deploys upload single pages, so those stay inlined)
+    inline = args.inline_assets or args.deploy == "per-lead"
+    assets = None if inline else write_shared_assets(DEMO_SITES_DIR)
+    manifest = DemoManifest()
     
-    for lead in leads:
-        try:
-            result = process_lead_with_agents(lead)
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Error processing {lead.get('business_name')}: {e}")
-            continue
+    generated = unchanged = 0
+    with open(args.results_log, "a") as log:
+        for entry in iter_results(leads, workers=args.workers, deploy=args.deploy == "per-lead",
+                                  assets=assets, manifest=None if args.force else manifest,
+                                  skip_hashes=done_hashes, on_finished=queue.finished if queue else None):
+            if entry.get("unchanged"):
+                unchanged += 1
+            else:
+                generated += 1
+                # Optionally protect demo files by appending random tokens
+                # (before deployment, so the bundle has the final filenames)
+                if args.protect:
+                    try:
+                        protect_demo(entry)
+                    except Exception as e:
+                        print(f"⚠ Failed to protect demo: {e}")
+            # Checkpoint each result as soon as it is done
+            log.write(json.dumps(entry) + "\n")
+            log.flush()
     
     elapsed = time.time() - start_time
+    processed = generated + unchanged
+    print(f"✓ {generated} generated, {unchanged} unchanged")
     
-    # Optionally protect demo files by appending random tokens
-    if args.protect:
-        print("\n🔐 Protecting demo files with random tokens...")
-        try:
-            import secrets
-            protected_results = []
-            for entry in results:
-                demo_url = entry.get("demo_url")
-                business_name = entry.get("business_name", "demo").lower().replace(" ", "-").replace("_", "-")
-                original_path = f"demo_sites/{business_name}.html"
-                if os.path.exists(original_path):
-                    token = secrets.token_urlsafe(10)
-                    protected_name = f"{business_name}-{token}.html"
-                    protected_path = f"demo_sites/{protected_name}"
-                    os.rename(original_path, protected_path)
-                    # Update demo_url if local or vercel
-                    if demo_url and "vercel" in demo_url:
-                        entry["demo_url"] = demo_url.rsplit('/', 1)[0] + f"/{protected_name}"
-                    else:
-                        entry["demo_url"] = f"file://{os.path.abspath(protected_path)}"
-                    entry["protected"] = True
-                    entry["protected_filename"] = protected_name
-                protected_results.append(entry)
-            results = protected_results
-            print("✓ Demo files protected")
-        except Exception as e:
-            print(f"⚠ Failed to protect demos: {e}")
+    # One deploy for everything still pending (including leads from a resumed
+    # run); unchanged demos are already deployed
+    deployment = None
+    if args.deploy == "batch" and (generated or resumed_pending):
+        print(f"\n🚀 Deploying demos as one bundle from {DEMO_SITES_DIR}/...")
+        with stage_timer("deploy_bundle"), (queue.deploy_lock() if queue else nullcontext()):
+            deployment = deploy_site(DEMO_SITES_DIR)
+    if queue:
+        # Queue tasks complete only now that their demos are live
+        queue.deployed(deployment[0] if deployment else None)
+        queue.close()
     
     # Save results
     results_file = "demo_results.json"
-    with open(results_file, "w") as f:
-        json.dump(results, f, indent=2)
+    total = compact_results(args.results_log, results_file, deployment, manifest)
+    manifest.save()
     
     print(f"\n{'='*72}")
     print(f"✅ PIPELINE COMPLETE")
     print(f"{'='*72}")
-    print(f"Processed: {len(results)} leads")
-    if len(results) > 0:
-        print(f"Time: {elapsed:.1f} seconds ({elapsed/len(results):.1f}s per lead)")
+    print(f"Processed: {processed} leads ({total} in results)")
+    if processed > 0:
+        print(f"Time: {elapsed:.1f} seconds ({elapsed/processed:.1f}s per lead)")
     else:
         print(f"Time: {elapsed:.1f} seconds (no leads processed)")
     print(f"Results: {results_file}")
+    METRICS.print_summary()
+    if args.metrics_file:
+        METRICS.write_prometheus(args.metrics_file)
+        print(f"Metrics: {args.metrics_file}")
     print(f"{'='*72}\n")
 
 
@@ -1,40 +1,35 @@
 """
 Enhanced Template Generator
 Builds full-featured responsive HTML templates
+
+The per-lead pieces are str.format templates; by default the stylesheet
+and script are inlined, so every demo is a single self-contained file. Pass
+the hrefs from write_shared_assets() to link one content-hashed copy instead;
+each page then carries only its palette tokens and lead content.
 """
 
+import hashlib
 import os
+import textwrap
 
-def build_enhanced_template(lead, tokens):
-    """Build enhanced HTML template with design tokens."""
-    
-    business_name = lead.get("business_name", "Business")
-    niche = lead.get("niche", "general")
-    tier = lead.get("tier", "Tier 1")
-    
-    primary = tokens.get("primary", "#2563eb")
-    secondary = tokens.get("secondary", "#3b82f6")
-    accent = tokens.get("accent", "#10b981")
-    
-    enable_payments = os.getenv("ENABLE_PAYMENTS", "0") == "1" or bool(lead.get("enable_payments"))
-    pay_button_html = ""
-    if enable_payments:
-        safe_business = business_name.lower().replace(" ", "-").replace("_", "-")
-        pay_button_html = f"""
-            <a href=\"/pay?business={safe_business}\" style=\"margin-left: 1rem; background: var(--accent); color: white; padding: 0.75rem 1.5rem; border-radius: 6px; text-decoration: none;\">Pay Deposit</a>
-        """
-    
-    html = f'''<!DOCTYPE html>
+# _HEAD, _TOKENS_CSS and _BODY are str.format templates (literal braces
+# doubled); the shared CSS/JS chunks are plain strings and never formatted
+_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{business_name} - Professional Landing Page</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.6; color: #1a1a1a; }}
+'''
+
+# Static rules before the palette tokens (kept in this order for inline pages)
+_BASE_CSS_PRELUDE = '''        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.6; color: #1a1a1a; }
         
-        /* Colors */
+'''
+
+# The only per-lead CSS
+_TOKENS_CSS = '''        /* Colors */
         :root {{
             --primary: {primary};
             --secondary: {secondary};
@@ -42,71 +37,73 @@ def build_enhanced_template(lead, tokens):
             --neutral: #f5f5f5;
             --dark: #1f2937;
         }}
-        
+'''
+
+_BASE_CSS = '''        
         /* Header */
-        header {{
+        header {
             position: sticky;
             top: 0;
             background: white;
             box-shadow: 0 1px 3px rgba(0,0,0,0.1);
             z-index: 100;
             padding: 1rem 2rem;
-        }}
+        }
         
-        header .container {{
+        header .container {
             display: flex;
             justify-content: space-between;
             align-items: center;
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
         
-        header h1 {{
+        header h1 {
             font-size: 1.5rem;
             color: var(--dark);
-        }}
+        }
         
-        header a {{
+        header a {
             background: var(--primary);
             color: white;
             padding: 0.75rem 1.5rem;
             border-radius: 6px;
             text-decoration: none;
             transition: all 0.3s ease;
-        }}
+        }
         
-        header a:hover {{
+        header a:hover {
             transform: translateY(-2px);
             box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }}
+        }
         
         /* Hero Section */
-        .hero {{
+        .hero {
             background: linear-gradient(135deg, var(--primary), var(--secondary));
             color: white;
             padding: 6rem 2rem;
             text-align: center;
             animation: fadeIn 0.8s ease;
-        }}
+        }
         
-        .hero .container {{
+        .hero .container {
             max-width: 600px;
             margin: 0 auto;
-        }}
+        }
         
-        .hero h2 {{
+        .hero h2 {
             font-size: 3rem;
             margin-bottom: 1rem;
             font-weight: 700;
-        }}
+        }
         
-        .hero p {{
+        .hero p {
             font-size: 1.2rem;
             margin-bottom: 2rem;
             opacity: 0.95;
-        }}
+        }
         
-        .hero button {{
+        .hero button {
             background: white;
             color: var(--primary);
             padding: 1rem 2rem;
@@ -116,130 +113,130 @@ def build_enhanced_template(lead, tokens):
             font-weight: 600;
             cursor: pointer;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .hero button:hover {{
+        .hero button:hover {
             transform: scale(1.05);
             box-shadow: 0 6px 20px rgba(0,0,0,0.2);
-        }}
+        }
         
         /* Features Section */
-        .features {{
+        .features {
             padding: 4rem 2rem;
             background: var(--neutral);
-        }}
+        }
         
-        .features .container {{
+        .features .container {
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
         
-        .features h2 {{
+        .features h2 {
             text-align: center;
             margin-bottom: 3rem;
             font-size: 2.5rem;
             color: var(--dark);
-        }}
+        }
         
-        .features-grid {{
+        .features-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
             gap: 2rem;
-        }}
+        }
         
-        .feature-card {{
+        .feature-card {
             background: white;
             padding: 2rem;
             border-radius: 12px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.08);
             transition: all 0.3s ease;
             animation: slideUp 0.6s ease;
-        }}
+        }
         
-        .feature-card:hover {{
+        .feature-card:hover {
             transform: translateY(-8px);
             box-shadow: 0 8px 20px rgba(0,0,0,0.12);
             border-top: 4px solid var(--accent);
-        }}
+        }
         
-        .feature-card h3 {{
+        .feature-card h3 {
             color: var(--primary);
             margin-bottom: 1rem;
             font-size: 1.5rem;
-        }}
+        }
         
-        .feature-card p {{
+        .feature-card p {
             color: #666;
             line-height: 1.8;
-        }}
+        }
         
         /* Testimonials Section */
-        .testimonials {{
+        .testimonials {
             padding: 4rem 2rem;
-        }}
+        }
         
-        .testimonials .container {{
+        .testimonials .container {
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
         
-        .testimonials h2 {{
+        .testimonials h2 {
             text-align: center;
             margin-bottom: 3rem;
             font-size: 2.5rem;
             color: var(--dark);
-        }}
+        }
         
-        .testimonials-grid {{
+        .testimonials-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 2rem;
-        }}
+        }
         
-        .testimonial-card {{
+        .testimonial-card {
             background: var(--neutral);
             padding: 2rem;
             border-radius: 12px;
             border-left: 4px solid var(--accent);
             animation: fadeIn 0.8s ease;
-        }}
+        }
         
-        .testimonial-card p {{
+        .testimonial-card p {
             font-style: italic;
             color: #555;
             margin-bottom: 1.5rem;
-        }}
+        }
         
-        .testimonial-card .author {{
+        .testimonial-card .author {
             font-weight: 600;
             color: var(--primary);
-        }}
+        }
         
         /* CTA Section */
-        .cta {{
+        .cta {
             background: var(--dark);
             color: white;
             padding: 4rem 2rem;
             text-align: center;
-        }}
+        }
         
-        .cta .container {{
+        .cta .container {
             max-width: 600px;
             margin: 0 auto;
-        }}
+        }
         
-        .cta h2 {{
+        .cta h2 {
             font-size: 2rem;
             margin-bottom: 1rem;
-        }}
+        }
         
-        .cta p {{
+        .cta p {
             font-size: 1.1rem;
             margin-bottom: 2rem;
             opacity: 0.9;
-        }}
+        }
         
-        .cta button {{
+        .cta button {
             background: var(--accent);
             color: white;
             padding: 1rem 2.5rem;
@@ -249,25 +246,25 @@ def build_enhanced_template(lead, tokens):
             font-weight: 600;
             cursor: pointer;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .cta button:hover {{
+        .cta button:hover {
             background: var(--primary);
             transform: scale(1.05);
-        }}
+        }
         
         /* Contact Form */
-        .contact-form {{
+        .contact-form {
             max-width: 500px;
             margin: 2rem auto;
             background: white;
             padding: 2rem;
             border-radius: 12px;
             box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-        }}
+        }
         
         .contact-form input,
-        .contact-form textarea {{
+        .contact-form textarea {
             width: 100%;
             padding: 1rem;
             margin-bottom: 1rem;
@@ -275,14 +272,14 @@ def build_enhanced_template(lead, tokens):
             border-radius: 6px;
             font-family: inherit;
             font-size: 1rem;
-        }}
+        }
         
-        .contact-form textarea {{
+        .contact-form textarea {
             resize: vertical;
             min-height: 120px;
-        }}
+        }
         
-        .contact-form button {{
+        .contact-form button {
             width: 100%;
             background: var(--primary);
             color: white;
@@ -293,56 +290,57 @@ def build_enhanced_template(lead, tokens):
             font-weight: 600;
             cursor: pointer;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .contact-form button:hover {{
+        .contact-form button:hover {
             background: var(--secondary);
             transform: translateY(-2px);
-        }}
+        }
         
         /* Footer */
-        footer {{
+        footer {
             background: var(--dark);
             color: white;
             padding: 3rem 2rem;
             text-align: center;
-        }}
+        }
         
-        footer .container {{
+        footer .container {
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
         
-        footer p {{
+        footer p {
             opacity: 0.8;
             margin-bottom: 1rem;
-        }}
+        }
         
         /* Animations */
-        @keyframes fadeIn {{
-            from {{ opacity: 0; }}
-            to {{ opacity: 1; }}
-        }}
+        @keyframes fadeIn {
+            from { opacity: 0; }
+            to { opacity: 1; }
+        }
         
-        @keyframes slideUp {{
-            from {{
+        @keyframes slideUp {
+            from {
                 opacity: 0;
                 transform: translateY(20px);
-            }}
-            to {{
+            }
+            to {
                 opacity: 1;
                 transform: translateY(0);
-            }}
-        }}
+            }
+        }
         
         /* Responsive */
-        @media (max-width: 768px) {{
-            .hero h2 {{ font-size: 2rem; }}
-            .features h2, .testimonials h2 {{ font-size: 1.8rem; }}
-            header h1 {{ font-size: 1.2rem; }}
-        }}
-    </style>
-</head>
+        @media (max-width: 768px) {
+            .hero h2 { font-size: 2rem; }
+            .features h2, .testimonials h2 { font-size: 1.8rem; }
+            header h1 { font-size: 1.2rem; }
+        }
+'''
+
+_BODY = '''</head>
 <body>
     <!-- Header -->
     <header>
@@ -444,16 +442,91 @@ def build_enhanced_template(lead, tokens):
         </div>
     </footer>
     
-    <script>
-        function handleSubmit(event) {{
+'''
+
+_SCRIPT = '''        function handleSubmit(event) {
             event.preventDefault();
             alert('Thank you for reaching out! We will contact you soon.');
             event.target.reset();
-        }}
-    </script>
-</body>
-</html>'''
+        }
+'''
+
+_INLINE_STYLE = "    <style>\n" + _BASE_CSS_PRELUDE
+_INLINE_TAIL = _BASE_CSS + "    </style>\n"
+_INLINE_SCRIPT = "    <script>\n" + _SCRIPT + "    </script>\n</body>\n</html>"
+
+_LINKED_HEAD = '    <link rel="stylesheet" href="{css_href}">\n    <style>\n'
+_LINKED_TAIL = '    <script src="{js_href}"></script>\n</body>\n</html>'
+
+# Changes whenever any part of the template does; demo_generation keys its
+# skip-if-unchanged manifest on it
+TEMPLATE_VERSION = hashlib.sha256(
+    "\0".join((_HEAD, _BASE_CSS_PRELUDE, _TOKENS_CSS, _BASE_CSS, _BODY, _SCRIPT)).encode("utf-8")
+).hexdigest()[:12]
+
+SHARED_CSS = textwrap.dedent(_BASE_CSS_PRELUDE + _BASE_CSS)
+SHARED_JS = textwrap.dedent(_SCRIPT)
+
+
+def _hashed_name(stem: str, content: str, ext: str) -> str:
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:10]
+    return f"{stem}-{digest}.{ext}"
+
+
+def write_shared_assets(site_dir: str, subdir: str = "assets") -> dict:
+    """
+    Write the shared stylesheet and script into site_dir/subdir under
+    content-hashed names (skipped if already present) and return the hrefs
+    to pass to build_enhanced_template(), relative to site_dir.
+    """
+    asset_dir = os.path.join(site_dir, subdir)
+    os.makedirs(asset_dir, exist_ok=True)
+    hrefs = {}
+    for key, content, ext in (("css_href", SHARED_CSS, "css"), ("js_href", SHARED_JS, "js")):
+        name = _hashed_name("enhanced", content, ext)
+        path = os.path.join(asset_dir, name)
+        if not os.path.exists(path):
+            with open(path, "w") as f:
+                f.write(content)
+        hrefs[key] = f"{subdir}/{name}"
+    return hrefs
+
+
+def build_enhanced_template(lead, tokens, assets=None):
+    """
+    Build enhanced HTML template with design tokens.
+    
+    assets: hrefs from write_shared_assets() to link the shared CSS/JS;
+    when omitted they are inlined.
+    """
+    
+    business_name = lead.get("business_name", "Business")
+    niche = lead.get("niche", "general")
+    tier = lead.get("tier", "Tier 1")
+    
+    primary = tokens.get("primary", "#2563eb")
+    secondary = tokens.get("secondary", "#3b82f6")
+    accent = tokens.get("accent", "#10b981")
+    
+    enable_payments = os.getenv("ENABLE_PAYMENTS", "0") == "1" or bool(lead.get("enable_payments"))
+    pay_button_html = ""
+    if enable_payments:
+        safe_business = business_name.lower().replace(" ", "-").replace("_", "-")
+        pay_button_html = f"""
+            <a href=\"/pay?business={safe_business}\" style=\"margin-left: 1rem; background: var(--accent); color: white; padding: 0.75rem 1.5rem; border-radius: 6px; text-decoration: none;\">Pay Deposit</a>
+        """
     
-    return html
+    head = _HEAD.format(business_name=business_name)
+    tokens_css = _TOKENS_CSS.format(primary=primary, secondary=secondary, accent=accent)
+    body = _BODY.format(business_name=business_name, pay_button_html=pay_button_html)
+    if assets:
+        return "".join((
+            head,
+            _LINKED_HEAD.format(css_href=assets["css_href"]),
+            tokens_css, "    </style>\n",
+            body,
+            _LINKED_TAIL.format(js_href=assets["js_href"]),
+        ))
+    return "".join((head, _INLINE_STYLE, tokens_css, _INLINE_TAIL, body, _INLINE_SCRIPT))
 
-__all__ = ["build_enhanced_template"]
+__all__ = ["build_enhanced_template", "write_shared_assets", "TEMPLATE_VERSION"]
@@ -14,30 +14,56 @@ Every lead is processed through all 4 agents to ensure:
 - Production-ready (immediate deployment)
 """
 
+import asyncio
+import atexit
 import json
 import sys
 import os
+import threading
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
+from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from competitive_design_agent import (
-    search_competitors,
     generate_design_brief,
     generate_original_palette,
 )
+from competitor_cache import SCRAPER_DB, lead_locality, lookup_competitors, shared_cache
+from shadow_benchmark import ShadowRunner
 
 # Import new architecture components (lazy import to avoid circular dependencies)
 try:
     from Renovation.infrastructure.feature_flags.flag_manager import FeatureFlagManager
+    from Renovation.infrastructure.monitoring.kill_switch import KillSwitches
     from Renovation.agents.analysis import TierPresenceAnalyzer, CompetitiveIntelligenceAgent
     from Renovation.agents.generation import DesignSynthesizer, DemoComposer
+    from Renovation.agents.orchestration import AgentDAG, timed_out_nodes, ensure_dag_workers
     RENOVATION_AVAILABLE = True
 except ImportError:
     RENOVATION_AVAILABLE = False
 
+# Deadline for the Renovation agent DAG per lead; agents that miss it answer
+# with a degraded fallback. 0 disables it.
+PIPELINE_TIMEOUT = float(os.getenv("PIPELINE_TIMEOUT_SECONDS", "30")) or None
+
+# Shadow mode: also run each lead through the path it wasn't routed to, in the
+# background, and log latency and output diffs (see shadow_benchmark.py)
+SHADOW_MODE = os.getenv("PIPELINE_SHADOW", "").lower() in ("1", "true", "yes")
+
+_shadow_runner: Optional[ShadowRunner] = None
+_shadow_lock = threading.Lock()
+
+# Activating this kill switch (KillSwitches.set_active) routes every lead to
+# the legacy path until it is cleared or auto-resumes
+RENOVATION_KILL_SWITCH = "use_new_architecture"
+
+_kill_switches: Optional["KillSwitches"] = None
+_kill_switch_lock = threading.Lock()
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # AGENT 1: TIER & PRESENCE ANALYSIS
@@ -155,7 +181,7 @@ def analyze_niche_intelligence(lead: Dict) -> Dict:
     industry = lead.get("industry", "General").lower()
 
     # Search for competitors
-    competitors = search_competitors(niche, limit=5)
+    competitors = lookup_competitors(niche, lead_locality(lead), limit=5)
 
     # Niche-specific standards (curated from market research)
     niche_standards_map = {
@@ -302,6 +328,7 @@ def analyze_niche_intelligence(lead: Dict) -> Dict:
         "niche": niche,
         "competitorsFound": len(competitors),
         "competitorNames": [c.get("name") for c in competitors[:3]],
+        "competitors": competitors,
         "nicheStandards": standards,
         "competitiveThreats": {
             "mostCommon": standards["overusedPatterns"][:3],
@@ -328,7 +355,7 @@ def synthesize_original_design(lead: Dict, competitor_intel: Dict) -> Dict:
     tier = lead.get("tier", "Tier 1")
 
     # Get competitors for palette generation
-    competitors = search_competitors(niche, limit=3)
+    competitors = lookup_competitors(niche, lead_locality(lead), limit=3)
 
     # Generate palette
     palette = generate_original_palette(competitors, niche, tier)
@@ -550,77 +577,95 @@ def compose_demo_structure(
 # ═══════════════════════════════════════════════════════════════════════════
 
 
-def run_market_aware_pipeline(lead: Dict) -> Dict:
+def build_market_aware_dag() -> "AgentDAG":
     """
-    Run the complete 4-agent market-aware pipeline.
-    
-    With feature flag support for gradual migration to new architecture.
-    Returns comprehensive analysis with all 4 agents' outputs.
+    Renovation agents wired as a DAG; each node's outputs reach its dependents
+    under the node name (e.g. DemoComposer reads "design_synthesis").
     """
-    use_new_architecture = False
-    
-    # Check if new architecture is available and enabled
-    if RENOVATION_AVAILABLE:
-        try:
-            flag_manager = FeatureFlagManager()
-            context = {
-                "tier": lead.get("tier", "Tier 1"),
-                "niche": lead.get("niche", ""),
-                "business_name": lead.get("business_name", "")
-            }
-            use_new_architecture = flag_manager.is_enabled("use_new_architecture", context)
-        except Exception as e:
-            print(f"[FEATURE FLAG] Error checking flag, using legacy: {e}")
-            use_new_architecture = False
-    
-    if use_new_architecture:
-        # NEW ARCHITECTURE PATH - Using Renovation agents
-        print(f"[ROUTING] Using NEW Renovation architecture for {lead.get('business_name')}")
-        
-        # AGENT 1: Tier & Presence Analysis
-        tier_agent = TierPresenceAnalyzer()
-        tier_result = tier_agent.run(lead)
-        tier_analysis = tier_result.get("outputs", {})
-        
-        # AGENT 2: Niche Competitive Intelligence
-        intel_agent = CompetitiveIntelligenceAgent()
-        intel_result = intel_agent.run(lead)
-        niche_intel = intel_result.get("outputs", {})
-        
-        # AGENT 3: Original Design Synthesis
-        design_agent = DesignSynthesizer()
-        design_result = design_agent.run(lead)  # Pass lead directly, not wrapped
-        design_synthesis = design_result.get("outputs", {})
-        
-        # AGENT 4: Demo Composition
-        composer_agent = DemoComposer()
-        # Pass lead directly with tier_analysis and design_synthesis as additional fields
-        composer_input = {**lead}
-        composer_input["tier_analysis"] = tier_analysis
-        composer_input["design_synthesis"] = design_synthesis
-        composer_result = composer_agent.run(composer_input)
-        demo_composition = composer_result.get("outputs", {})
-    else:
-        # LEGACY PATH - Original functions
-        print(f"[ROUTING] Using LEGACY functions for {lead.get('business_name')}")
-        
-        # AGENT 1: Tier & Presence Analysis
-        tier_analysis = analyze_tier_and_presence(lead)
+    return (
+        AgentDAG()
+        .add("tier_analysis", TierPresenceAnalyzer())
+        .add("niche_intel", CompetitiveIntelligenceAgent())
+        .add("design_synthesis", DesignSynthesizer(), depends_on=["niche_intel"])
+        .add("demo_composition", DemoComposer(), depends_on=["tier_analysis", "design_synthesis"])
+    )
+
 
-        # AGENT 2: Niche Competitive Intelligence
-        niche_intel = analyze_niche_intelligence(lead)
+def reserve_agent_workers(concurrent_leads: int) -> int:
+    """
+    Grow the shared agent DAG pool for this many leads in flight, each running
+    up to max_parallel() nodes at once. Returns the pool size (0 without the
+    Renovation agents).
+    """
+    if not RENOVATION_AVAILABLE:
+        return 0
+    return ensure_dag_workers(concurrent_leads * build_market_aware_dag().max_parallel())
+
+
+def _renovation_halted() -> bool:
+    """Whether the Renovation kill switch is on (a cached lookup per lead)"""
+    global _kill_switches
+    if _kill_switches is None:
+        with _kill_switch_lock:
+            if _kill_switches is None:
+                _kill_switches = KillSwitches(Path(os.getenv("DB_PATH") or SCRAPER_DB))
+                atexit.register(_kill_switches.close)
+    return _kill_switches.is_active(RENOVATION_KILL_SWITCH)
+
+
+def _use_new_architecture(lead: Dict, flag_manager=None) -> bool:
+    """Whether the use_new_architecture flag routes this lead to the Renovation agents"""
+    if not RENOVATION_AVAILABLE:
+        return False
+    try:
+        if _renovation_halted():
+            return False
+        flag_manager = flag_manager or FeatureFlagManager()
+        context = {
+            "fsq_id": lead.get("fsq_id"),
+            "tier": lead.get("tier", "Tier 1"),
+            "niche": lead.get("niche", ""),
+            "business_name": lead.get("business_name", "")
+        }
+        return flag_manager.is_enabled("use_new_architecture", context)
+    except Exception as e:
+        print(f"[FEATURE FLAG] Error checking flag, using legacy: {e}")
+        return False
+
+
+def _legacy_outputs(lead: Dict) -> tuple:
+    # AGENT 1: Tier & Presence Analysis
+    tier_analysis = analyze_tier_and_presence(lead)
+
+    # AGENT 2: Niche Competitive Intelligence
+    niche_intel = analyze_niche_intelligence(lead)
+
+    # AGENT 3: Original Design Synthesis
+    design_synthesis = synthesize_original_design(lead, niche_intel)
+
+    # AGENT 4: Demo Composition
+    demo_composition = compose_demo_structure(lead, tier_analysis, design_synthesis)
+
+    return tier_analysis, niche_intel, design_synthesis, demo_composition
+
+
+def _dag_outputs(results: Dict) -> tuple:
+    return tuple(
+        results[name].get("outputs", {})
+        for name in ("tier_analysis", "niche_intel", "design_synthesis", "demo_composition")
+    )
 
-        # AGENT 3: Original Design Synthesis
-        design_synthesis = synthesize_original_design(lead, niche_intel)
 
-        # AGENT 4: Demo Composition
-        demo_composition = compose_demo_structure(lead, tier_analysis, design_synthesis)
+def _combine_outputs(lead: Dict, use_new_architecture: bool, outputs: tuple,
+                     timed_out: Optional[List[str]] = None) -> Dict:
+    tier_analysis, niche_intel, design_synthesis, demo_composition = outputs
 
     # Combined output (same format for both paths)
-    result = {
+    return {
         "businessName": lead.get("business_name"),
         "processedAt": datetime.now().isoformat(),
         "routedTo": "renovation" if use_new_architecture else "legacy",
+        "timedOutAgents": timed_out or [],
         "marketAwareAnalysis": {
             "agent1_tier_presence": tier_analysis,
             "agent2_competitive_intelligence": niche_intel,
@@ -637,9 +682,105 @@ def run_market_aware_pipeline(lead: Dict) -> Dict:
         },
     }
 
+
+def run_path(lead: Dict, use_new_architecture: bool) -> Dict:
+    """Combined pipeline result from one path, regardless of routing"""
+    if use_new_architecture:
+        # Agents 1 and 2 are independent and run concurrently; agent 3 reuses
+        # agent 2's competitor lookup and agent 4 waits on agents 1 and 3
+        results = build_market_aware_dag().run(lead, timeout=PIPELINE_TIMEOUT)
+        timed_out = timed_out_nodes(results)
+        if timed_out:
+            print(f"[TIMEOUT] {', '.join(timed_out)} missed the deadline for {lead.get('business_name')}")
+        return _combine_outputs(lead, True, _dag_outputs(results), timed_out)
+    return _combine_outputs(lead, False, _legacy_outputs(lead))
+
+
+def _shadow(lead: Dict, primary: Dict, primary_seconds: float) -> None:
+    """Queue the other path for this lead on the shadow threads"""
+    global _shadow_runner
+    if not RENOVATION_AVAILABLE:
+        return
+    if _shadow_runner is None:
+        with _shadow_lock:
+            if _shadow_runner is None:
+                _shadow_runner = ShadowRunner(run_path)
+    if not _shadow_runner.submit(lead, primary, primary_seconds):
+        print(f"[SHADOW] Backlog full, skipped {lead.get('business_name')}")
+
+
+def run_market_aware_pipeline(lead: Dict) -> Dict:
+    """
+    Run the complete 4-agent market-aware pipeline.
+    
+    With feature flag support for gradual migration to new architecture.
+    Returns comprehensive analysis with all 4 agents' outputs.
+    """
+    use_new_architecture = _use_new_architecture(lead)
+    
+    if use_new_architecture:
+        # NEW ARCHITECTURE PATH - Using Renovation agents
+        print(f"[ROUTING] Using NEW Renovation architecture for {lead.get('business_name')}")
+    else:
+        # LEGACY PATH - Original functions
+        print(f"[ROUTING] Using LEGACY functions for {lead.get('business_name')}")
+
+    start = time.perf_counter()
+    result = run_path(lead, use_new_architecture)
+    if SHADOW_MODE:
+        _shadow(lead, result, time.perf_counter() - start)
+    return result
+
+
+async def arun_market_aware_pipeline(lead: Dict) -> Dict:
+    """
+    run_market_aware_pipeline for callers on an event loop.
+    
+    The agent DAG is awaited (async agents natively, sync agents on worker
+    threads) and the legacy path runs on a worker thread, so the loop can keep
+    many leads in flight at once.
+    """
+    start = time.perf_counter()
+    if _use_new_architecture(lead):
+        results = await build_market_aware_dag().arun(lead, timeout=PIPELINE_TIMEOUT)
+        result = _combine_outputs(lead, True, _dag_outputs(results), timed_out_nodes(results))
+    else:
+        result = _combine_outputs(lead, False, await asyncio.to_thread(_legacy_outputs, lead))
+    if SHADOW_MODE:
+        _shadow(lead, result, time.perf_counter() - start)
     return result
 
 
+def run_market_aware_batch(leads: List[Dict]) -> List[Dict]:
+    """
+    Run the pipeline over many leads at once.
+    
+    Competitor lookups for every distinct niche/locality are warmed first, and
+    leads routed to the new architecture go through the agents' run_batch, so
+    each distinct tier/niche combination is executed once and fanned out.
+    Returns one run_market_aware_pipeline-shaped result per lead, in order.
+    """
+    flag_manager = FeatureFlagManager() if RENOVATION_AVAILABLE else None
+    routed = [_use_new_architecture(lead, flag_manager) for lead in leads]
+    renovation_leads = [lead for lead, use_new in zip(leads, routed) if use_new]
+    print(f"[ROUTING] {len(renovation_leads)}/{len(leads)} leads to NEW Renovation architecture")
+
+    # Resolve each distinct niche/locality once, concurrently, before either path needs it
+    fetched = shared_cache().warm_leads(leads)
+    if fetched:
+        print(f"[COMPETITORS] Prefetched {fetched} niche/locality combinations")
+
+    batch_results = iter(build_market_aware_dag().run_batch(renovation_leads)) if renovation_leads else iter(())
+    combined = []
+    for lead, use_new in zip(leads, routed):
+        if use_new:
+            results = next(batch_results)
+            combined.append(_combine_outputs(lead, True, _dag_outputs(results), timed_out_nodes(results)))
+        else:
+            combined.append(_combine_outputs(lead, False, _legacy_outputs(lead)))
+    return combined
+
+
 if __name__ == "__main__":
     # Test with River Tech
     test_lead = {
@@ -0,0 +1,351 @@
+"""
+Shadow-mode benchmark: legacy vs Renovation market-aware pipeline
+
+With PIPELINE_SHADOW=1, run_market_aware_pipeline answers from the routed
+path as usual and replays the lead through the other path on a background
+thread. Each pair is timed, diffed and appended to SHADOW_LOG as one JSON
+line. Run as a script, this benchmarks both paths over a lead source (or
+summarises an existing shadow log) into a report, and exits non-zero when
+the Renovation path misses the latency or parity gates.
+
+    python scripts/shadow_benchmark.py leads.json --report shadow_report.json
+    python scripts/shadow_benchmark.py --from-log shadow_results.jsonl --max-p95-ratio 1.1 --min-parity 0.99
+"""
+
+import copy
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+try:
+    from Renovation.infrastructure.monitoring.latency_metrics import observe_shadow
+except ImportError:
+    observe_shadow = None
+
+SHADOW_LOG = os.getenv("SHADOW_LOG", "shadow_results.jsonl")
+SHADOW_WORKERS = int(os.getenv("PIPELINE_SHADOW_WORKERS", "2"))
+# Shadow runs beyond this many queued are dropped instead of piling up
+SHADOW_MAX_PENDING = int(os.getenv("PIPELINE_SHADOW_MAX_PENDING", "100"))
+
+PATHS = ("legacy", "renovation")
+# Fields that differ on every run or describe routing rather than output
+VOLATILE_FIELDS = frozenset({"timestamp", "processedAt", "routedTo", "timedOutAgents", "cached"})
+MAX_DIFFS = 50
+
+
+def diff_outputs(a, b, path: str = "") -> List[str]:
+    """Dotted paths where two pipeline results differ (at most MAX_DIFFS)"""
+    diffs: List[str] = []
+    _diff(a, b, path, diffs)
+    return diffs
+
+
+def _diff(a, b, path: str, diffs: List[str]) -> None:
+    if len(diffs) >= MAX_DIFFS:
+        return
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b), key=str):
+            if key in VOLATILE_FIELDS:
+                continue
+            child = f"{path}.{key}" if path else str(key)
+            if key not in a or key not in b:
+                diffs.append(child)
+            else:
+                _diff(a[key], b[key], child, diffs)
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            _diff(x, y, f"{path}[{i}]", diffs)
+    elif a != b:
+        diffs.append(path)
+
+
+def comparison(lead: Dict, primary: Optional[Dict], primary_seconds: Optional[float], shadow: Optional[Dict],
+               shadow_seconds: Optional[float], error: Optional[str] = None,
+               primary_path: Optional[str] = None) -> Dict:
+    """
+    One shadow record: per-path latency plus the fields where the paths disagree
+
+    primary may be None when that path raised; primary_path must then be given.
+    """
+    primary_path = primary_path or primary["routedTo"]
+    shadow_path = "legacy" if primary_path == "renovation" else "renovation"
+    renovation = primary if primary_path == "renovation" else shadow
+    diffs = diff_outputs(primary, shadow) if primary is not None and shadow is not None else []
+    return {
+        "businessName": lead.get("business_name"),
+        "tier": lead.get("tier"),
+        "niche": lead.get("niche"),
+        "recordedAt": datetime.now().isoformat(),
+        "primary": primary_path,
+        "seconds": {primary_path: primary_seconds, shadow_path: shadow_seconds},
+        "match": error is None and not diffs,
+        "diffs": diffs,
+        "timedOutAgents": (renovation or {}).get("timedOutAgents", []),
+        "error": error,
+    }
+
+
+class ShadowRecorder:
+    """Appends one JSON line per comparison; safe to share between threads"""
+
+    def __init__(self, path: str = SHADOW_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, entry: Dict) -> None:
+        if observe_shadow is not None:
+            outcome = "error" if entry["error"] else "match" if entry["match"] else "diff"
+            observe_shadow(entry["seconds"], outcome)
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+class ShadowRunner:
+    """
+    Replays leads through the path they weren't routed to, off the caller's thread
+
+    run_path(lead, use_new_architecture) must return a combined pipeline
+    result. The lead and primary result are copied at submit time, so the
+    caller may keep mutating its own.
+    """
+
+    def __init__(self, run_path: Callable[[Dict, bool], Dict], recorder: Optional[ShadowRecorder] = None,
+                 workers: int = SHADOW_WORKERS, max_pending: int = SHADOW_MAX_PENDING):
+        self.run_path = run_path
+        self.recorder = recorder or ShadowRecorder()
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pipeline-shadow")
+
+    def submit(self, lead: Dict, primary: Dict, primary_seconds: float) -> bool:
+        """Queue a shadow run; False if it was dropped because too many are pending"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+        self._pool.submit(self._shadow, copy.deepcopy(lead), copy.deepcopy(primary), primary_seconds)
+        return True
+
+    def _shadow(self, lead: Dict, primary: Dict, primary_seconds: float) -> None:
+        shadow = error = None
+        start = time.perf_counter()
+        try:
+            shadow = self.run_path(lead, primary["routedTo"] != "renovation")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+        try:
+            self.recorder.record(comparison(lead, primary, primary_seconds, shadow,
+                                            None if error else seconds, error))
+        except Exception as e:
+            print(f"[SHADOW] Failed to record comparison: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BENCHMARK REPORT
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _latency(values: List[float]) -> Dict:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": _percentile(values, 0.5),
+        "p95": _percentile(values, 0.95),
+        "max": max(values, default=0.0),
+    }
+
+
+def build_report(records: Iterable[Dict]) -> Dict:
+    """Aggregate shadow records into per-path latency, parity and the most frequent diffs"""
+    seconds = {path: [] for path in PATHS}
+    fields = Counter()
+    leads = matched = errors = timed_out = 0
+    for record in records:
+        leads += 1
+        matched += record["match"]
+        errors += record["error"] is not None
+        timed_out += bool(record.get("timedOutAgents"))
+        for path in PATHS:
+            if record["seconds"].get(path) is not None:
+                seconds[path].append(record["seconds"][path])
+        # Collapse list indices so the same field counts once per lead
+        fields.update({re.sub(r"\[\d+\]", "[]", diff) for diff in record["diffs"]})
+
+    paths = {path: _latency(values) for path, values in seconds.items()}
+    ratio = lambda stat: paths["renovation"][stat] / paths["legacy"][stat] if paths["legacy"][stat] else None
+    return {
+        "generatedAt": datetime.now().isoformat(),
+        "leads": leads,
+        "paths": paths,
+        # Renovation / legacy: below 1.0 means the Renovation path is faster
+        "ratios": {stat: ratio(stat) for stat in ("mean", "p50", "p95")},
+        "parity": {"matched": matched, "rate": matched / leads if leads else 0.0, "errors": errors},
+        "timedOutLeads": timed_out,
+        "topDiffs": [{"field": field, "leads": n} for field, n in fields.most_common(20)],
+    }
+
+
+def check_gates(report: Dict, max_p50_ratio: Optional[float] = None, max_p95_ratio: Optional[float] = None,
+                min_parity: Optional[float] = None) -> List[str]:
+    """Reasons the Renovation path fails the migration gates (empty when it passes)"""
+    failures = []
+    for stat, limit in (("p50", max_p50_ratio), ("p95", max_p95_ratio)):
+        actual = report["ratios"][stat]
+        if limit is not None and (actual is None or actual > limit):
+            failures.append(f"{stat} ratio {actual if actual is None else round(actual, 3)} > {limit}")
+    if min_parity is not None and report["parity"]["rate"] < min_parity:
+        failures.append(f"parity {report['parity']['rate']:.3f} < {min_parity}")
+    return failures
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n{'='*72}")
+    print(f"🔬 SHADOW BENCHMARK: {report['leads']} leads")
+    print(f"{'='*72}")
+    print(f"{'path':<12} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    for path, stats in report["paths"].items():
+        print(
+            f"{path:<12} {stats['count']:>6} {stats['mean']:>9.4f} {stats['p50']:>9.4f} "
+            f"{stats['p95']:>9.4f} {stats['max']:>9.4f}"
+        )
+    ratios = ", ".join(f"{k}={v:.2f}x" for k, v in report["ratios"].items() if v is not None)
+    print(f"Renovation/legacy: {ratios or 'n/a'}")
+    parity = report["parity"]
+    print(f"Parity: {parity['matched']}/{report['leads']} identical ({parity['rate']:.1%}), "
+          f"{parity['errors']} errors, {report['timedOutLeads']} with timed-out agents")
+    for diff in report["topDiffs"][:10]:
+        print(f"  ≠ {diff['field']} ({diff['leads']} leads)")
+
+
+def read_shadow_log(path: str) -> Iterable[Dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def benchmark(leads: Iterable[Dict], recorder: ShadowRecorder) -> List[Dict]:
+    """
+    Run both paths inline on every lead, alternating which goes first
+
+    Leads are consumed one at a time. The agents' memo cache is swapped for
+    an empty, non-persistent one for the run, so the Renovation path is timed
+    cold like legacy rather than answering repeat niches from memory.
+    """
+    from demo_generation import industry_niche
+    from market_aware_agent import RENOVATION_AVAILABLE, run_path
+    from competitor_cache import lead_locality, shared_cache
+
+    if not RENOVATION_AVAILABLE:
+        raise SystemExit("Renovation agents are not importable; nothing to compare against")
+    from Renovation.agents.agent_cache import AgentResultCache, set_default_cache
+
+    set_default_cache(AgentResultCache(max_size=0, db_path=None))
+    records = []
+    try:
+        for i, lead in enumerate(leads):
+            # Same niche assignment as process_lead_with_agents
+            lead["niche"] = industry_niche(lead.get("industry", ""))
+            # Both paths share the competitor cache; fill it first so neither pays the lookup
+            shared_cache().lookup(lead["niche"], lead_locality(lead))
+
+            order = (False, True) if i % 2 == 0 else (True, False)
+            outputs, seconds, errors = {}, {}, []
+            for use_new in order:
+                start = time.perf_counter()
+                try:
+                    outputs[use_new] = run_path(copy.deepcopy(lead), use_new)
+                except Exception as e:
+                    errors.append(f"{'renovation' if use_new else 'legacy'}: {type(e).__name__}: {e}")
+                seconds[use_new] = time.perf_counter() - start
+            record = comparison(
+                lead,
+                outputs.get(False), seconds[False] if False in outputs else None,
+                outputs.get(True), seconds[True] if True in outputs else None,
+                "; ".join(errors) or None,
+                primary_path="legacy",
+            )
+            recorder.record(record)
+            records.append(record)
+    finally:
+        # Back to the environment-configured cache on next use
+        set_default_cache(None)
+    return records
+
+
+__all__ = [
+    "ShadowRunner", "ShadowRecorder", "diff_outputs", "comparison",
+    "build_report", "check_gates", "print_report", "read_shadow_log", "benchmark",
+]
+
+
+def main():
+    import argparse
+    from itertools import islice
+
+    parser = argparse.ArgumentParser(description="Compare the legacy and Renovation market-aware pipelines")
+    parser.add_argument("leads", nargs="?", help="Leads source: JSON/JSONL file, '-' for stdin, or sqlite:PATH")
+    parser.add_argument("--from-log", help="Build the report from an existing shadow log instead of running leads")
+    parser.add_argument("--limit", type=int, default=None, help="Limit number of leads")
+    parser.add_argument("--tier", type=int, default=1, help="Tier to pull when reading from sqlite:PATH")
+    parser.add_argument("--log", default=SHADOW_LOG, help="Append per-lead comparisons here (benchmark mode)")
+    parser.add_argument("--report", default="shadow_report.json", help="Write the JSON report here")
+    parser.add_argument("--max-p50-ratio", type=float, help="Fail if Renovation p50 exceeds legacy p50 by this factor")
+    parser.add_argument("--max-p95-ratio", type=float, help="Fail if Renovation p95 exceeds legacy p95 by this factor")
+    parser.add_argument("--min-parity", type=float, help="Fail if fewer than this fraction of leads match exactly")
+    args = parser.parse_args()
+
+    if args.from_log:
+        records = read_shadow_log(args.from_log)
+    elif args.leads:
+        from demo_generation import iter_leads
+        leads = iter_leads(args.leads, tier=args.tier)
+        records = benchmark(islice(leads, args.limit) if args.limit else leads, ShadowRecorder(args.log))
+    else:
+        parser.error("give a leads source or --from-log")
+
+    report = build_report(records)
+    print_report(report)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report: {args.report}")
+
+    failures = check_gates(report, args.max_p50_ratio, args.max_p95_ratio, args.min_parity)
+    if failures:
+        print(f"❌ GATE FAILED: {'; '.join(failures)}")
+        sys.exit(1)
+    if any(gate is not None for gate in (args.max_p50_ratio, args.max_p95_ratio, args.min_parity)):
+        print("✅ Gates passed")
+
+
+if __name__ == "__main__":
+    main()
+